@@ -0,0 +1,89 @@
+import sys
+import time
+from random import Random
+from typing import Tuple
+
+sys.path.insert(0, '.')
+
+from core.codecs import Codec, CODECS
+
+ENTITY_COUNTS = (10, 100, 1000)
+ITERATIONS = 2000
+UUID_LIKE = (
+    '2f1c7e4a-9b3d-4c5e-8f60-1a2b3c4d5e6f',
+    '00000000-0000-0000-0000-000000000000',
+    '2F1C7E4A-9B3D-4C5E-8F60-1A2B3C4D5E6F',
+    'aaaaaaaa-aaaa-aaaa-aaaa-aa aa aaaaaa',
+    'aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaag',
+    'aaaaaaaa-aaaa-aaaa-aaaa-aaaa-aaaaaaa'
+)
+
+
+def make_snapshot(entities: int, seed: int = 0) -> dict:
+    rng = Random(seed)
+    ids = iter(range(1, entities + 1))
+    bullets = entities // 2
+
+    def table(count: int) -> dict:
+        return {
+            next(ids): {'x': rng.randint(0, 700), 'y': rng.randint(0, 500)}
+            for _ in range(count)
+        }
+
+    return {
+        1313: {
+            'x': rng.randint(0, 645),
+            'y': rng.randint(0, 450),
+            'bullets': table(bullets),
+            'enemies': table(entities - bullets),
+            'score': rng.randint(0, 100)
+        }
+    }
+
+
+def measure(codec: Codec, snapshot: dict) -> Tuple[int, float, float]:
+    payload = codec.encode(snapshot)
+    iterations = max(10, ITERATIONS // max(1, len(payload) // 1000))
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.encode(snapshot)
+    encode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(payload)
+    decode_us = (time.perf_counter() - start) / iterations * 1e6
+
+    assert codec.decode(payload) == snapshot
+    return len(payload), encode_us, decode_us
+
+
+def check_round_trip(codec: Codec) -> None:
+    """Strings that look like UUIDs, as keys and values, must decode to
+    exactly what was encoded whether or not they are packed."""
+    data = {
+        'ids': list(UUID_LIKE),
+        'names': {value: index for index, value in enumerate(UUID_LIKE)}
+    }
+
+    assert codec.decode(codec.encode(data)) == data, codec.name
+
+
+def main() -> None:
+    for codec_type in CODECS.values():
+        check_round_trip(codec_type())
+
+    print(f'{"codec":<8}{"entities":>10}{"bytes":>10}'
+          f'{"encode µs":>12}{"decode µs":>12}')
+
+    for entities in ENTITY_COUNTS:
+        snapshot = make_snapshot(entities)
+        for name, codec_type in CODECS.items():
+            size, encode_us, decode_us = measure(codec_type(), snapshot)
+            print(f'{name:<8}{entities:>10}{size:>10}'
+                  f'{encode_us:>12.1f}{decode_us:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+import sys
+import time
+from random import Random
+from typing import List, Tuple
+
+sys.path.insert(0, '.')
+
+from pygame import Rect
+
+from core.spatial import CollisionGrid
+
+ENTITY_COUNTS = (100, 500, 1000, 2000, 5000)
+ARENA = (700, 500)
+TICKS = 20
+
+
+class Body:
+    __slots__ = ('rect',)
+
+    def __init__(self, rect: Rect) -> None:
+        self.rect = rect
+
+
+def make_bodies(
+    count: int,
+    size: Tuple[int, int],
+    rng: Random,
+    band: Tuple[int, int] = (0, ARENA[1])
+) -> List[Body]:
+    return [
+        Body(Rect(
+            rng.randint(0, ARENA[0] - size[0]),
+            rng.randint(band[0], band[1] - size[1]),
+            *size
+        ))
+        for _ in range(count)
+    ]
+
+
+def naive_hits(bullets: List[Body], enemies: List[Body]) -> int:
+    hits = 0
+
+    for bullet in bullets:
+        for enemy in enemies:
+            if bullet.rect.colliderect(enemy.rect):
+                hits += 1
+                break
+
+    return hits
+
+
+def grid_hits(
+    grid: CollisionGrid,
+    bullets: List[Body],
+    enemies: List[Body]
+) -> int:
+    grid.rebuild(enemies)
+    hits = 0
+
+    for bullet in bullets:
+        if grid.first(bullet.rect) is not None:
+            hits += 1
+
+    return hits
+
+
+def timed(func, *args) -> Tuple[float, int]:
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        result = func(*args)
+    return (time.perf_counter() - start) / TICKS * 1000, result
+
+
+def main() -> None:
+    rng = Random(0)
+    grid = CollisionGrid(ARENA)
+
+    scenarios = {
+        'mixed': ((0, ARENA[1]), (0, ARENA[1])),
+        'apart': ((ARENA[1] // 2, ARENA[1]), (0, ARENA[1] // 2))
+    }
+
+    print(f'{"scenario":<10}{"entities":>10}{"naive ms":>12}{"grid ms":>12}'
+          f'{"grid µs/entity":>16}')
+
+    for name, (bullet_band, enemy_band) in scenarios.items():
+        for count in ENTITY_COUNTS:
+            bullets = make_bodies(count // 2, (40, 20), rng, bullet_band)
+            enemies = make_bodies(
+                count - count // 2, (50, 50), rng, enemy_band
+            )
+
+            naive_ms, naive_result = timed(naive_hits, bullets, enemies)
+            grid_ms, grid_result = timed(grid_hits, grid, bullets, enemies)
+            assert naive_result == grid_result
+
+            print(f'{name:<10}{count:>10}{naive_ms:>12.2f}{grid_ms:>12.2f}'
+                  f'{grid_ms * 1000 / count:>16.2f}')
+
+
+if __name__ == '__main__':
+    main()
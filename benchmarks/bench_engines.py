@@ -0,0 +1,91 @@
+import sys
+import time
+from random import Random
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, '.')
+
+from pygame import Rect
+
+from core.engines import ENGINES, EntitySpec
+
+ENTITY_COUNTS = (100, 1000, 10000)
+ARENA = (700, 500)
+TICKS = 10
+
+bullet_spec = EntitySpec((40, 20), 'image/bullet.png', 7)
+enemy_spec = EntitySpec((50, 50), 'image/player.png', 2)
+
+
+class Score:
+    def __init__(self) -> None:
+        self.score = 0
+
+    def add_score(self, score_count: int = 1) -> None:
+        self.score += score_count
+
+    def subtract_score(self, score_count: int = 1) -> None:
+        self.score -= score_count
+
+
+class Body:
+    def __init__(self, x: int, y: int) -> None:
+        self.rect = Rect(x, y, 60, 60)
+        self.score_counter = Score()
+
+
+def populate(engine, count: int, seed: int) -> None:
+    rng = Random(seed)
+    engine.clear()
+
+    for i in range(count // 2):
+        engine.spawn_enemy(rng.randint(0, 650), rng.randint(0, 250))
+        engine.spawn_bullet(
+            rng.randint(0, 660), rng.randint(250, 480),
+            'host' if i % 2 else 'client'
+        )
+
+
+def run(name: str, count: int) -> Tuple[float, Dict[str, int]]:
+    engine = ENGINES[name](
+        ARENA, bullet_spec, enemy_spec,
+        max_bullets=count, max_enemies=count
+    )
+    players: List[Body] = [Body(150, 400), Body(300, 400)]
+    scores = {'host': Score(), 'client': Score()}
+    elapsed = 0.0
+
+    for tick in range(TICKS):
+        populate(engine, count, tick)
+        start = time.perf_counter()
+        for _ in range(5):
+            engine.step()
+            engine.collide(players, scores)
+        elapsed += time.perf_counter() - start
+
+    results = {role: score.score for role, score in scores.items()}
+    for index, player in enumerate(players):
+        results[f'player{index}'] = player.score_counter.score
+
+    return elapsed / (TICKS * 5) * 1000, results
+
+
+def main() -> None:
+    print(f'{"engine":<10}{"entities":>10}{"ms/tick":>10}{"kills":>8}')
+
+    for count in ENTITY_COUNTS:
+        expected = None
+        for name in ENGINES:
+            ms, results = run(name, count)
+            kills = results['host'] + results['client']
+            print(f'{name:<10}{count:>10}{ms:>10.3f}{kills:>8}')
+
+            if expected is None:
+                expected = results
+            assert results == expected, (
+                f'{name} scored {results}, expected {expected}'
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import sys
+import time
+import struct
+import asyncio
+from typing import List, Tuple
+
+sys.path.insert(0, '.')
+
+from core.netsim import LinkConditions, NetworkSimulator
+
+CONDITIONS = (
+    LinkConditions(),
+    LinkConditions(delay=0.02, jitter=0.015),
+    LinkConditions(delay=0.02, jitter=0.015, loss=0.1),
+    LinkConditions(delay=0.005, jitter=0.005, loss=0.2, bandwidth=64 * 1024)
+)
+MESSAGES = 500
+INTERVAL = 0.001
+SEQUENCE = struct.Struct('!I')
+
+
+async def relay(
+    conditions: LinkConditions,
+    seed: int
+) -> Tuple[List[int], int]:
+    """Send numbered messages through a simulated TCP link and return
+    the numbers in the order they came out the other end, with the
+    number of retransmissions the link simulated."""
+    received = bytearray()
+    done = asyncio.Event()
+
+    async def accept(
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        while chunk := await reader.read(4096):
+            received.extend(chunk)
+        writer.close()
+        done.set()
+
+    server = await asyncio.start_server(accept, '127.0.0.1', 0)
+    simulator = NetworkSimulator(
+        ('127.0.0.1', 0), server.sockets[0].getsockname()[:2], 'tcp',
+        conditions, seed=seed
+    )
+    await simulator.start()
+
+    _, writer = await asyncio.open_connection(*simulator.listen)
+    for index in range(MESSAGES):
+        writer.write(SEQUENCE.pack(index))
+        await writer.drain()
+        await asyncio.sleep(INTERVAL)
+    writer.close()
+
+    await asyncio.wait_for(done.wait(), 30)
+    simulator.close()
+    server.close()
+
+    numbers = [number for number, in SEQUENCE.iter_unpack(received)]
+    return numbers, simulator.up.retransmits
+
+
+def main() -> None:
+    print(f'{"delay ms":>9}{"jitter ms":>10}{"loss":>6}{"retransmits":>12}'
+          f'{"seconds":>9}')
+
+    for seed, conditions in enumerate(CONDITIONS):
+        started = time.perf_counter()
+        numbers, retransmits = asyncio.run(relay(conditions, seed))
+        elapsed = time.perf_counter() - started
+
+        assert numbers == list(range(MESSAGES)), (
+            f'TCP link reordered or lost data under {conditions}'
+        )
+        print(f'{conditions.delay * 1000:>9.0f}'
+              f'{conditions.jitter * 1000:>10.0f}{conditions.loss:>6.0%}'
+              f'{retransmits:>12}{elapsed:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
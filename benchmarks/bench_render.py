@@ -0,0 +1,83 @@
+import os
+import sys
+import time
+from random import Random
+
+sys.path.insert(0, '.')
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from pygame import display, font, sprite, init
+
+from core.assets import assets
+from core.render import RENDERERS
+from core.simulation import ARENA, GameState
+from core.objects.game_objects import Player, PlayerScore
+
+ENTITY_COUNTS = (0, 100, 1000, 5000)
+FRAMES = 120
+
+
+def populate(state: GameState, count: int, rng: Random) -> None:
+    live = state.engine.live()
+    width, height = ARENA
+
+    for _ in range(count // 2 - live['enemies']):
+        state.spawn_enemy(rng.randint(0, width - 50), rng.randint(0, 250))
+    for _ in range(count - count // 2 - live['bullets']):
+        state.spawn_bullet(
+            rng.randint(0, width - 40), rng.randint(250, height - 20), 'host'
+        )
+
+
+def run(name: str, count: int) -> float:
+    window = display.get_surface()
+    background = assets.get('image/bg.png', ARENA, alpha=False)
+    state = GameState(
+        max_bullets=count or 1, max_enemies=count or 1, spawn_enemies=False
+    )
+    rng = Random(count)
+    scores = (
+        PlayerScore('Игрок 1. Score: 0', (5, 440), 20),
+        PlayerScore('Игрок 2. Score: 0', (5, 470), 20)
+    )
+    players = sprite.Group(
+        Player((150, 150), (60, 60), 'image/player.png', scores[0]),
+        Player((300, 150), (60, 60), 'image/player.png', scores[1])
+    )
+    layers = [
+        ('bullets', assets.get('image/bullet.png', (40, 20))),
+        ('enemies', assets.get('image/player.png', (50, 50)))
+    ]
+    renderer = RENDERERS[name](window, background)
+
+    elapsed = 0.0
+    for _ in range(FRAMES):
+        populate(state, count, rng)
+        state.step({})
+
+        started = time.perf_counter()
+        renderer.draw(
+            [(image, state.positions(kind)) for kind, image in layers],
+            players,
+            scores
+        )
+        elapsed += time.perf_counter() - started
+
+    return FRAMES / elapsed
+
+
+def main() -> None:
+    init()
+    font.init()
+    display.set_mode(ARENA)
+    assets.convert_all()
+
+    print(f'{"renderer":<10}{"entities":>10}{"fps":>10}')
+
+    for count in ENTITY_COUNTS:
+        for name in RENDERERS:
+            print(f'{name:<10}{count:>10}{run(name, count):>10.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import time
+import shutil
+import subprocess
+from statistics import median
+
+sys.path.insert(0, '.')
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+RUNS = 5
+CACHE_DIR = 'core/ui/__pycache__'
+
+
+def child() -> None:
+    started = time.perf_counter()
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    from core.objects.menu_objects import MainWindow
+    imported = time.perf_counter()
+
+    window = MainWindow()
+    built = time.perf_counter()
+    window.show()
+    app.processEvents()
+    shown = time.perf_counter()
+
+    print(json.dumps({
+        'import_ms': (imported - started) * 1000,
+        'build_ms': (built - imported) * 1000,
+        'show_ms': (shown - built) * 1000,
+        'pygame_loaded': 'pygame' in sys.modules
+    }))
+
+
+def run(cold: bool) -> dict:
+    """Time from launching the interpreter to the main menu on screen."""
+    if cold:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, __file__, '--child'], capture_output=True, text=True
+    )
+    if result.returncode:
+        raise SystemExit(result.stderr)
+
+    report = json.loads(result.stdout.splitlines()[-1])
+    report['total_ms'] = (time.perf_counter() - started) * 1000
+
+    return report
+
+
+def main() -> None:
+    print(f'{"ui cache":<10}{"total ms":>10}{"import":>10}{"build":>10}'
+          f'{"show":>10}{"pygame":>8}')
+
+    for label, cold in (('cold', True), ('warm', False)):
+        reports = [run(cold) for _ in range(RUNS)]
+        print(f'{label:<10}'
+              f'{median(r["total_ms"] for r in reports):>10.1f}'
+              f'{median(r["import_ms"] for r in reports):>10.1f}'
+              f'{median(r["build_ms"] for r in reports):>10.1f}'
+              f'{median(r["show_ms"] for r in reports):>10.1f}'
+              f'{str(any(r["pygame_loaded"] for r in reports)):>8}')
+
+
+if __name__ == '__main__':
+    if '--child' in sys.argv:
+        child()
+    else:
+        main()
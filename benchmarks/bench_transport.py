@@ -0,0 +1,238 @@
+import sys
+import time
+import socket
+import struct
+import asyncio
+import threading
+from random import Random
+from statistics import quantiles
+from typing import List, Tuple
+
+sys.path.insert(0, '.')
+
+from core.framing import FramedSocket
+from core.datagram import DatagramSocket
+from core.netsim import LinkConditions, NetworkSimulator
+from core.network import NetworkWorker
+from core.server import Host, Client
+
+LOSS_RATES = (0.0, 0.05, 0.2)
+REORDER_RATE = 0.05
+MESSAGES = 600
+INTERVAL = 0.002
+DRAIN_TIMEOUT = 2.0
+STAMP = struct.Struct('!Id')
+SPAWNS = 200
+SPAWN_LOSS = 0.1
+
+
+class LossySocket(DatagramSocket):
+    """Drops outgoing packets at random and holds some back until after
+    the next one, to simulate a lossy link that reorders."""
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        loss: float,
+        reorder: float,
+        seed: int
+    ) -> None:
+        super().__init__(sock)
+        self.loss = loss
+        self.reorder = reorder
+        self.rng = Random(seed)
+        self._held: bytes | None = None
+
+    def _transmit(self, packet: bytes) -> None:
+        if self.rng.random() < self.loss:
+            return
+
+        if self._held is None and self.rng.random() < self.reorder:
+            self._held = packet
+            return
+
+        super()._transmit(packet)
+        if self._held is not None:
+            super()._transmit(self._held)
+            self._held = None
+
+
+def udp_pair(
+    loss: float,
+    reorder: float = REORDER_RATE
+) -> Tuple[DatagramSocket, DatagramSocket]:
+    first = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    second = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    first.bind(('127.0.0.1', 0))
+    second.bind(('127.0.0.1', 0))
+    first.connect(second.getsockname())
+    second.connect(first.getsockname())
+
+    return (
+        LossySocket(first, loss, reorder, 1),
+        LossySocket(second, loss, reorder, 2)
+    )
+
+
+def tcp_pair() -> Tuple[FramedSocket, FramedSocket]:
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    first = socket.create_connection(listener.getsockname())
+    second, _ = listener.accept()
+    listener.close()
+
+    return FramedSocket(first), FramedSocket(second)
+
+
+def exchange(
+    sender: FramedSocket | DatagramSocket,
+    receiver: FramedSocket | DatagramSocket,
+    reliable: bool
+) -> List[Tuple[int, float]]:
+    """Send stamped messages at a steady pace and return the index and
+    latency of every one that arrived, in arrival order."""
+    received = []
+    payload = bytearray(64)
+
+    def receive() -> None:
+        now = time.perf_counter()
+        for frame in receiver.recv_frames(False):
+            index, sent_at = STAMP.unpack_from(frame)
+            received.append((index, now - sent_at))
+        sender.recv_frames(False)
+
+    for index in range(MESSAGES):
+        STAMP.pack_into(payload, 0, index, time.perf_counter())
+        sender.send_frame(payload, reliable)
+        receive()
+        time.sleep(INTERVAL)
+
+    deadline = time.perf_counter() + DRAIN_TIMEOUT
+    while len(received) < MESSAGES and time.perf_counter() < deadline:
+        receive()
+        time.sleep(INTERVAL / 4)
+
+    return received
+
+
+def check(
+    name: str,
+    reliable: bool,
+    received: List[Tuple[int, float]],
+    receiver: FramedSocket | DatagramSocket
+) -> None:
+    """Reliable traffic must arrive complete and in order; unreliable
+    traffic may lose packets but never delivers one older than the last."""
+    indices = [index for index, _ in received]
+
+    if reliable:
+        assert indices == list(range(MESSAGES)), (
+            f'{name}: reliable channel delivered {len(indices)} of '
+            f'{MESSAGES} messages or out of order'
+        )
+    else:
+        assert all(a < b for a, b in zip(indices, indices[1:])), (
+            f'{name}: unreliable channel delivered a stale message'
+        )
+        if isinstance(receiver, LossySocket) and receiver.reorder:
+            assert receiver.stale, f'{name}: no stale packets were dropped'
+
+
+def report(name: str, loss: float, latencies: List[float]) -> None:
+    delivered = len(latencies) / MESSAGES
+    if len(latencies) > 1:
+        cuts = quantiles(latencies, n=100)
+        p50, p99 = cuts[49] * 1000, cuts[98] * 1000
+    else:
+        p50 = p99 = float('nan')
+
+    print(f'{name:<16}{loss:>6.0%}{delivered:>11.1%}'
+          f'{p50:>10.2f}{p99:>10.2f}{max(latencies, default=0) * 1000:>10.2f}')
+
+
+def spawn_check(loss: float, seed: int = 0) -> Tuple[int, float]:
+    """Play the game's traffic pattern between a UDP Client and Host
+    through the network simulator: a snapshot every tick plus a posted
+    spawn event. Returns how many spawns arrived and how long that took.
+    """
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+
+    probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    probe.bind(('127.0.0.1', 0))
+    port = probe.getsockname()[1]
+    probe.close()
+
+    simulator = NetworkSimulator(
+        ('127.0.0.2', 0), ('127.0.0.1', port), 'udp',
+        LinkConditions(loss=loss), seed=seed
+    )
+    asyncio.run_coroutine_threadsafe(simulator.start(), loop).result()
+
+    host, client = Host(transport='udp'), Client(transport='udp')
+    waiting = threading.Thread(target=host.run, args=('127.0.0.1', port, 5))
+    waiting.start()
+    client.connect(*simulator.listen, timeout=5)
+    waiting.join()
+
+    sender, receiver = NetworkWorker(client), NetworkWorker(host)
+    sender.start()
+    receiver.start()
+    started = time.perf_counter()
+    arrived = set()
+
+    for index in range(SPAWNS):
+        sender.submit({port: {'x': index, 'y': 0}})
+        sender.post({'spawns': {
+            'bullets': {index: {'x': index, 'y': 0}}, 'enemies': {}
+        }})
+        time.sleep(INTERVAL)
+
+    deadline = time.perf_counter() + DRAIN_TIMEOUT
+    while len(arrived) < SPAWNS and time.perf_counter() < deadline:
+        for message in receiver.drain():
+            bullets = message.get('spawns', {}).get('bullets', {})
+            arrived.update(position['x'] for position in bullets.values())
+        time.sleep(INTERVAL)
+    elapsed = time.perf_counter() - started
+
+    sender.stop()
+    receiver.stop()
+    loop.call_soon_threadsafe(simulator.close)
+    loop.call_soon_threadsafe(loop.stop)
+
+    return len(arrived), elapsed
+
+
+def main() -> None:
+    print(f'{"transport":<16}{"loss":>6}{"delivered":>11}'
+          f'{"p50 ms":>10}{"p99 ms":>10}{"max ms":>10}')
+
+    sender, receiver = tcp_pair()
+    received = exchange(sender, receiver, True)
+    check('tcp', True, received, receiver)
+    report('tcp', 0.0, [latency for _, latency in received])
+    sender.close()
+    receiver.close()
+
+    for loss in LOSS_RATES:
+        for reliable in (False, True):
+            sender, receiver = udp_pair(loss)
+            name = 'udp reliable' if reliable else 'udp unreliable'
+            received = exchange(sender, receiver, reliable)
+            check(name, reliable, received, receiver)
+            report(name, loss, [latency for _, latency in received])
+            sender.sock.close()
+            receiver.sock.close()
+
+    arrived, elapsed = spawn_check(SPAWN_LOSS)
+    assert arrived == SPAWNS, (
+        f'{SPAWNS - arrived} of {SPAWNS} spawn events were lost'
+    )
+    print(f'spawn events over udp at {SPAWN_LOSS:.0%} loss: '
+          f'{arrived}/{SPAWNS} in {elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
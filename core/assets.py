@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from typing import Tuple, Iterable, Dict
+
+from pygame import Surface, display, image, transform
+
+AssetKey = Tuple[str, Tuple[int, int] | None, bool]
+
+
+class AssetCache:
+    def __init__(self, max_size: int = 64) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._surfaces: OrderedDict[AssetKey, Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def __contains__(self, key: AssetKey) -> bool:
+        return key in self._surfaces
+
+    def get(
+        self,
+        path: str,
+        size: Tuple[int, int] | None = None,
+        alpha: bool = True
+    ) -> Surface:
+        key = (path, tuple(size) if size else None, alpha)
+        surface = self._surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._load(path, key[1], alpha)
+        self._surfaces[key] = surface
+
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+
+        return surface
+
+    def preload(
+        self,
+        assets: Iterable[Tuple[str, Tuple[int, int] | None, bool]]
+    ) -> None:
+        for path, size, alpha in assets:
+            self.get(path, size, alpha)
+
+    def convert_all(self) -> None:
+        if display.get_surface() is None:
+            return
+
+        for key, surface in self._surfaces.items():
+            self._surfaces[key] = (
+                surface.convert_alpha() if key[2] else surface.convert()
+            )
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._surfaces),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
+        }
+
+    @staticmethod
+    def _load(
+        path: str,
+        size: Tuple[int, int] | None,
+        alpha: bool
+    ) -> Surface:
+        surface = image.load(path)
+
+        if size is not None and surface.get_size() != size:
+            surface = transform.scale(surface, size)
+
+        if display.get_surface() is not None:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+
+        return surface
+
+
+assets = AssetCache()
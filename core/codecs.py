@@ -0,0 +1,326 @@
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Tuple, Dict, Iterable, Type, Any, List
+
+Buffer = bytes | bytearray | memoryview
+
+FIELDS: Tuple[str, ...] = (
+    'x', 'y', 'bullets', 'enemies', 'score',
+    'seq', 'ack', 'base', 'full', 'delta', 'set', 'del', 'sub', 'resync',
+    'inputs', 'input_ack', 'peer', 'rtt', 'tick', 'players', 'acks',
+    'input', 'hash', 'ping', 'pong'
+)
+
+VERSION = 1
+
+NONE, FALSE, TRUE, INT, FLOAT, STR, BYTES, LIST, DICT = range(9)
+FIELD, UUID_STR, ENTITIES = range(9, 12)
+
+POSITION = struct.Struct('<hh')
+DOUBLE = struct.Struct('<d')
+INT16_MIN, INT16_MAX = -(1 << 15), (1 << 15) - 1
+HEX_DIGITS = frozenset('0123456789abcdef')
+
+
+class CodecError(ValueError):
+    pass
+
+
+class Codec(ABC):
+    name: str = ''
+
+    @abstractmethod
+    def encode(self, data: dict) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, payload: Buffer) -> dict:
+        pass
+
+
+class JsonCodec(Codec):
+    """JSON text; integer keys such as ports and entity ids are restored."""
+
+    name = 'json'
+
+    def encode(self, data: dict) -> bytes:
+        return json.dumps(data, separators=(',', ':')).encode()
+
+    def decode(self, payload: Buffer) -> dict:
+        return json.loads(
+            str(payload, 'utf-8'), object_pairs_hook=_restore_int_keys
+        )
+
+
+class BinaryCodec(Codec):
+    """Schema-based binary encoding of snapshot dictionaries.
+
+    Keys listed in ``fields`` go over the wire as small integers, uuid4
+    strings as 16 raw bytes, and ``{id: {'x': .., 'y': ..}}`` tables as
+    packed int16 pairs.
+    """
+
+    name = 'binary'
+
+    def __init__(self, fields: Iterable[str] = FIELDS) -> None:
+        self.fields = tuple(fields)
+        self._field_ids = {field: i for i, field in enumerate(self.fields)}
+
+    def encode(self, data: dict) -> bytes:
+        out = bytearray((VERSION,))
+        self._write(out, data)
+        return bytes(out)
+
+    def decode(self, payload: Buffer) -> dict:
+        view = memoryview(payload)
+
+        if not len(view) or view[0] != VERSION:
+            raise CodecError('Unsupported binary snapshot version.')
+
+        try:
+            value, position = self._read(view, 1)
+        except (struct.error, ValueError, IndexError, TypeError) as error:
+            raise CodecError(f'Malformed binary snapshot: {error}') from None
+
+        if position != len(view):
+            raise CodecError('Trailing bytes after binary snapshot.')
+
+        return value
+
+    def _write(self, out: bytearray, value: Any) -> None:
+        if value is None:
+            out.append(NONE)
+        elif value is True:
+            out.append(TRUE)
+        elif value is False:
+            out.append(FALSE)
+        elif isinstance(value, int):
+            out.append(INT)
+            _write_varint(out, _zigzag(value))
+        elif isinstance(value, float):
+            out.append(FLOAT)
+            out += DOUBLE.pack(value)
+        elif isinstance(value, str):
+            self._write_str(out, value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            out.append(BYTES)
+            _write_varint(out, len(value))
+            out += value
+        elif isinstance(value, (list, tuple)):
+            out.append(LIST)
+            _write_varint(out, len(value))
+            for item in value:
+                self._write(out, item)
+        elif isinstance(value, dict):
+            if value and _is_entity_table(value):
+                out.append(ENTITIES)
+                _write_varint(out, len(value))
+                pack = POSITION.pack
+                for key, position in value.items():
+                    raw = _uuid_bytes(key) if type(key) is str else None
+                    if raw is not None:
+                        out.append(UUID_STR)
+                        out += raw
+                    else:
+                        self._write(out, key)
+                    out += pack(position['x'], position['y'])
+            else:
+                out.append(DICT)
+                _write_varint(out, len(value))
+                for key, item in value.items():
+                    self._write(out, key)
+                    self._write(out, item)
+        else:
+            raise CodecError(f'Cannot encode {type(value).__name__}.')
+
+    def _write_str(self, out: bytearray, value: str) -> None:
+        field_id = self._field_ids.get(value)
+
+        if field_id is not None:
+            out.append(FIELD)
+            _write_varint(out, field_id)
+            return
+
+        raw = _uuid_bytes(value)
+        if raw is not None:
+            out.append(UUID_STR)
+            out += raw
+            return
+
+        encoded = value.encode()
+        out.append(STR)
+        _write_varint(out, len(encoded))
+        out += encoded
+
+    def _read(self, view: memoryview, position: int) -> Tuple[Any, int]:
+        try:
+            tag = view[position]
+        except IndexError:
+            raise CodecError('Truncated binary snapshot.') from None
+        position += 1
+
+        if tag == INT:
+            value, position = _read_varint(view, position)
+            return _unzigzag(value), position
+        if tag == FIELD:
+            field_id, position = _read_varint(view, position)
+            try:
+                return self.fields[field_id], position
+            except IndexError:
+                raise CodecError(f'Unknown field id {field_id}.') from None
+        if tag == ENTITIES:
+            count, position = _read_varint(view, position)
+            table = {}
+            unpack = POSITION.unpack_from
+            for _ in range(count):
+                if view[position] == UUID_STR:
+                    key = _format_uuid(view[position + 1:position + 17])
+                    position += 17
+                else:
+                    key, position = self._read(view, position)
+                x, y = unpack(view, position)
+                position += 4
+                table[key] = {'x': x, 'y': y}
+            return table, position
+        if tag == DICT:
+            count, position = _read_varint(view, position)
+            result = {}
+            for _ in range(count):
+                key, position = self._read(view, position)
+                result[key], position = self._read(view, position)
+            return result, position
+        if tag == UUID_STR:
+            end = position + 16
+            if end > len(view):
+                raise CodecError('Truncated binary snapshot.')
+            return _format_uuid(view[position:end]), end
+        if tag == STR or tag == BYTES:
+            size, position = _read_varint(view, position)
+            end = position + size
+            if end > len(view):
+                raise CodecError('Truncated binary snapshot.')
+            chunk = view[position:end]
+            return (str(chunk, 'utf-8') if tag == STR else bytes(chunk)), end
+        if tag == LIST:
+            count, position = _read_varint(view, position)
+            items = []
+            for _ in range(count):
+                item, position = self._read(view, position)
+                items.append(item)
+            return items, position
+        if tag == FLOAT:
+            return DOUBLE.unpack_from(view, position)[0], position + 8
+        if tag == NONE:
+            return None, position
+        if tag == TRUE:
+            return True, position
+        if tag == FALSE:
+            return False, position
+
+        raise CodecError(f'Unknown tag {tag}.')
+
+
+CODECS: Dict[str, Type[Codec]] = {
+    BinaryCodec.name: BinaryCodec,
+    JsonCodec.name: JsonCodec
+}
+DEFAULT_CODECS: Tuple[str, ...] = (BinaryCodec.name, JsonCodec.name)
+
+
+def get_codec(name: str) -> Codec:
+    try:
+        return CODECS[name]()
+    except KeyError:
+        raise CodecError(f'Unknown codec: {name}.') from None
+
+
+def negotiate(preferred: Iterable[str], offered: Iterable[str]) -> str:
+    offered = set(offered)
+
+    for name in preferred:
+        if name in offered and name in CODECS:
+            return name
+
+    raise CodecError('No common codec with the peer.')
+
+
+def _restore_int_keys(pairs: List[Tuple[str, Any]]) -> dict:
+    return {
+        int(key) if _is_int_key(key) else key: value
+        for key, value in pairs
+    }
+
+
+def _is_int_key(key: str) -> bool:
+    digits = key[1:] if key[:1] == '-' else key
+    return digits.isascii() and digits.isdigit()
+
+
+def _is_entity_table(table: dict) -> bool:
+    for entity in table.values():
+        if (
+            type(entity) is not dict
+            or len(entity) != 2
+            or type(entity.get('x')) is not int
+            or type(entity.get('y')) is not int
+            or not INT16_MIN <= entity['x'] <= INT16_MAX
+            or not INT16_MIN <= entity['y'] <= INT16_MAX
+        ):
+            return False
+
+    return True
+
+
+def _uuid_bytes(value: str) -> bytes | None:
+    """The 16 raw bytes of a lowercase hyphenated UUID string, or None
+    for anything that would not format back to the same string."""
+    if (
+        len(value) != 36
+        or not value[8] == value[13] == value[18] == value[23] == '-'
+    ):
+        return None
+
+    digits = value.replace('-', '')
+    if len(digits) != 32 or not HEX_DIGITS.issuperset(digits):
+        return None
+
+    return bytes.fromhex(digits)
+
+
+def _format_uuid(raw: memoryview) -> str:
+    digits = raw.hex()
+    return (
+        f'{digits[:8]}-{digits[8:12]}-{digits[12:16]}-'
+        f'{digits[16:20]}-{digits[20:]}'
+    )
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_varint(out: bytearray, value: int) -> None:
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(view: memoryview, position: int) -> Tuple[int, int]:
+    result = shift = 0
+
+    while True:
+        try:
+            byte = view[position]
+        except IndexError:
+            raise CodecError('Truncated varint.') from None
+        position += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, position
+        shift += 7
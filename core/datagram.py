@@ -0,0 +1,246 @@
+import time
+import select
+import socket
+import struct
+from collections import deque
+from typing import Dict, List, Tuple
+
+from core.framing import FrameError
+
+PACKET = struct.Struct('!BII')
+PACKET_SIZE = PACKET.size
+MAX_DATAGRAM = 65507
+MAX_PAYLOAD = MAX_DATAGRAM - PACKET_SIZE
+
+UNRELIABLE = 0
+RELIABLE = 1
+ACK = 2
+CLOSE = 3
+
+
+class DatagramSocket:
+    """Message transport over a connected UDP socket.
+
+    Every packet is a ``PACKET`` header (channel, seq, ack) and one
+    payload. Unreliable packets have their own sequence, and anything not
+    newer than the last one received is dropped as stale. Reliable
+    packets are kept until acked, resent when the ack is overdue and
+    delivered in order. ``ack`` is the newest reliable seq received
+    without a gap, and an ACK packet also names the seq that caused it,
+    which is what the round trip is measured on. Payloads are not
+    fragmented.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        min_rto: float = 0.02,
+        max_rto: float = 1.0,
+        max_pending: int = 1024
+    ) -> None:
+        self.sock = sock
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self.max_pending = max_pending
+        self.rtt: float | None = None
+        self.sent = 0
+        self.received = 0
+        self.stale = 0
+        self.duplicates = 0
+        self.resent = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._seq = 0
+        self._reliable_seq = 0
+        self._remote_seq = 0
+        self._remote_reliable = 0
+        self._unacked: Dict[int, Tuple[bytes, float, bool]] = {}
+        self._early: Dict[int, bytes] = {}
+        self._ready: deque[bytes] = deque()
+        self._recv_buffer = bytearray(MAX_DATAGRAM)
+        self._recv_view = memoryview(self._recv_buffer)
+
+        sock.setblocking(False)
+
+    @classmethod
+    def accept(cls, sock: socket.socket) -> 'DatagramSocket':
+        """Wait on a bound socket for a first packet and lock onto its
+        sender."""
+        packet, address = sock.recvfrom(MAX_DATAGRAM)
+        sock.connect(address)
+
+        connection = cls(sock)
+        connection._handle(memoryview(packet))
+        return connection
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def close(self) -> None:
+        self._transmit(PACKET.pack(CLOSE, 0, self._remote_reliable))
+        self.sock.close()
+
+    def send_frame(
+        self,
+        payload: bytes | bytearray | memoryview,
+        reliable: bool = True
+    ) -> int:
+        size = len(payload)
+        if size > MAX_PAYLOAD:
+            raise FrameError(f'Datagram of {size} bytes exceeds the limit.')
+
+        if reliable:
+            if len(self._unacked) >= self.max_pending:
+                raise ConnectionResetError('Peer stopped acknowledging.')
+
+            self._reliable_seq += 1
+            packet = PACKET.pack(
+                RELIABLE, self._reliable_seq, self._remote_reliable
+            ) + payload
+            self._unacked[self._reliable_seq] = (
+                packet, time.perf_counter(), False
+            )
+        else:
+            self._seq += 1
+            packet = PACKET.pack(
+                UNRELIABLE, self._seq, self._remote_reliable
+            ) + payload
+
+        self._transmit(packet)
+        self.sent += 1
+        return len(packet)
+
+    def recv_frames(self, block: bool = True) -> List[bytes]:
+        """Return every payload delivered so far.
+
+        While blocking, overdue reliable packets keep being resent.
+        """
+        self._receive(block)
+
+        frames = list(self._ready)
+        self._ready.clear()
+        return frames
+
+    def recv_frame(self, block: bool = True) -> bytes | None:
+        """Return the next payload, or None if ``block`` is off and none
+        has arrived; later ones stay queued."""
+        self._receive(block)
+        return self._ready.popleft() if self._ready else None
+
+    def resend(self) -> int:
+        """Resend the reliable packets whose ack is overdue."""
+        if not self._unacked:
+            return 0
+
+        now = time.perf_counter()
+        deadline = now - self.rto
+        count = 0
+
+        for seq, (packet, sent_at, _) in self._unacked.items():
+            if sent_at <= deadline:
+                self._unacked[seq] = (packet, now, True)
+                self._transmit(packet)
+                count += 1
+
+        self.resent += count
+        return count
+
+    @property
+    def rto(self) -> float:
+        rtt = 0.05 if self.rtt is None else self.rtt
+        return min(max(2 * rtt, self.min_rto), self.max_rto)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'sent': self.sent,
+            'received': self.received,
+            'stale': self.stale,
+            'duplicates': self.duplicates,
+            'resent': self.resent,
+            'unacked': len(self._unacked),
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'rtt_ms': (self.rtt or 0.0) * 1000
+        }
+
+    def _receive(self, block: bool) -> None:
+        self.resend()
+
+        while True:
+            self._drain()
+            if self._ready or not block:
+                return
+
+            select.select([self.sock], [], [], self.rto)
+            self.resend()
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                size = self.sock.recv_into(self._recv_buffer)
+            except (BlockingIOError, InterruptedError):
+                return
+
+            self.bytes_received += size
+            self._handle(self._recv_view[:size])
+
+    def _handle(self, packet: memoryview) -> None:
+        if len(packet) < PACKET_SIZE:
+            return
+
+        channel, seq, ack = PACKET.unpack_from(packet)
+        self._acknowledge(ack)
+
+        if channel == UNRELIABLE:
+            if seq <= self._remote_seq:
+                self.stale += 1
+                return
+
+            self._remote_seq = seq
+            self._ready.append(bytes(packet[PACKET_SIZE:]))
+            self.received += 1
+        elif channel == RELIABLE:
+            self._receive_reliable(seq, packet)
+            self._transmit(PACKET.pack(ACK, seq, self._remote_reliable))
+        elif channel == ACK:
+            self._acknowledge_one(seq)
+        elif channel == CLOSE:
+            raise ConnectionResetError('Connection closed by peer.')
+
+    def _receive_reliable(self, seq: int, packet: memoryview) -> None:
+        if seq <= self._remote_reliable or seq in self._early:
+            self.duplicates += 1
+            return
+        if seq > self._remote_reliable + self.max_pending:
+            return
+
+        self._early[seq] = bytes(packet[PACKET_SIZE:])
+
+        while self._remote_reliable + 1 in self._early:
+            self._remote_reliable += 1
+            self._ready.append(self._early.pop(self._remote_reliable))
+            self.received += 1
+
+    def _acknowledge(self, ack: int) -> None:
+        while self._unacked:
+            seq = next(iter(self._unacked))
+            if seq > ack:
+                break
+            del self._unacked[seq]
+
+    def _acknowledge_one(self, seq: int) -> None:
+        entry = self._unacked.pop(seq, None)
+        if entry is None or entry[2]:
+            return
+
+        sample = time.perf_counter() - entry[1]
+        self.rtt = (
+            sample if self.rtt is None else self.rtt * 0.875 + sample * 0.125
+        )
+
+    def _transmit(self, packet: bytes) -> None:
+        try:
+            self.bytes_sent += self.sock.send(packet)
+        except (BlockingIOError, InterruptedError):
+            # A full send buffer loses the packet like the network would.
+            pass
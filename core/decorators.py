@@ -1,13 +1,31 @@
-import threading
 import functools
 
+from core.tasks import Task, pool
 
-def run_is_thread(func):
-    @functools.wraps(func)
-    def wrapper(self, *args, **kwargs):
-        thread = threading.Thread(
-            target=lambda: func(self, *args, **kwargs)
-        )
-        thread.start()
 
-    return wrapper
\ No newline at end of file
+def run_in_pool(
+    name: str | None = None,
+    timeout: float | None = None,
+    on_result: str | None = None,
+    on_error: str | None = None
+):
+    """Run a method as a named task on the shared pool.
+
+    Calls return the Task, or the one already running under the same
+    name. ``on_result`` and ``on_error`` name methods of the instance to
+    call back through the pool's dispatch.
+    """
+    def decorator(func):
+        task_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs) -> Task:
+            return pool.submit(
+                task_name, func, (self, *args), kwargs, timeout,
+                on_result and getattr(self, on_result),
+                on_error and getattr(self, on_error)
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,469 @@
+from typing import (
+    Tuple, List, Dict, Sequence, Mapping, Hashable, NamedTuple, Protocol
+)
+
+from core.pools import ObjectPool
+from core.spatial import Collider, CollisionGrid
+from core.entities import EntityManager, Bullet, Enemy, KINDS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ROLES: Tuple[str, ...] = ('host', 'client')
+ROW_STRIDE = 1 << 20
+CELL_SIZE = 64
+
+
+class EntitySpec(NamedTuple):
+    size: Tuple[int, int]
+    img: str
+    speed: int
+
+
+class ScoreCounter(Protocol):
+    def add_score(self, score_count: int = 1) -> None: ...
+
+    def subtract_score(self, score_count: int = 1) -> None: ...
+
+
+class Target(Collider, Protocol):
+    score_counter: ScoreCounter
+
+
+class ObjectEngine:
+    """Per-object simulation: one pooled Bullet/Enemy instance per entity."""
+
+    name = 'objects'
+
+    def __init__(
+        self,
+        bounds: Tuple[int, int],
+        bullet: EntitySpec,
+        enemy: EntitySpec,
+        max_bullets: int = 512,
+        max_enemies: int = 256
+    ) -> None:
+        self.bullet = bullet
+        self.enemy = enemy
+        self.grid = CollisionGrid(bounds, CELL_SIZE)
+        self.entities = EntityManager(
+            bounds,
+            max_bullets,
+            max_enemies,
+            pools={
+                'bullets': ObjectPool(lambda: Bullet(
+                    (0, 0), bullet.size, 'host', bullet.speed
+                )),
+                'enemies': ObjectPool(lambda: Enemy(
+                    (0, 0), enemy.size, enemy.speed
+                ))
+            }
+        )
+
+    def reserve(self) -> None:
+        self.entities.reserve()
+
+    def clear(self) -> None:
+        self.entities.clear()
+
+    def spawn_bullet(
+        self,
+        x: int,
+        y: int,
+        role: Hashable
+    ) -> None:
+        self.entities.spawn('bullets', (x, y), role=role)
+
+    def spawn_enemy(self, x: int, y: int) -> None:
+        self.entities.spawn('enemies', (x, y))
+
+    def step(self) -> None:
+        for enemy in self.entities.enemies:
+            enemy.move()
+
+        for bullet in self.entities.bullets:
+            bullet.move()
+
+    def collide(
+        self,
+        players: Sequence[Target],
+        scores: Mapping[str, ScoreCounter]
+    ) -> None:
+        self.grid.rebuild(self.entities.enemies)
+        hit_enemies = set()
+        spent_bullets = set()
+
+        for player in players:
+            for enemy in self.grid.query(player.rect):
+                player.score_counter.subtract_score()
+                hit_enemies.add(enemy)
+
+        for bullet in self.entities.bullets:
+            enemy = self.grid.first(bullet.rect, hit_enemies)
+            if enemy is not None:
+                hit_enemies.add(enemy)
+                spent_bullets.add(bullet)
+                counter = scores.get(bullet.role)
+                if counter is not None:
+                    counter.add_score()
+
+        self.entities.sweep(spent_bullets, hit_enemies)
+
+    def positions(self, kind: str, dy: int = 0) -> List[Tuple[int, int]]:
+        return [
+            (item.rect.x, item.rect.y + dy)
+            for item in getattr(self.entities, kind)
+        ]
+
+    def dump(self, kind: str) -> List[Tuple[int, int, Hashable]]:
+        """Positions and owning roles (None for enemies), oldest first."""
+        return [
+            (item.rect.x, item.rect.y, getattr(item, 'role', None))
+            for item in getattr(self.entities, kind)
+        ]
+
+    def live(self) -> Dict[str, int]:
+        return self.entities.live()
+
+    def stats(self) -> Dict[str, dict]:
+        return self.entities.stats()
+
+
+class _Columns:
+    def __init__(self, capacity: int, speed: int) -> None:
+        self.count = 0
+        self.x = np.zeros(capacity, np.int32)
+        self.y = np.zeros(capacity, np.int32)
+        self.vy = np.full(capacity, speed, np.int32)
+        self.owner = np.zeros(capacity, np.int32)
+        self.alive = np.zeros(capacity, np.bool_)
+
+    def append(self, x: int, y: int, vy: int, owner: int) -> None:
+        index = self.count
+        self.x[index], self.y[index] = x, y
+        self.vy[index] = vy
+        self.owner[index] = owner
+        self.alive[index] = True
+        self.count += 1
+
+    def drop_oldest(self) -> None:
+        self.compact(np.arange(1, self.count))
+
+    def compact(self, keep: 'np.ndarray') -> None:
+        count = len(keep)
+
+        for column in (self.x, self.y, self.vy, self.owner, self.alive):
+            column[:count] = column[keep]
+
+        self.count = count
+
+
+class ArrayEngine:
+    """Structure-of-arrays simulation backed by NumPy.
+
+    Movement, culling and bullet/enemy overlap tests run as batched array
+    operations. For overlaps, enemies are sorted by a key made of their
+    16px row band and x; every bullet then ``searchsorted``s that key in
+    each band it can reach for the enemies overlapping it horizontally,
+    and only those pairs are compared on y. Hits are resolved in the
+    same order as ObjectEngine (bullets oldest first, each taking the
+    first free enemy in CollisionGrid cell order), so both engines score
+    alike. Hits and culls clear ``alive`` and dead rows are compacted at
+    the end of ``collide``.
+    """
+
+    name = 'numpy'
+
+    def __init__(
+        self,
+        bounds: Tuple[int, int],
+        bullet: EntitySpec,
+        enemy: EntitySpec,
+        max_bullets: int = 512,
+        max_enemies: int = 256
+    ) -> None:
+        if np is None:
+            raise RuntimeError('The numpy engine requires numpy.')
+
+        self.bounds = bounds
+        self.bullet = bullet
+        self.enemy = enemy
+        self.row_height = 16
+        self.limits: Dict[str, int] = {
+            'bullets': max_bullets,
+            'enemies': max_enemies
+        }
+        self.bullets = _Columns(max_bullets, -bullet.speed)
+        self.enemies = _Columns(max_enemies, enemy.speed)
+        self.peak: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.culled: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.dropped: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.roles: List[Hashable] = list(ROLES)
+        self._owners: Dict[Hashable, int] = {
+            role: index for index, role in enumerate(self.roles)
+        }
+
+    def reserve(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        self.bullets.count = self.enemies.count = 0
+
+    def spawn_bullet(
+        self,
+        x: int,
+        y: int,
+        role: Hashable
+    ) -> None:
+        self._append(
+            'bullets', self.bullets, x, y,
+            -self.bullet.speed, self._owner(role)
+        )
+
+    def spawn_enemy(self, x: int, y: int) -> None:
+        self._append('enemies', self.enemies, x, y, self.enemy.speed, -1)
+
+    def step(self) -> None:
+        for columns in (self.bullets, self.enemies):
+            count = columns.count
+            columns.y[:count] += columns.vy[:count]
+
+    def collide(
+        self,
+        players: Sequence[Target],
+        scores: Mapping[str, ScoreCounter]
+    ) -> None:
+        bullets, enemies = self.bullets, self.enemies
+        bullet_count, enemy_count = bullets.count, enemies.count
+        bullet_w, bullet_h = self.bullet.size
+        enemy_w, enemy_h = self.enemy.size
+
+        ex = enemies.x[:enemy_count]
+        ey = enemies.y[:enemy_count]
+        enemy_keep = enemies.alive[:enemy_count]
+        enemy_keep &= self._in_bounds(ex, ey, self.enemy.size)
+        self.culled['enemies'] += enemy_count - int(enemy_keep.sum())
+
+        for player in players:
+            rect = player.rect
+            touching = (
+                (ex < rect.x + rect.width) & (rect.x < ex + enemy_w)
+                & (ey < rect.y + rect.height) & (rect.y < ey + enemy_h)
+            )
+            for _ in range(int(touching.sum())):
+                player.score_counter.subtract_score()
+            enemy_keep &= ~touching
+
+        bx = bullets.x[:bullet_count]
+        by = bullets.y[:bullet_count]
+        bullet_keep = bullets.alive[:bullet_count]
+        bullet_keep &= self._in_bounds(bx, by, self.bullet.size)
+        self.culled['bullets'] += bullet_count - int(bullet_keep.sum())
+
+        candidates = np.flatnonzero(enemy_keep)
+        if bullet_count and len(candidates):
+            bullet_index, enemy_index = self._overlapping_pairs(
+                bx, by, ex, ey, candidates
+            )
+
+            bullet_index, enemy_index = self._first_hits(
+                bx, by, ex, ey, bullet_index, enemy_index
+            )
+
+            bullet_keep[bullet_index] = False
+            enemy_keep[enemy_index] = False
+
+            kills = np.bincount(
+                bullets.owner[bullet_index], minlength=len(self.roles)
+            )
+            for role, count in zip(self.roles, kills.tolist()):
+                counter = scores.get(role)
+                if count and counter is not None:
+                    counter.add_score(count)
+
+        bullets.compact(np.flatnonzero(bullet_keep))
+        enemies.compact(np.flatnonzero(enemy_keep))
+
+    def positions(self, kind: str, dy: int = 0) -> List[Tuple[int, int]]:
+        columns = getattr(self, kind)
+        count = columns.count
+
+        return list(zip(
+            columns.x[:count].tolist(), (columns.y[:count] + dy).tolist()
+        ))
+
+    def dump(self, kind: str) -> List[Tuple[int, int, Hashable]]:
+        columns = getattr(self, kind)
+        count = columns.count
+        roles = self.roles
+
+        return [
+            (x, y, roles[owner] if owner >= 0 else None)
+            for x, y, owner in zip(
+                columns.x[:count].tolist(), columns.y[:count].tolist(),
+                columns.owner[:count].tolist()
+            )
+        ]
+
+    def live(self) -> Dict[str, int]:
+        return {'bullets': self.bullets.count, 'enemies': self.enemies.count}
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            'live': self.live(),
+            'peak': dict(self.peak),
+            'culled': dict(self.culled),
+            'dropped': dict(self.dropped)
+        }
+
+    def _append(
+        self,
+        kind: str,
+        columns: _Columns,
+        x: int,
+        y: int,
+        vy: int,
+        owner: int
+    ) -> None:
+        if columns.count == self.limits[kind]:
+            columns.drop_oldest()
+            self.dropped[kind] += 1
+
+        columns.append(x, y, vy, owner)
+        self.peak[kind] = max(self.peak[kind], columns.count)
+
+    def _owner(self, role: Hashable) -> int:
+        owner = self._owners.get(role)
+
+        if owner is None:
+            owner = self._owners[role] = len(self.roles)
+            self.roles.append(role)
+
+        return owner
+
+    def _overlapping_pairs(
+        self,
+        bx: 'np.ndarray',
+        by: 'np.ndarray',
+        ex: 'np.ndarray',
+        ey: 'np.ndarray',
+        candidates: 'np.ndarray'
+    ) -> Tuple['np.ndarray', 'np.ndarray']:
+        bullet_w, bullet_h = self.bullet.size
+        enemy_w, enemy_h = self.enemy.size
+        band = self.row_height
+        margin = enemy_w + bullet_w
+
+        keys = (ey[candidates] // band).astype(np.int64) * ROW_STRIDE
+        keys += ex[candidates] + margin
+        order = np.argsort(keys, kind='stable')
+        keys, candidates = keys[order], candidates[order]
+
+        first_row = (by - enemy_h + 1) // band
+        last_row = (by + bullet_h - 1) // band
+        bullet_ids = np.arange(len(bx))
+        bullet_parts, enemy_parts = [], []
+
+        for offset in range((enemy_h + bullet_h - 2) // band + 2):
+            row = first_row + offset
+            base = row.astype(np.int64) * ROW_STRIDE + bx + margin
+            low = np.searchsorted(keys, base - enemy_w, side='right')
+            high = np.searchsorted(keys, base + bullet_w, side='left')
+            counts = np.where(row <= last_row, np.maximum(high - low, 0), 0)
+            total = int(counts.sum())
+            if not total:
+                continue
+
+            starts = np.repeat(low - (np.cumsum(counts) - counts), counts)
+            bullet_parts.append(np.repeat(bullet_ids, counts))
+            enemy_parts.append(candidates[starts + np.arange(total)])
+
+        if not bullet_parts:
+            empty = np.zeros(0, np.intp)
+            return empty, empty
+
+        bullet_index = np.concatenate(bullet_parts)
+        enemy_index = np.concatenate(enemy_parts)
+        overlap = (
+            (ey[enemy_index] < by[bullet_index] + bullet_h)
+            & (by[bullet_index] < ey[enemy_index] + enemy_h)
+        )
+
+        return bullet_index[overlap], enemy_index[overlap]
+
+    def _first_hits(
+        self,
+        bx: 'np.ndarray',
+        by: 'np.ndarray',
+        ex: 'np.ndarray',
+        ey: 'np.ndarray',
+        bullet_index: 'np.ndarray',
+        enemy_index: 'np.ndarray'
+    ) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Pick one enemy per bullet the way ObjectEngine does: bullets in
+        order, each taking the first free enemy CollisionGrid.first would
+        return, which is the first shared cell in row-major order and
+        then the oldest enemy."""
+        columns = -(-self.bounds[0] // CELL_SIZE)
+        rows = -(-self.bounds[1] // CELL_SIZE)
+        row = np.maximum(
+            np.clip(by[bullet_index] // CELL_SIZE, 0, rows - 1),
+            np.clip(ey[enemy_index] // CELL_SIZE, 0, rows - 1)
+        )
+        column = np.maximum(
+            np.clip(bx[bullet_index] // CELL_SIZE, 0, columns - 1),
+            np.clip(ex[enemy_index] // CELL_SIZE, 0, columns - 1)
+        )
+        keys = (row.astype(np.int64) * columns + column) * len(ex)
+        keys += enemy_index
+
+        order = np.lexsort((keys, bullet_index))
+        bullet_index, enemy_index = bullet_index[order], enemy_index[order]
+        first = np.flatnonzero(np.diff(bullet_index, prepend=-1))
+        if len(np.unique(enemy_index[first])) == len(first):
+            return bullet_index[first], enemy_index[first]
+
+        used = set()
+        hit_bullets, hit_enemies = [], []
+        for bullet, enemy in zip(bullet_index.tolist(), enemy_index.tolist()):
+            if enemy in used or (hit_bullets and hit_bullets[-1] == bullet):
+                continue
+            used.add(enemy)
+            hit_bullets.append(bullet)
+            hit_enemies.append(enemy)
+
+        return (
+            np.array(hit_bullets, np.intp), np.array(hit_enemies, np.intp)
+        )
+
+    def _in_bounds(
+        self,
+        x: 'np.ndarray',
+        y: 'np.ndarray',
+        size: Tuple[int, int]
+    ) -> 'np.ndarray':
+        width, height = self.bounds
+        return (
+            (x + size[0] > 0) & (x < width)
+            & (y + size[1] > 0) & (y < height)
+        )
+
+
+ENGINES = {ObjectEngine.name: ObjectEngine, ArrayEngine.name: ArrayEngine}
+
+
+def create_engine(
+    name: str,
+    bounds: Tuple[int, int],
+    bullet: EntitySpec,
+    enemy: EntitySpec,
+    **limits: int
+) -> ObjectEngine | ArrayEngine:
+    try:
+        engine_type = ENGINES[name]
+    except KeyError:
+        raise ValueError(f'Unknown simulation engine: {name}.') from None
+
+    return engine_type(bounds, bullet, enemy, **limits)
@@ -0,0 +1,160 @@
+from typing import Tuple, List, Dict, Collection, Literal, Any
+
+from core.pools import ObjectPool
+from core.spatial import Box, Collider
+
+KINDS = ('bullets', 'enemies')
+
+
+class Entity:
+    __slots__ = ('rect', 'speed')
+
+    def __init__(
+        self,
+        position: Tuple[int, int],
+        size: Tuple[int, int],
+        speed: int = 5
+    ) -> None:
+        self.rect = Box(*position, *size)
+        self.speed = speed
+
+    def reset(self, position: Tuple[int, int], **state: Any) -> None:
+        self.rect.x, self.rect.y = position
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+
+class Bullet(Entity):
+    __slots__ = ('role',)
+
+    def __init__(
+        self,
+        position: Tuple[int, int],
+        size: Tuple[int, int],
+        role: Literal['host', 'client'],
+        speed: int = 1
+    ) -> None:
+        super().__init__(position, size, speed)
+        self.role = role
+
+    def move(self) -> None:
+        self.rect.y -= self.speed
+
+
+class Enemy(Entity):
+    __slots__ = ()
+
+    def move(self) -> None:
+        self.rect.y += self.speed
+
+
+class EntityManager:
+    """Owns live bullets and enemies and keeps both collections bounded."""
+
+    def __init__(
+        self,
+        bounds: Tuple[int, int],
+        max_bullets: int = 512,
+        max_enemies: int = 256,
+        pools: Dict[str, ObjectPool] | None = None
+    ) -> None:
+        self.bounds = bounds
+        self.pools: Dict[str, ObjectPool] = pools or {}
+        self.limits: Dict[str, int] = {
+            'bullets': max_bullets,
+            'enemies': max_enemies
+        }
+        self.bullets: List[Collider] = []
+        self.enemies: List[Collider] = []
+        self.peak: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.culled: Dict[str, int] = dict.fromkeys(KINDS, 0)
+        self.dropped: Dict[str, int] = dict.fromkeys(KINDS, 0)
+
+    def spawn(
+        self,
+        kind: str,
+        position: Tuple[int, int],
+        **state: Any
+    ) -> Collider:
+        entity = self.pools[kind].acquire(position, **state)
+        self._add(kind, getattr(self, kind), entity)
+
+        return entity
+
+    def reserve(self) -> None:
+        for kind, pool in self.pools.items():
+            pool.reserve(self.limits[kind])
+
+    def sweep(
+        self,
+        dead_bullets: Collection[Collider] = (),
+        dead_enemies: Collection[Collider] = ()
+    ) -> None:
+        self.bullets[:] = self._survivors(
+            'bullets', self.bullets, dead_bullets
+        )
+        self.enemies[:] = self._survivors(
+            'enemies', self.enemies, dead_enemies
+        )
+
+    def live(self) -> Dict[str, int]:
+        return {'bullets': len(self.bullets), 'enemies': len(self.enemies)}
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            'live': self.live(),
+            'peak': dict(self.peak),
+            'culled': dict(self.culled),
+            'dropped': dict(self.dropped),
+            'pools': {
+                kind: pool.stats() for kind, pool in self.pools.items()
+            }
+        }
+
+    def clear(self) -> None:
+        for kind in KINDS:
+            items = getattr(self, kind)
+            for item in items:
+                self._release(kind, item)
+            items.clear()
+
+    def _add(self, kind: str, items: List[Collider], entity: Collider) -> None:
+        items.append(entity)
+
+        if len(items) > self.limits[kind]:
+            self._release(kind, items.pop(0))
+            self.dropped[kind] += 1
+
+        if len(items) > self.peak[kind]:
+            self.peak[kind] = len(items)
+
+    def _survivors(
+        self,
+        kind: str,
+        items: List[Collider],
+        dead: Collection[Collider]
+    ) -> List[Collider]:
+        width, height = self.bounds
+        survivors = []
+
+        for item in items:
+            rect = item.rect
+            if (
+                rect.x + rect.width <= 0 or rect.x >= width
+                or rect.y + rect.height <= 0 or rect.y >= height
+            ):
+                self.culled[kind] += 1
+                self._release(kind, item)
+            elif item in dead:
+                self._release(kind, item)
+            else:
+                survivors.append(item)
+
+        return survivors
+
+    def _release(self, kind: str, item: Collider) -> None:
+        pool = self.pools.get(kind)
+
+        if pool is not None:
+            pool.release(item)
@@ -0,0 +1,94 @@
+from collections import OrderedDict
+from typing import Tuple, Dict
+
+from pygame import Surface, font
+
+FontKey = Tuple[str | None, int]
+TextKey = Tuple[FontKey, str, Tuple[int, int, int], bool]
+
+
+class FontRegistry:
+    """One pygame font per (name, size), resolved on first use."""
+
+    def __init__(self) -> None:
+        self.loads = 0
+        self._fonts: Dict[FontKey, font.Font] = {}
+
+    def __len__(self) -> int:
+        return len(self._fonts)
+
+    def get(self, name: str | None, size: int) -> font.Font:
+        key = (name, size)
+        loaded = self._fonts.get(key)
+
+        if loaded is None:
+            if not font.get_init():
+                font.init()
+            loaded = self._fonts[key] = font.SysFont(name, size)
+            self.loads += 1
+
+        return loaded
+
+    def clear(self) -> None:
+        self._fonts.clear()
+
+
+class TextCache:
+    """LRU of rendered strings; ``renders`` counts real font.render calls."""
+
+    def __init__(self, registry: FontRegistry, max_size: int = 256) -> None:
+        self.registry = registry
+        self.max_size = max_size
+        self.renders = 0
+        self.hits = 0
+        self.evictions = 0
+        self._surfaces: OrderedDict[TextKey, Surface] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def render(
+        self,
+        text: str,
+        name: str | None,
+        size: int,
+        color: Tuple[int, int, int] = (255, 255, 255),
+        antialias: bool = True
+    ) -> Surface:
+        key = ((name, size), text, tuple(color), antialias)
+        surface = self._surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.renders += 1
+        surface = self.registry.get(name, size).render(text, antialias, color)
+        self._surfaces[key] = surface
+
+        if len(self._surfaces) > self.max_size:
+            self._surfaces.popitem(last=False)
+            self.evictions += 1
+
+        return surface
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def reset_stats(self) -> None:
+        self.renders = self.hits = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'fonts': len(self.registry),
+            'font_loads': self.registry.loads,
+            'size': len(self._surfaces),
+            'renders': self.renders,
+            'hits': self.hits,
+            'evictions': self.evictions
+        }
+
+
+fonts = FontRegistry()
+text_cache = TextCache(fonts)
@@ -0,0 +1,179 @@
+import socket
+import struct
+from typing import List
+
+HEADER = struct.Struct('!I')
+HEADER_SIZE = HEADER.size
+MAX_FRAME_SIZE = 16 * 1024 * 1024
+
+
+class FrameError(ConnectionError):
+    pass
+
+
+class FramedSocket:
+    def __init__(
+        self,
+        sock: socket.socket,
+        buffer_size: int = 64 * 1024,
+        max_frame_size: int = MAX_FRAME_SIZE
+    ) -> None:
+        self.sock = sock
+        self.max_frame_size = max_frame_size
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._recv_buffer = bytearray(buffer_size)
+        self._recv_view = memoryview(self._recv_buffer)
+        self._send_buffer = bytearray(buffer_size)
+        self._start = 0
+        self._end = 0
+
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def fileno(self) -> int:
+        return self.sock.fileno()
+
+    def close(self) -> None:
+        self.sock.close()
+
+    def send_frame(
+        self,
+        payload: bytes | bytearray | memoryview,
+        reliable: bool = True
+    ) -> int:
+        """Send one frame; over TCP every frame is reliable."""
+        size = len(payload)
+        total = HEADER_SIZE + size
+
+        if size > self.max_frame_size:
+            raise FrameError(f'Frame of {size} bytes exceeds the limit.')
+        if total > len(self._send_buffer):
+            self._send_buffer = bytearray(
+                _grow(len(self._send_buffer), total)
+            )
+
+        HEADER.pack_into(self._send_buffer, 0, size)
+        self._send_buffer[HEADER_SIZE:total] = payload
+
+        with memoryview(self._send_buffer) as view:
+            self.sock.sendall(view[:total])
+
+        self.bytes_sent += total
+        return total
+
+    def recv_frames(self, block: bool = True) -> List[memoryview]:
+        """Return every complete frame that has arrived so far.
+
+        The views point into the receive buffer and are only valid until
+        the next call.
+        """
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        if block:
+            while not self._has_frame():
+                self._fill(True)
+
+        while self._fill(False):
+            pass
+
+        return self._split_frames()
+
+    def recv_frame(self, block: bool = True) -> memoryview | None:
+        """Return the next frame, or None if ``block`` is off and none
+        has arrived. Frames behind it stay buffered for the next receive
+        call."""
+        if self._start == self._end:
+            self._start = self._end = 0
+
+        while not self._has_frame():
+            if not self._fill(block) and not block:
+                return None
+
+        return self._split_frames(1)[0]
+
+    def resend(self) -> int:
+        """TCP retransmits on its own, so there is never anything to do."""
+        return 0
+
+    def _has_frame(self) -> bool:
+        if self._end - self._start < HEADER_SIZE:
+            return False
+
+        (size,) = HEADER.unpack_from(self._recv_buffer, self._start)
+        return self._end - self._start >= HEADER_SIZE + size
+
+    def _fill(self, block: bool) -> bool:
+        if self._end == len(self._recv_buffer) and not self._make_room():
+            return False
+
+        timeout = self.sock.gettimeout()
+        try:
+            if not block:
+                self.sock.setblocking(False)
+            received = self.sock.recv_into(self._recv_view[self._end:])
+        except (BlockingIOError, InterruptedError):
+            return False
+        finally:
+            if not block:
+                self.sock.settimeout(timeout)
+
+        if not received:
+            raise ConnectionResetError('Connection closed by peer.')
+
+        self._end += received
+        self.bytes_received += received
+        return True
+
+    def _split_frames(self, limit: int | None = None) -> List[memoryview]:
+        frames = []
+        position = self._start
+
+        while self._end - position >= HEADER_SIZE and limit != len(frames):
+            (size,) = HEADER.unpack_from(self._recv_buffer, position)
+
+            if size > self.max_frame_size:
+                raise FrameError(f'Frame of {size} bytes exceeds the limit.')
+
+            frame_end = position + HEADER_SIZE + size
+            if frame_end > self._end:
+                break
+
+            frames.append(self._recv_view[position + HEADER_SIZE:frame_end])
+            position = frame_end
+
+        self._start = position
+        return frames
+
+    def _make_room(self) -> bool:
+        pending = self._end - self._start
+
+        if pending >= HEADER_SIZE:
+            (size,) = HEADER.unpack_from(self._recv_buffer, self._start)
+            needed = HEADER_SIZE + size
+        else:
+            needed = HEADER_SIZE
+
+        if needed > self.max_frame_size + HEADER_SIZE:
+            raise FrameError(f'Frame of {needed} bytes exceeds the limit.')
+
+        if needed > len(self._recv_buffer):
+            buffer = bytearray(_grow(len(self._recv_buffer), needed))
+            buffer[:pending] = self._recv_view[self._start:self._end]
+            self._recv_buffer = buffer
+            self._recv_view = memoryview(buffer)
+        elif self._start:
+            self._recv_view[:pending] = self._recv_view[self._start:self._end]
+        else:
+            return False
+
+        self._start, self._end = 0, pending
+        return True
+
+
+def _grow(size: int, needed: int) -> int:
+    while size < needed:
+        size *= 2
+
+    return size
@@ -1,39 +1,151 @@
-from typing import Literal, List
+import gc
+import time as tm
+from typing import Literal, List, Dict
 
 from pygame import *
-from pygame.sprite import collide_rect
 
+from core.assets import assets
 from core.server import Host, Client
-from core.objects.game_objects import Player, Bullet, Enemy, PlayerScore
-
-FPS = 30
-win_size = (700, 500)
-bullet_size = (40, 20)
-enemy_size = (50, 50)
-bullet_speed = 7
+from core.network import NetworkWorker, SendRate
+from core.prediction import InputPredictor, InputAuthority
+from core.lockstep import LockstepSession
+from core.engines import EntitySpec
+from core.simulation import ARENA, PLAYER_SIZE, BULLET, ENEMY, GameState
+from core.timing import FixedTimestep
+from core.render import Layer, create_renderer
+from core.pools import GcMonitor
+from core.profiler import FrameProfiler, DisabledProfiler
+from core.telemetry import MetricsWriter
+from core.replay import Recorder, DisabledRecorder
+from core.objects.game_objects import (
+    Player, PlayerScore, ProfilerOverlay, pack_keys
+)
+
+TICK_RATE = 30
+SEND_RATE = 20
+RENDER_FPS = 60
+VSYNC = False
+TRANSPORT = 'tcp'
+METRICS_PATH: str | None = None
+RECORD_PATH: str | None = None
+interpolation_delay = 0.1
+win_size = ARENA
+bullet_size = BULLET.size
+enemy_size = ENEMY.size
+player_size = PLAYER_SIZE
+preload_assets = (
+    ('image/bg.png', win_size, False),
+    ('image/player.png', player_size, True),
+    ('image/player.png', enemy_size, True),
+    ('image/bullet.png', bullet_size, True)
+)
+entity_specs: Dict[str, EntitySpec] = {'enemies': ENEMY, 'bullets': BULLET}
 
 clock = time.Clock()
-host = Host()
-client = Client()
+host = Host(transport=TRANSPORT)
+client = Client(transport=TRANSPORT)
 
-bullets: List[Bullet] = []
-enemies: List[Enemy] = []
-enemy_to_remove = []
+state = GameState('objects', tick_rate=TICK_RATE)
+gc_monitor = GcMonitor()
 data = {}
 
 
+def open_window(vsync: bool = False) -> Surface:
+    if vsync:
+        try:
+            return display.set_mode(win_size, SCALED, vsync=1)
+        except error:
+            pass
+
+    return display.set_mode(win_size)
+
+
+def entity_layers(game_state: GameState, alpha: float = 1.0) -> List[Layer]:
+    return [
+        (
+            assets.get(spec.img, spec.size),
+            game_state.positions(kind, alpha)
+        )
+        for kind, spec in entity_specs.items()
+    ]
+
+
+def trace_path(path: str) -> str:
+    stem, dot, extension = path.rpartition('.')
+    return f'{stem}.trace.{extension}' if dot else f'{path}.trace.json'
+
+
 def run_game(
     user_type: Literal['host', 'client'],
-    status: bool = True
+    status: bool = True,
+    engine_name: Literal['objects', 'numpy'] = 'objects',
+    tick_rate: int = TICK_RATE,
+    send_rate: int = SEND_RATE,
+    render_fps: int = RENDER_FPS,
+    vsync: bool = VSYNC,
+    renderer_name: Literal['dirty', 'full'] = 'dirty',
+    mode: Literal['snapshot', 'lockstep'] = 'snapshot',
+    profile: str | None = None,
+    metrics: str | None = METRICS_PATH,
+    record: str | None = RECORD_PATH
 ) -> None:
+    """Run one match.
+
+    The simulation advances in fixed ticks of ``tick_rate`` per second,
+    snapshots go out at an adaptive rate starting from ``send_rate`` and
+    frames are drawn at ``render_fps`` (0 for uncapped, or paced by the
+    display when ``vsync`` is available).
+
+    In ``'lockstep'`` mode both peers run the whole simulation from a
+    shared seed and only exchange inputs (see LockstepSession).
+
+    With ``profile`` set to a path, every frame is timed per phase; F3
+    toggles an overlay, and on exit percentiles, slow frames and GC
+    counters are written to that path and a Chrome trace next to it.
+
+    With ``metrics`` set to a path, the connection telemetry and GC
+    counters are appended there once a second, in a rotating JSON lines
+    file.
+
+    With ``record`` set to a path, the match is logged there for
+    ``python -m core.replay``.
+    """
+    global state
+
     font.init()
     init()
 
-    window = display.set_mode(win_size)
+    window = open_window(vsync)
     display.set_caption('Online Pvp')
 
-    h_port = str(host.port) if host.port else None
-    c_port = str(client.port) if client.port else None
+    assets.convert_all()
+    assets.preload(preload_assets)
+    assets.reset_stats()
+    background = assets.get('image/bg.png', win_size, alpha=False)
+    connection = host if user_type == 'host' else client
+    lockstep = None
+    if mode == 'lockstep':
+        connection.snapshots = None
+        if user_type == 'client':
+            lockstep = connection.get_data()['lockstep']
+            engine_name = lockstep['engine']
+            tick_rate = lockstep['tick_rate']
+
+    if state.engine.name != engine_name or state.tick_rate != tick_rate:
+        state = GameState(engine_name, tick_rate=tick_rate)
+    if mode == 'lockstep' and user_type == 'host':
+        settings = LockstepSession.setup(state)
+        connection.send(settings)
+        lockstep = settings['lockstep']
+    state.reset(lockstep and lockstep['seed'])
+    state.spawn_enemies = lockstep is not None or user_type == 'host'
+    state.engine.reserve()
+    gc.collect()
+    gc.freeze()
+    gc_monitor.start()
+
+    h_port = host.port or None
+    c_port = client.port or None
 
     player_one_score = PlayerScore(
         'Игрок 1. Score: 0',
@@ -48,145 +160,205 @@ def run_game(
     )
 
     player_one = Player(
-        (150, 150),
-        (60, 60),
+        state.players['host'].position,
+        player_size,
         'image/player.png',
         player_one_score
     )
 
     player_two = Player(
-        (300, 150),
-        (60, 60),
+        state.players['client'].position,
+        player_size,
         'image/player.png',
         player_two_score
     )
 
+    port = h_port if user_type == 'host' else c_port
+    remote_role = 'client' if user_type == 'host' else 'host'
+    local_state = state.players[user_type]
+    remote_state = state.players[remote_role]
+    players = sprite.Group(player_two, player_one)
+    scores = (player_one_score, player_two_score)
+    renderer = create_renderer(renderer_name, window, background)
+    views = (
+        (state.players['host'], player_one, player_one_score),
+        (state.players['client'], player_two, player_two_score)
+    )
+
+    recorder = (
+        Recorder(record, state, role=user_type, mode=mode)
+        if record else DisabledRecorder()
+    )
+    session = lockstep and LockstepSession(
+        state, user_type, remote_role,
+        lockstep['delay'], lockstep['hash_interval'],
+        on_step=lambda inputs: recorder.record_step(state, inputs)
+    )
+    predictor = (
+        InputPredictor(local_state.speed)
+        if user_type == 'client' and session is None else None
+    )
+    authority = (
+        InputAuthority(remote_state.speed)
+        if user_type == 'host' and session is None else None
+    )
+    peer_rtt = 0.0
+
+    profiler = (
+        FrameProfiler(slow_frame=2 / (render_fps or RENDER_FPS))
+        if profile else DisabledProfiler()
+    )
+    overlay = ProfilerOverlay(profiler) if profiler.enabled else None
+    texts = scores + overlay.lines if overlay is not None else scores
+
+    timestep = FixedTimestep(tick_rate)
+    worker = NetworkWorker(
+        connection,
+        send_rate=SendRate(send_rate, max_rate=max(send_rate, tick_rate))
+    )
+    worker.start()
+    connection.telemetry.watch('worker', worker.queue_depths)
+    metrics_writer = (
+        MetricsWriter([connection.telemetry, gc_monitor], metrics)
+        if metrics else None
+    )
+    if metrics_writer is not None:
+        metrics_writer.start()
+    recorder.start()
+
     try:
         while status:
-            window.blit(
-                source=transform.scale(image.load('image/bg.png'), win_size),
-                dest=(0, 0)
+            profiler.begin()
+            if worker.error is not None:
+                raise worker.error
+
+            for remote_data in worker.drain():
+                if session is not None:
+                    session.receive(remote_data)
+                    continue
+
+                if authority is not None and 'inputs' in remote_data:
+                    remote_state.set_position(*authority.apply(
+                        remote_data['inputs'], *remote_state.position
+                    ))
+                    peer_rtt = remote_data.get('rtt', peer_rtt)
+                    data['input_ack'] = authority.last_processed
+                    data['peer'] = {
+                        'x': remote_state.rect.x,
+                        'y': remote_state.rect.y
+                    }
+
+                if predictor is not None and 'input_ack' in remote_data:
+                    local_state.set_position(*predictor.reconcile(
+                        remote_data['input_ack'],
+                        remote_data['peer']['x'],
+                        remote_data['peer']['y'],
+                        local_state.position
+                    ))
+
+                rtt = predictor.rtt if predictor is not None else peer_rtt
+                lead = round(rtt / 2 * tick_rate)
+                remote_spawns = remote_data.get('spawns')
+                if remote_spawns is None:
+                    continue
+                for position in remote_spawns['enemies'].values():
+                    x = position['x']
+                    y = position['y'] + state.enemy.speed * lead
+                    state.spawn_enemy(x, y)
+                    recorder.record_spawn('enemies', x, y)
+                for position in remote_spawns['bullets'].values():
+                    x = position['x']
+                    y = position['y'] - state.bullet.speed * lead
+                    state.spawn_bullet(x, y, remote_role)
+                    recorder.record_spawn('bullets', x, y, remote_role)
+
+            if session is None and (
+                authority is None or not authority.last_processed
+            ):
+                remote_position = worker.snapshots.position(
+                    tm.perf_counter() - interpolation_delay, port
+                )
+                if remote_position is not None:
+                    remote_state.set_position(*remote_position)
+            profiler.lap('receive')
+
+            bits = pack_keys(key.get_pressed())
+            profiler.lap('input')
+
+            for _ in range(timestep.advance()):
+                if session is not None:
+                    messages = session.tick(bits, profiler.step_timings)
+                    profiler.lap('simulate')
+                    for message in messages:
+                        worker.post(message)
+                    profiler.lap('send')
+                    continue
+
+                if predictor is not None:
+                    predictor.record(bits)
+
+                inputs = {user_type: bits}
+                recorder.record_step(state, inputs, state.players)
+                state.step(inputs, profiler.step_timings)
+                profiler.lap('simulate')
+
+                if predictor is not None:
+                    data['inputs'] = predictor.unacknowledged()
+                    data['rtt'] = predictor.rtt
+
+                data[port] = {
+                    'x': local_state.rect.x,
+                    'y': local_state.rect.y,
+                    'score': local_state.score
+                }
+                worker.submit(data)
+                if any(state.spawned.values()):
+                    worker.post({'spawns': {
+                        kind: dict(table)
+                        for kind, table in state.spawned.items()
+                    }})
+                profiler.lap('send')
+
+            alpha = timestep.alpha
+            for player_state, player, score in views:
+                player.set_position(*(
+                    player_state.interpolate(alpha)
+                    if player_state is local_state or session is not None
+                    else player_state.position
+                ))
+                score.set_score(player_state.score)
+
+            if overlay is not None:
+                overlay.update()
+            renderer.compose(
+                entity_layers(state, alpha), players,
+                texts if overlay is not None and overlay.visible else scores
             )
-
-            player_one_score.draw(window)
-            player_two_score.draw(window)
-
-            keys = key.get_pressed()
-
-            if user_type == 'host':
-                player_one.move(keys)
-                player_one.create_enemy()
-
-                data[h_port] = player_one.data
-                host.send(data)
-                client_data = host.get_data(5345)
-
-                player_two.rect.x = client_data[h_port]['x']
-                player_two.rect.y = client_data[h_port]['y']
-
-                player_two.draw(window)
-                player_one.draw(window)
-
-                player_one_bullets: dict = player_one.data['bullets']
-                player_two_bullets: dict = client_data[h_port]['bullets']
-                all_bullets: dict = player_one_bullets | player_two_bullets
-
-                for enemy_id in player_one.data['enemies'].keys():
-                    enemy_position = player_one.data['enemies'][enemy_id]
-                    enemy = Enemy(
-                        position=(enemy_position['x'], enemy_position['y']),
-                        size=enemy_size,
-                        img='image/player.png'
-                    )
-                    enemies.append(enemy)
-                    enemy_to_remove.append(enemy_id)
-
-                for bullet_id in all_bullets.keys():
-                    x, y = all_bullets[bullet_id]['x'], all_bullets[bullet_id]['y']
-                    role: Literal['host', 'client'] = (
-                        'host' if bullet_id in player_one.data['bullets']
-                        else 'client'
-                    )
-                    bullet = Bullet(
-                        position=(x, y),
-                        size=bullet_size,
-                        img='image/bullet.png',
-                        role=role,
-                        speed=bullet_speed
-                    )
-                    bullets.append(bullet)
-
-                    if bullet_id in player_one.data['bullets']:
-                        del player_one.data['bullets'][bullet_id]
-
-                for enemy_id in enemy_to_remove:
-                    if enemy_id in player_one.data['enemies']:
-                        del player_one.data['enemies'][enemy_id]
-
-            if user_type == 'client':
-                player_two.move(keys)
-
-                data[c_port] = player_two.data
-                client.send(data)
-                host_data = client.get_data(5345)
-
-                player_one.rect.x = host_data[c_port]['x']
-                player_one.rect.y = host_data[c_port]['y']
-
-                player_one.draw(window)
-                player_two.draw(window)
-
-                player_one_bullets: dict = host_data[c_port]['bullets']
-                player_two_bullets: dict = player_two.data['bullets']
-                all_bullets: dict = player_one_bullets | player_two_bullets
-
-                for enemy_id in host_data[c_port]['enemies'].keys():
-                    enemy_coordinates = host_data[c_port]['enemies'][enemy_id]
-                    enemy = Enemy(
-                        position=(enemy_coordinates['x'], enemy_coordinates['y']),
-                        size=enemy_size,
-                        img='image/player.png'
-                    )
-                    enemies.append(enemy)
-
-                for bullet_id in all_bullets.keys():
-                    x, y = all_bullets[bullet_id]['x'], all_bullets[bullet_id]['y']
-                    role: Literal['host', 'client'] = (
-                        'client' if bullet_id in player_two.data['bullets']
-                        else 'host'
-                    )
-                    bullet = Bullet(
-                        position=(x, y),
-                        size=bullet_size,
-                        img='image/bullet.png',
-                        role=role,
-                        speed=bullet_speed
-                    )
-                    bullets.append(bullet)
-
-                    if bullet_id in player_two.data['bullets']:
-                        del player_two.data['bullets'][bullet_id]
-
-            for enemy in enemies:
-                enemy.check_rect_collision([player_one, player_two], enemies)
-                enemy.move()
-                enemy.draw(window)
-
-            for bullet in bullets:
-                bullet.move()
-                bullet.draw(window)
-
-                player_role = bullet.check_rect_collision(enemies, bullets)
-                if player_role == 'host':
-                    player_one_score.add_score()
-                elif player_role == 'client':
-                    player_two_score.add_score()
+            profiler.lap('render')
+            renderer.present()
+            profiler.lap('present')
 
             for e in event.get():
                 if e.type == QUIT:
                     status = False
-
-            display.update()
-            clock.tick(FPS)
-    except ConnectionResetError:
-        return
\ No newline at end of file
+                elif e.type == KEYDOWN and e.key == K_F3:
+                    if overlay is not None:
+                        overlay.visible = not overlay.visible
+            profiler.lap('input')
+
+            clock.tick(render_fps)
+            profiler.lap('idle')
+            profiler.end()
+    except ConnectionError:
+        return
+    finally:
+        if profiler.enabled:
+            profiler.dump(profile, gc=gc_monitor.stats())
+            profiler.dump_trace(trace_path(profile))
+        worker.stop()
+        recorder.stop()
+        if metrics_writer is not None:
+            metrics_writer.stop()
+        connection.telemetry.unwatch('worker')
+        gc_monitor.stop()
+        gc.unfreeze()
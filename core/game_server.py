@@ -0,0 +1,420 @@
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from typing import Callable, Dict, Sequence, Set, Any
+
+from core.pools import IdAllocator
+from core.simulation import GameState
+from core.framing import HEADER, HEADER_SIZE, MAX_FRAME_SIZE, FrameError
+from core.codecs import (
+    Codec, CodecError, DEFAULT_CODECS, get_codec, negotiate
+)
+
+
+class PlayerConnection:
+    """One joined client: its socket streams, codec, inputs and out queue.
+
+    ``push`` never waits. When the client reads slower than the server
+    ticks, the oldest queued state is dropped, since only the newest one
+    matters.
+    """
+
+    def __init__(
+        self,
+        player_id: int,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        codec: Codec,
+        queue_size: int = 8,
+        input_buffer: int = 16
+    ) -> None:
+        self.player_id = player_id
+        self.reader = reader
+        self.writer = writer
+        self.codec = codec
+        self.queue: asyncio.Queue[bytes] = asyncio.Queue(queue_size)
+        self.inputs: deque[tuple] = deque(maxlen=input_buffer)
+        self.bits = 0
+        self.last_seq = 0
+        self.applied_seq = 0
+        self.sent = 0
+        self.dropped = 0
+
+    def push(self, frame: bytes) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+
+        self.queue.put_nowait(frame)
+
+    def receive_inputs(self, inputs: Sequence[Sequence[int]]) -> None:
+        for seq, bits in inputs:
+            if seq > self.last_seq:
+                self.inputs.append((seq, bits))
+                self.last_seq = seq
+
+    def next_input(self) -> int:
+        """Bits for the next tick; the last input repeats while none arrive."""
+        if self.inputs:
+            self.applied_seq, self.bits = self.inputs.popleft()
+
+        return self.bits
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'queued': self.queue.qsize(),
+            'buffered_inputs': len(self.inputs),
+            'sent': self.sent,
+            'dropped': self.dropped
+        }
+
+
+class Room:
+    """One match: a GameState and the connections of its players.
+
+    Every tick it encodes the world once per codec in use and queues the
+    same frame bytes on every connection.
+    """
+
+    def __init__(
+        self,
+        room_id: int = 0,
+        tick_rate: int = 30,
+        engine: str = 'objects',
+        queue_size: int = 8
+    ) -> None:
+        self.room_id = room_id
+        self.queue_size = queue_size
+        self.state = GameState(engine, tick_rate=tick_rate, roles=())
+        self.connections: Dict[int, PlayerConnection] = {}
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def add(
+        self,
+        player_id: int,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        codec: Codec
+    ) -> PlayerConnection:
+        connection = PlayerConnection(
+            player_id, reader, writer, codec, self.queue_size
+        )
+        self.state.add_player(player_id)
+        self.connections[player_id] = connection
+
+        return connection
+
+    def remove(self, player_id: int) -> None:
+        self.connections.pop(player_id, None)
+        self.state.remove_player(player_id)
+
+    async def serve(self, connection: PlayerConnection) -> None:
+        """Pump one connection until it closes, then drop the player."""
+        sender = asyncio.create_task(self._write_loop(connection))
+
+        try:
+            await self._read_loop(connection)
+        except (
+            asyncio.IncompleteReadError, ConnectionError, CodecError,
+            ValueError
+        ):
+            pass
+        finally:
+            sender.cancel()
+            self.remove(connection.player_id)
+            connection.writer.close()
+
+    def tick(self) -> None:
+        self.state.step({
+            player_id: connection.next_input()
+            for player_id, connection in self.connections.items()
+        })
+        self.broadcast(self.world_state())
+
+    def world_state(self) -> Dict[str, Any]:
+        return {
+            'tick': self.state.tick,
+            'players': {
+                player_id: {
+                    'x': player.rect.x,
+                    'y': player.rect.y,
+                    'score': player.score
+                }
+                for player_id, player in self.state.players.items()
+            },
+            'acks': {
+                player_id: connection.applied_seq
+                for player_id, connection in self.connections.items()
+            },
+            'bullets': _table(self.state.positions('bullets')),
+            'enemies': _table(self.state.positions('enemies'))
+        }
+
+    def broadcast(self, message: dict) -> None:
+        frames: Dict[str, bytes] = {}
+
+        for connection in self.connections.values():
+            name = connection.codec.name
+            frame = frames.get(name)
+
+            if frame is None:
+                payload = connection.codec.encode(message)
+                frame = frames[name] = HEADER.pack(len(payload)) + payload
+
+            connection.push(frame)
+
+    def close(self) -> None:
+        for connection in list(self.connections.values()):
+            connection.writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'tick': self.state.tick,
+            'players': len(self.connections),
+            'connections': {
+                player_id: connection.stats()
+                for player_id, connection in self.connections.items()
+            },
+            'engine': self.state.engine.stats()
+        }
+
+    async def _read_loop(self, connection: PlayerConnection) -> None:
+        while True:
+            message = connection.codec.decode(
+                await read_frame(connection.reader)
+            )
+            inputs = message.get('inputs')
+            if inputs:
+                connection.receive_inputs(inputs)
+
+    async def _write_loop(self, connection: PlayerConnection) -> None:
+        writer = connection.writer
+
+        while True:
+            writer.write(await connection.queue.get())
+            await writer.drain()
+            connection.sent += 1
+
+
+class GameServer:
+    """Authoritative asyncio server running a single room.
+
+    Every client talks to the server only: clients send their inputs and
+    the server runs the one GameState at a fixed tick rate.
+    """
+
+    def __init__(
+        self,
+        host: str = '0.0.0.0',
+        port: int = 1313,
+        tick_rate: int = 30,
+        engine: str = 'objects',
+        codecs: Sequence[str] = DEFAULT_CODECS,
+        max_players: int = 16,
+        queue_size: int = 8
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.tick_rate = tick_rate
+        self.codecs = tuple(codecs)
+        self.max_players = max_players
+        self.room = Room(0, tick_rate, engine, queue_size)
+        self.overruns = 0
+        self.tick_times: deque[float] = deque(maxlen=4096)
+        self._ids = IdAllocator()
+        self._joining: Set[int] = set()
+        self._server: asyncio.AbstractServer | None = None
+        self._ticker: asyncio.Task | None = None
+
+    @property
+    def state(self) -> GameState:
+        return self.room.state
+
+    @property
+    def connections(self) -> Dict[int, PlayerConnection]:
+        return self.room.connections
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.create_task(
+            tick_forever(self.tick_rate, self._tick, self._overrun)
+        )
+
+    async def stop(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        self.room.close()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._ticker
+        finally:
+            await self.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        times = self.tick_times
+        return dict(
+            self.room.stats(),
+            tick_ms=sum(times) / len(times) * 1000 if times else 0.0,
+            max_tick_ms=max(times, default=0.0) * 1000,
+            overruns=self.overruns
+        )
+
+    def _tick(self) -> None:
+        started = time.perf_counter()
+        self.room.tick()
+        self.tick_times.append(time.perf_counter() - started)
+
+    def _overrun(self) -> None:
+        self.overruns += 1
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            name = await accept_hello(
+                reader, writer, self.codecs, self._has_room
+            )
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            writer.close()
+            return
+
+        if name is None:
+            writer.close()
+            return
+
+        player_id = self._ids()
+        self._joining.add(player_id)
+        try:
+            await write_frame(writer, json.dumps({
+                'codec': name,
+                'player': player_id,
+                'tick_rate': self.tick_rate
+            }).encode())
+        except ConnectionError:
+            writer.close()
+            return
+        finally:
+            self._joining.discard(player_id)
+
+        await self.room.serve(
+            self.room.add(player_id, reader, writer, get_codec(name))
+        )
+
+    def _has_room(self) -> bool:
+        return len(self.room) + len(self._joining) < self.max_players
+
+
+async def tick_forever(
+    tick_rate: int,
+    tick: Callable[[], None],
+    overrun: Callable[[], None] | None = None
+) -> None:
+    """Call ``tick`` at a fixed rate; a tick that falls a whole interval
+    behind resets the schedule instead of bursting to catch up."""
+    loop = asyncio.get_running_loop()
+    interval = 1 / tick_rate
+    deadline = loop.time()
+
+    while True:
+        tick()
+        deadline += interval
+        delay = deadline - loop.time()
+
+        if delay < -interval:
+            if overrun is not None:
+                overrun()
+            deadline = loop.time()
+            delay = 0
+
+        await asyncio.sleep(max(delay, 0))
+
+
+async def accept_hello(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    codecs: Sequence[str],
+    has_room: Callable[[], bool] | None = None
+) -> str | None:
+    """Read a client's codec hello and pick a codec.
+
+    Refusals (no common codec, no free slot) are answered here and
+    return None; on success the caller sends the full reply.
+    ``has_room`` is asked once the hello is in, and a success returns
+    without awaiting after it, so the caller can take the slot before
+    another connection is let through.
+    """
+    hello = json.loads(str(await read_frame(reader), 'utf-8'))
+
+    try:
+        name = negotiate(codecs, hello.get('codecs', ('json',)))
+    except CodecError:
+        name = None
+
+    if name is None or (has_room is not None and not has_room()):
+        await write_frame(writer, json.dumps({
+            'codec': None,
+            'error': 'full' if name else 'codec'
+        }).encode())
+        return None
+
+    return name
+
+
+async def read_frame(reader: asyncio.StreamReader) -> bytes:
+    size, = HEADER.unpack(await reader.readexactly(HEADER_SIZE))
+
+    if size > MAX_FRAME_SIZE:
+        raise FrameError(f'Frame of {size} bytes exceeds the limit.')
+
+    return await reader.readexactly(size)
+
+
+async def write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(HEADER.pack(len(payload)) + payload)
+    await writer.drain()
+
+
+def _table(positions: Sequence[tuple]) -> Dict[int, Dict[str, int]]:
+    return {
+        index: {'x': x, 'y': y} for index, (x, y) in enumerate(positions)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Run a standalone authoritative game server.'
+    )
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=1313)
+    parser.add_argument('--tick-rate', type=int, default=30)
+    parser.add_argument('--engine', default='objects')
+    parser.add_argument('--max-players', type=int, default=16)
+    args = parser.parse_args()
+
+    server = GameServer(
+        args.host, args.port, args.tick_rate, args.engine,
+        max_players=args.max_players
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
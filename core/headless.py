@@ -0,0 +1,88 @@
+import time
+import argparse
+from typing import Dict, Any
+
+from core.engines import ROLES
+from core.prediction import UP, DOWN, LEFT, RIGHT, FIRE
+from core.simulation import PHASES, GameState
+
+
+def scripted_input(tick: int, role: str) -> int:
+    """Strafe across the arena and keep firing, host and client mirrored."""
+    horizontal = RIGHT if (tick // 45) % 2 == 0 else LEFT
+    vertical = DOWN if (tick // 80) % 2 == 0 else UP
+
+    if role == 'client':
+        horizontal ^= LEFT | RIGHT
+
+    return horizontal | vertical | FIRE
+
+
+def run_headless(
+    ticks: int,
+    engine: str = 'objects',
+    seed: int = 0,
+    enemy_interval: int | None = None,
+    profile: bool = True,
+    tick_rate: int = 30
+) -> Dict[str, Any]:
+    state = GameState(
+        engine, seed=seed, tick_rate=tick_rate, enemy_interval=enemy_interval
+    )
+    state.engine.reserve()
+    timings = dict.fromkeys(PHASES, 0.0) if profile else None
+
+    started = time.perf_counter()
+    for tick in range(1, ticks + 1):
+        state.step(
+            {role: scripted_input(tick, role) for role in ROLES}, timings
+        )
+    elapsed = time.perf_counter() - started
+
+    report = {
+        'engine': engine,
+        'ticks': ticks,
+        'seconds': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed else 0.0,
+        'scores': state.scores(),
+        'entities': state.engine.stats()
+    }
+    if timings is not None:
+        report['phase_us'] = {
+            phase: total / ticks * 1e6 for phase, total in timings.items()
+        }
+
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Run the game simulation without a window or network.'
+    )
+    parser.add_argument('--ticks', type=int, default=10000)
+    parser.add_argument('--engine', default='objects')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tick-rate', type=int, default=30)
+    parser.add_argument(
+        '--enemy-interval', type=int, default=None,
+        help='ticks between enemy spawns (default: one second of ticks)'
+    )
+    parser.add_argument('--no-profile', action='store_true')
+    args = parser.parse_args()
+
+    report = run_headless(
+        args.ticks, args.engine, args.seed,
+        args.enemy_interval, not args.no_profile, args.tick_rate
+    )
+
+    print(f'{report["engine"]}: {report["ticks"]} ticks in '
+          f'{report["seconds"]:.3f} s '
+          f'({report["ticks_per_second"]:,.0f} ticks/s)')
+    for phase, cost in report.get('phase_us', {}).items():
+        print(f'  {phase:<8}{cost:>10.2f} µs/tick')
+    print(f'  scores  {report["scores"]}')
+    print(f'  live    {report["entities"]["live"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+import json
+import time
+import asyncio
+import argparse
+import selectors
+import threading
+from typing import Dict, List, Sequence, Any
+
+from core.server import Client
+from core.codecs import DEFAULT_CODECS
+from core.headless import scripted_input
+from core.profiler import percentiles
+from core.game_server import GameServer
+
+
+class Bot:
+    """A headless player on a Client: scripted inputs with the fire key
+    held, so it shoots whenever the cooldown allows.
+
+    An input's round trip ends with the first world state acking it.
+    """
+
+    def __init__(self, client: Client, role: str = 'host') -> None:
+        self.client = client
+        self.role = role
+        self.seq = 0
+        self.messages = 0
+        self.dropped = 0
+        self.rtts: List[float] = []
+        self.intervals: List[float] = []
+        self._sent_at: Dict[int, float] = {}
+        self._last_tick: int | None = None
+        self._last_arrival: float | None = None
+
+    def send_input(self, now: float) -> None:
+        self.seq += 1
+        self._sent_at[self.seq] = now
+        self.client.send(
+            {'inputs': [[self.seq, scripted_input(self.seq, self.role)]]}
+        )
+
+    def receive(self, now: float) -> None:
+        for message in self.client.get_messages():
+            self.messages += 1
+            self._track_tick(message.get('tick'), now)
+
+            acks = message.get('acks') or {}
+            ack = acks.get(self.client.player_id)
+            if ack is None:
+                ack = acks.get(str(self.client.player_id), 0)
+
+            for seq in [seq for seq in self._sent_at if seq <= ack]:
+                self.rtts.append(now - self._sent_at.pop(seq))
+
+    def _track_tick(self, tick: int | None, now: float) -> None:
+        if tick is None:
+            return
+
+        if self._last_tick is not None and tick > self._last_tick + 1:
+            self.dropped += tick - self._last_tick - 1
+        if self._last_arrival is not None:
+            self.intervals.append(now - self._last_arrival)
+
+        self._last_tick = tick
+        self._last_arrival = now
+
+
+class ServerThread(threading.Thread):
+    """A GameServer on its own event loop, for tests against localhost."""
+
+    def __init__(self, server: GameServer) -> None:
+        super().__init__(name='load-test-server', daemon=True)
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    def run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self.server.start())
+        self._ready.set()
+        self.loop.run_forever()
+
+    def start(self) -> None:
+        super().start()
+        self._ready.wait()
+
+    def stats(self) -> Dict[str, Any]:
+        """Server counters, read on the server's own loop."""
+        async def collect() -> Dict[str, Any]:
+            server = self.server
+            return {
+                'server_tick_ms': percentiles(list(server.tick_times), 1000),
+                'server_overruns': server.overruns,
+                'server_queue_drops': sum(
+                    connection['dropped']
+                    for connection in server.stats()['connections'].values()
+                )
+            }
+
+        return asyncio.run_coroutine_threadsafe(
+            collect(), self.loop
+        ).result(1)
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(
+            self.server.stop(), self.loop
+        ).result(1)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join(1)
+
+
+def run_load_test(
+    ip: str,
+    port: int,
+    bots: int,
+    duration: float,
+    input_rate: float = 30,
+    codecs: Sequence[str] = DEFAULT_CODECS
+) -> Dict[str, Any]:
+    """Join ``bots`` players, drive them for ``duration`` seconds and
+    report round trips, tick intervals, traffic and dropped frames."""
+    selector = selectors.DefaultSelector()
+    players: List[Bot] = []
+
+    for index in range(bots):
+        client = Client(codecs=codecs)
+        client.join(ip, port)
+        bot = Bot(client, 'host' if index % 2 == 0 else 'client')
+        players.append(bot)
+        selector.register(client, selectors.EVENT_READ, bot)
+
+    interval = 1 / input_rate
+    started = time.perf_counter()
+    next_input = started
+    finished = started + duration
+
+    try:
+        while (now := time.perf_counter()) < finished:
+            if now >= next_input:
+                for bot in players:
+                    bot.send_input(now)
+                next_input += interval
+                if next_input < now:
+                    next_input = now + interval
+
+            timeout = max(0.0, min(next_input, finished) - now)
+            for key, _ in selector.select(timeout):
+                key.data.receive(time.perf_counter())
+    finally:
+        selector.close()
+
+    elapsed = time.perf_counter() - started
+    traffic = [bot.client.traffic() for bot in players]
+    messages = sum(bot.messages for bot in players)
+    dropped = sum(bot.dropped for bot in players)
+    received_per_bot = [
+        counters['received'] / elapsed for counters in traffic
+    ]
+
+    return {
+        'bots': bots,
+        'seconds': elapsed,
+        'input_rate': input_rate,
+        'codecs': list(codecs),
+        'rtt_ms': percentiles(
+            [rtt for bot in players for rtt in bot.rtts], 1000
+        ),
+        'tick_interval_ms': percentiles(
+            [gap for bot in players for gap in bot.intervals], 1000
+        ),
+        'bytes_per_second': {
+            'sent': sum(counters['sent'] for counters in traffic) / elapsed,
+            'received': sum(received_per_bot),
+            'received_per_bot': percentiles(received_per_bot)
+        },
+        'messages_per_second': messages / elapsed,
+        'dropped_frames': dropped,
+        'dropped_ratio': dropped / (messages + dropped) if messages else 0.0
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Load a game server with headless bots.'
+    )
+    parser.add_argument(
+        '--server', default=None,
+        help='ip:port of a running server; by default one is started here'
+    )
+    parser.add_argument('--bots', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--input-rate', type=float, default=30.0)
+    parser.add_argument('--tick-rate', type=int, default=30)
+    parser.add_argument('--engine', default='objects')
+    parser.add_argument('--codec', action='append', dest='codecs')
+    parser.add_argument('--output', default='loadtest.json')
+    args = parser.parse_args()
+
+    server_thread = None
+    if args.server is None:
+        server_thread = ServerThread(GameServer(
+            '127.0.0.1', 0, args.tick_rate, args.engine,
+            max_players=args.bots
+        ))
+        server_thread.start()
+        ip, port = '127.0.0.1', server_thread.server.port
+    else:
+        ip, _, port = args.server.rpartition(':')
+        port = int(port)
+
+    try:
+        report = run_load_test(
+            ip, port, args.bots, args.seconds, args.input_rate,
+            args.codecs or DEFAULT_CODECS
+        )
+        if server_thread is not None:
+            report.update(server_thread.stats())
+    finally:
+        if server_thread is not None:
+            server_thread.stop()
+
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    rtt = report['rtt_ms']
+    print(f'{args.bots} bots, {report["messages_per_second"]:.0f} msg/s, '
+          f'{report["bytes_per_second"]["received"] / 1024:.1f} KB/s in, '
+          f'rtt p50/p95/p99 {rtt.get("p50", 0):.1f}/'
+          f'{rtt.get("p95", 0):.1f}/{rtt.get("p99", 0):.1f} ms, '
+          f'{report["dropped_frames"]} dropped -> {args.output}')
+
+
+if __name__ == '__main__':
+    main()
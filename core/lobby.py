@@ -0,0 +1,443 @@
+import os
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import multiprocessing
+from multiprocessing import reduction
+from multiprocessing.connection import Connection
+from typing import Dict, List, Set, Sequence, Any
+
+from core.pools import IdAllocator
+from core.codecs import DEFAULT_CODECS, get_codec
+from core.game_server import Room, tick_forever, accept_hello, write_frame
+
+
+class RoomWorker:
+    """Runs many rooms on one event loop inside a worker process.
+
+    Players arrive as sockets handed over by the lobby. All rooms are ticked
+    together, and the time spent doing so is reported back as tick cost
+    and headroom, the share of each tick interval left idle.
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        conn: Connection,
+        tick_rate: int = 30,
+        engine: str = 'objects',
+        queue_size: int = 8,
+        report_interval: float = 1.0
+    ) -> None:
+        self.worker_id = worker_id
+        self.conn = conn
+        self.tick_rate = tick_rate
+        self.engine = engine
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.rooms: Dict[int, Room] = {}
+        self.overruns = 0
+        self._ticks = 0
+        self._busy = 0.0
+        self._max_busy = 0.0
+        self._reported_at = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._ticker: asyncio.Task | None = None
+        self._send_lock = threading.Lock()
+
+    async def run(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._reported_at = time.perf_counter()
+        self._ticker = asyncio.create_task(
+            tick_forever(self.tick_rate, self._tick, self._overrun)
+        )
+        threading.Thread(
+            target=self._listen, name='lobby-listener', daemon=True
+        ).start()
+
+        try:
+            await self._ticker
+        except asyncio.CancelledError:
+            pass
+        finally:
+            for room in self.rooms.values():
+                room.close()
+
+    def stats(self) -> Dict[str, Any]:
+        interval = 1 / self.tick_rate
+        average = self._busy / self._ticks if self._ticks else 0.0
+
+        return {
+            'pid': os.getpid(),
+            'rooms': len(self.rooms),
+            'players': sum(len(room) for room in self.rooms.values()),
+            'tick_ms': average * 1000,
+            'max_tick_ms': self._max_busy * 1000,
+            'headroom': 1 - average / interval,
+            'overruns': self.overruns
+        }
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                message = self.conn.recv()
+            except (EOFError, OSError):
+                message = ('stop',)
+
+            if message[0] == 'join':
+                _, room_id, player_id, codec = message
+                sock = receive_socket(self.conn)
+                self._loop.call_soon_threadsafe(
+                    self._join, room_id, player_id, codec, sock
+                )
+            elif message[0] == 'stop':
+                self._loop.call_soon_threadsafe(self._ticker.cancel)
+                return
+
+    def _join(
+        self,
+        room_id: int,
+        player_id: int,
+        codec: str,
+        sock: socket.socket
+    ) -> None:
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(
+                room_id, self.tick_rate, self.engine, self.queue_size
+            )
+
+        asyncio.create_task(self._serve(room, player_id, codec, sock))
+
+    async def _serve(
+        self,
+        room: Room,
+        player_id: int,
+        codec: str,
+        sock: socket.socket
+    ) -> None:
+        try:
+            reader, writer = await asyncio.open_connection(sock=sock)
+            connection = room.add(player_id, reader, writer, get_codec(codec))
+            await room.serve(connection)
+        finally:
+            self._send(('left', room.room_id, player_id))
+
+            if not len(room) and self.rooms.get(room.room_id) is room:
+                del self.rooms[room.room_id]
+                self._send(('closed', room.room_id))
+
+    def _tick(self) -> None:
+        started = time.perf_counter()
+
+        for room in list(self.rooms.values()):
+            room.tick()
+
+        finished = time.perf_counter()
+        busy = finished - started
+        self._ticks += 1
+        self._busy += busy
+        self._max_busy = max(self._max_busy, busy)
+
+        if finished - self._reported_at >= self.report_interval:
+            self._send(('stats', self.stats()))
+            self._ticks = 0
+            self._busy = self._max_busy = 0.0
+            self._reported_at = finished
+
+    def _overrun(self) -> None:
+        self.overruns += 1
+
+    def _send(self, message: tuple) -> None:
+        with self._send_lock:
+            try:
+                self.conn.send(message)
+            except OSError:
+                pass
+
+
+def run_worker(
+    worker_id: int,
+    conn: Connection,
+    tick_rate: int,
+    engine: str,
+    queue_size: int
+) -> None:
+    worker = RoomWorker(worker_id, conn, tick_rate, engine, queue_size)
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+def send_socket(conn: Connection, sock: socket.socket, pid: int) -> None:
+    if hasattr(socket, 'fromshare'):
+        conn.send(sock.share(pid))
+    else:
+        reduction.send_handle(conn, sock.fileno(), pid)
+
+
+def receive_socket(conn: Connection) -> socket.socket:
+    if hasattr(socket, 'fromshare'):
+        return socket.fromshare(conn.recv())
+
+    return socket.socket(fileno=reduction.recv_handle(conn))
+
+
+class WorkerHandle:
+    def __init__(
+        self,
+        worker_id: int,
+        process: multiprocessing.Process,
+        conn: Connection
+    ) -> None:
+        self.worker_id = worker_id
+        self.process = process
+        self.conn = conn
+        self.rooms: Set[int] = set()
+        self.stats: Dict[str, Any] = {}
+
+
+class RoomSlot:
+    def __init__(self, room_id: int, worker: WorkerHandle) -> None:
+        self.room_id = room_id
+        self.worker = worker
+        self.players: Set[int] = set()
+        self.started = False
+
+
+class Lobby:
+    """Front end that matches players into rooms run by worker processes.
+
+    The lobby speaks the same handshake as Host and GameServer. Once a
+    player has a room, the connected socket is handed to the worker that
+    owns the room, and all game traffic goes straight between the player
+    and that worker.
+    """
+
+    def __init__(
+        self,
+        host: str = '0.0.0.0',
+        port: int = 1313,
+        workers: int | None = None,
+        room_size: int = 2,
+        tick_rate: int = 30,
+        engine: str = 'objects',
+        codecs: Sequence[str] = DEFAULT_CODECS,
+        queue_size: int = 8
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.worker_count = workers or os.cpu_count() or 1
+        self.room_size = room_size
+        self.tick_rate = tick_rate
+        self.engine = engine
+        self.codecs = tuple(codecs)
+        self.queue_size = queue_size
+        self.workers: List[WorkerHandle] = []
+        self.rooms: Dict[int, RoomSlot] = {}
+        self._player_ids = IdAllocator()
+        self._room_ids = IdAllocator()
+        self._server: asyncio.AbstractServer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        context = multiprocessing.get_context('spawn')
+
+        for worker_id in range(self.worker_count):
+            conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=run_worker,
+                args=(
+                    worker_id, child_conn, self.tick_rate, self.engine,
+                    self.queue_size
+                ),
+                name=f'room-worker-{worker_id}',
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+
+            handle = WorkerHandle(worker_id, process, conn)
+            self.workers.append(handle)
+            threading.Thread(
+                target=self._listen, args=(handle,),
+                name=f'room-worker-{worker_id}-listener', daemon=True
+            ).start()
+
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+        for handle in self.workers:
+            try:
+                handle.conn.send(('stop',))
+            except OSError:
+                pass
+
+        for handle in self.workers:
+            await asyncio.to_thread(handle.process.join, 2)
+            if handle.process.is_alive():
+                handle.process.terminate()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'rooms': len(self.rooms),
+            'players': sum(len(slot.players) for slot in self.rooms.values()),
+            'workers': len(self.workers),
+            'rooms_per_core': len(self.rooms) / max(len(self.workers), 1),
+            'per_worker': [
+                dict(
+                    handle.stats, worker=handle.worker_id,
+                    assigned_rooms=len(handle.rooms)
+                )
+                for handle in self.workers
+            ]
+        }
+
+    async def _handle(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            name = await accept_hello(reader, writer, self.codecs)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            writer.close()
+            return
+
+        if name is None:
+            writer.close()
+            return
+
+        player_id = self._player_ids()
+        slot = self._assign(player_id)
+        try:
+            await write_frame(writer, json.dumps({
+                'codec': name,
+                'player': player_id,
+                'room': slot.room_id,
+                'tick_rate': self.tick_rate
+            }).encode())
+        except ConnectionError:
+            self._release(slot, player_id)
+            writer.close()
+            return
+
+        sock = writer.get_extra_info('socket').dup()
+        writer.close()
+
+        worker = slot.worker
+        try:
+            worker.conn.send(('join', slot.room_id, player_id, name))
+            send_socket(worker.conn, sock, worker.process.pid)
+        except OSError:
+            self._release(slot, player_id)
+        else:
+            slot.started = True
+        finally:
+            sock.close()
+
+    def _assign(self, player_id: int) -> RoomSlot:
+        for slot in self.rooms.values():
+            if len(slot.players) < self.room_size:
+                break
+        else:
+            worker = min(self.workers, key=lambda handle: len(handle.rooms))
+            slot = RoomSlot(self._room_ids(), worker)
+            self.rooms[slot.room_id] = slot
+            worker.rooms.add(slot.room_id)
+
+        slot.players.add(player_id)
+        return slot
+
+    def _release(self, slot: RoomSlot, player_id: int) -> None:
+        """Undo ``_assign`` for a player who never reached the worker,
+        dropping the room too if the worker never heard of it."""
+        slot.players.discard(player_id)
+
+        if not slot.players and not slot.started:
+            del self.rooms[slot.room_id]
+            slot.worker.rooms.discard(slot.room_id)
+
+    def _listen(self, handle: WorkerHandle) -> None:
+        while True:
+            try:
+                message = handle.conn.recv()
+            except (EOFError, OSError):
+                return
+
+            self._loop.call_soon_threadsafe(self._on_message, handle, message)
+
+    def _on_message(self, handle: WorkerHandle, message: tuple) -> None:
+        kind = message[0]
+
+        if kind == 'stats':
+            handle.stats = message[1]
+        elif kind == 'left':
+            slot = self.rooms.get(message[1])
+            if slot is not None:
+                slot.players.discard(message[2])
+        elif kind == 'closed':
+            slot = self.rooms.get(message[1])
+            if slot is not None and not slot.players:
+                del self.rooms[message[1]]
+                handle.rooms.discard(message[1])
+
+
+async def _run_lobby(lobby: Lobby, report_interval: float) -> None:
+    await lobby.start()
+    print(f'Lobby on {lobby.host}:{lobby.port} '
+          f'with {len(lobby.workers)} workers')
+
+    try:
+        while True:
+            await asyncio.sleep(report_interval)
+            stats = lobby.stats()
+            print(f'rooms={stats["rooms"]} players={stats["players"]} '
+                  f'rooms/core={stats["rooms_per_core"]:.2f}')
+            for worker in stats['per_worker']:
+                if worker.get('pid'):
+                    print(f'  worker {worker["worker"]}: '
+                          f'{worker["rooms"]} rooms, '
+                          f'{worker["tick_ms"]:.2f} ms/tick, '
+                          f'headroom {worker["headroom"]:.0%}')
+    finally:
+        await lobby.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Run a lobby that shards rooms across processes.'
+    )
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=1313)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--room-size', type=int, default=2)
+    parser.add_argument('--tick-rate', type=int, default=30)
+    parser.add_argument('--engine', default='objects')
+    parser.add_argument('--report', type=float, default=5.0)
+    args = parser.parse_args()
+
+    lobby = Lobby(
+        args.host, args.port, args.workers, args.room_size,
+        args.tick_rate, args.engine
+    )
+    try:
+        asyncio.run(_run_lobby(lobby, args.report))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import random
+from typing import Callable, Dict, List, Hashable, Any
+
+from core.simulation import GameState
+
+INPUT_DELAY = 3
+HASH_INTERVAL = 30
+
+
+class DesyncError(ConnectionError):
+    pass
+
+
+class LockstepSession:
+    """Deterministic lockstep over a GameState shared by both peers.
+
+    Only input bits travel: the input sampled for a tick is scheduled
+    ``delay`` ticks ahead and sent as ``{'tick': t, 'input': bits}``.
+    A tick is simulated once both players' inputs for it are known, and
+    every ``hash_interval`` ticks the peers exchange ``state.checksum()``
+    so a divergence raises DesyncError instead of going unnoticed.
+    ``on_step`` is called with the inputs of each tick before it runs.
+    """
+
+    def __init__(
+        self,
+        state: GameState,
+        local_role: Hashable,
+        remote_role: Hashable,
+        delay: int = INPUT_DELAY,
+        hash_interval: int = HASH_INTERVAL,
+        on_step: Callable[[Dict[Hashable, int]], None] | None = None
+    ) -> None:
+        self.state = state
+        self.local_role = local_role
+        self.remote_role = remote_role
+        self.delay = delay
+        self.hash_interval = hash_interval
+        self.on_step = on_step
+        self.stalls = 0
+        self.checked = 0
+        self._inputs: Dict[Hashable, Dict[int, int]] = {
+            local_role: dict.fromkeys(range(1, delay + 1), 0),
+            remote_role: dict.fromkeys(range(1, delay + 1), 0)
+        }
+        self._hashes: Dict[int, int] = {}
+        self._remote_hashes: Dict[int, int] = {}
+        self._next_local = delay + 1
+
+    @staticmethod
+    def setup(
+        state: GameState,
+        delay: int = INPUT_DELAY,
+        hash_interval: int = HASH_INTERVAL
+    ) -> Dict[str, Any]:
+        """Match settings the host sends before the first tick."""
+        return {
+            'lockstep': {
+                'seed': random.SystemRandom().getrandbits(32),
+                'tick_rate': state.tick_rate,
+                'engine': state.engine.name,
+                'delay': delay,
+                'hash_interval': hash_interval
+            }
+        }
+
+    def tick(
+        self,
+        bits: int,
+        timings: Dict[str, float] | None = None
+    ) -> List[dict]:
+        """Schedule ``bits`` and run the next tick if it is complete.
+
+        Returns the messages to send to the peer.
+        """
+        outgoing = []
+        state = self.state
+        local = self._inputs[self.local_role]
+        remote = self._inputs[self.remote_role]
+
+        if self._next_local <= state.tick + 1 + self.delay:
+            local[self._next_local] = bits
+            outgoing.append({'tick': self._next_local, 'input': bits})
+            self._next_local += 1
+
+        tick = state.tick + 1
+        if tick not in local or tick not in remote:
+            self.stalls += 1
+            return outgoing
+
+        inputs = {self.local_role: local.pop(tick)}
+        inputs[self.remote_role] = remote.pop(tick)
+        inputs = {role: inputs[role] for role in sorted(inputs, key=str)}
+        if self.on_step is not None:
+            self.on_step(inputs)
+        state.step(inputs, timings)
+
+        if tick % self.hash_interval == 0:
+            self._hashes[tick] = state.checksum()
+            outgoing.append({'tick': tick, 'hash': self._hashes[tick]})
+            self._compare(tick)
+
+        return outgoing
+
+    def receive(self, message: dict) -> None:
+        tick = message.get('tick')
+        if tick is None:
+            return
+
+        if 'input' in message:
+            self._inputs[self.remote_role][tick] = message['input']
+        if 'hash' in message:
+            self._remote_hashes[tick] = message['hash']
+            self._compare(tick)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'tick': self.state.tick,
+            'stalls': self.stalls,
+            'checked': self.checked,
+            'buffered': len(self._inputs[self.remote_role])
+        }
+
+    def _compare(self, tick: int) -> None:
+        if tick not in self._hashes or tick not in self._remote_hashes:
+            return
+
+        local, remote = self._hashes.pop(tick), self._remote_hashes.pop(tick)
+        if local != remote:
+            raise DesyncError(f'Lockstep state diverged at tick {tick}.')
+
+        self.checked += 1
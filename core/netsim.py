@@ -0,0 +1,378 @@
+import asyncio
+import argparse
+from collections import deque
+from functools import partial
+from random import Random
+from typing import Callable, Dict, List, Tuple, NamedTuple, Any
+
+from core.telemetry import LatencyHistogram
+
+READ_SIZE = 64 * 1024
+
+
+class LinkConditions(NamedTuple):
+    """Impairments for one direction of a link.
+
+    ``delay`` and ``jitter`` are one-way, in seconds, so 80 ms of RTT is
+    a delay of 0.04 both ways. ``bandwidth`` is in bytes per second, 0
+    for no cap.
+    """
+    delay: float = 0.0
+    jitter: float = 0.0
+    loss: float = 0.0
+    reorder: float = 0.0
+    bandwidth: int = 0
+
+
+class Link:
+    """Delays, drops and paces the packets of one direction.
+
+    With ``ordered`` set (a TCP stream) nothing can be dropped or
+    overtaken, so a loss costs a retransmission timeout of delay instead,
+    and every chunk waits for the one before it, like head-of-line
+    blocking in a real stream. Ordered chunks go through one FIFO queue
+    drained by a single timer, since the event loop does not keep timers
+    due at the same moment in the order they were set.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        conditions: LinkConditions,
+        ordered: bool = False,
+        seed: int | None = None,
+        retransmit_timeout: float = 0.2
+    ) -> None:
+        self.name = name
+        self.conditions = conditions
+        self.ordered = ordered
+        self.retransmit_timeout = retransmit_timeout
+        self.rng = Random(seed)
+        self.histogram = LatencyHistogram()
+        self.packets = 0
+        self.bytes = 0
+        self.delivered_bytes = 0
+        self.dropped = 0
+        self.reordered = 0
+        self.retransmits = 0
+        self._busy_until = 0.0
+        self.last_delivery = 0.0
+        self._interval_bytes = 0
+        self._interval_packets = 0
+        self._queue: deque[Tuple[float, Callable[[], None]]] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def schedule(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        size: int,
+        deliver: Callable[[], None]
+    ) -> None:
+        now = loop.time()
+        conditions = self.conditions
+        self.packets += 1
+        self.bytes += size
+
+        lost = self.rng.random() < conditions.loss
+        if lost and not self.ordered:
+            self.dropped += 1
+            return
+
+        sent_at = now
+        if conditions.bandwidth:
+            sent_at = max(now, self._busy_until) + size / conditions.bandwidth
+            self._busy_until = sent_at
+
+        delivery = sent_at + conditions.delay
+        if conditions.jitter:
+            delivery += self.rng.uniform(-conditions.jitter, conditions.jitter)
+        if lost:
+            self.retransmits += 1
+            delivery += max(self.retransmit_timeout, 2 * conditions.delay)
+
+        if not self.ordered and self.rng.random() < conditions.reorder:
+            self.reordered += 1
+            delivery += max(conditions.delay, 0.01)
+        delivery = max(delivery, now)
+        self.last_delivery = max(self.last_delivery, delivery)
+
+        callback = partial(self._deliver, loop, now, size, deliver)
+        if self.ordered:
+            self._enqueue(loop, self.last_delivery, callback)
+        else:
+            loop.call_at(delivery, callback)
+
+    def when_delivered(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        callback: Callable[[], None]
+    ) -> None:
+        """Run ``callback`` once everything scheduled so far is out."""
+        if self.ordered:
+            self._enqueue(loop, self.last_delivery, callback)
+        else:
+            loop.call_at(self.last_delivery, callback)
+
+    def take_interval(self) -> Tuple[int, int]:
+        """Bytes and packets delivered since the last call."""
+        interval = self._interval_bytes, self._interval_packets
+        self._interval_bytes = self._interval_packets = 0
+        return interval
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'packets': self.packets,
+            'bytes': self.bytes,
+            'delivered_bytes': self.delivered_bytes,
+            'dropped': self.dropped,
+            'reordered': self.reordered,
+            'retransmits': self.retransmits,
+            'p50_ms': self.histogram.percentile(0.5),
+            'p99_ms': self.histogram.percentile(0.99),
+            'histogram': self.histogram.format()
+        }
+
+    def _enqueue(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        delivery: float,
+        callback: Callable[[], None]
+    ) -> None:
+        self._queue.append((delivery, callback))
+        if self._timer is None:
+            self._timer = loop.call_at(delivery, self._drain, loop)
+
+    def _drain(self, loop: asyncio.AbstractEventLoop) -> None:
+        queue = self._queue
+        now = max(loop.time(), queue[0][0])
+        while queue and queue[0][0] <= now:
+            queue.popleft()[1]()
+
+        self._timer = (
+            loop.call_at(queue[0][0], self._drain, loop) if queue else None
+        )
+
+    def _deliver(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        received_at: float,
+        size: int,
+        deliver: Callable[[], None]
+    ) -> None:
+        self.histogram.add(loop.time() - received_at)
+        self.delivered_bytes += size
+        self._interval_bytes += size
+        self._interval_packets += 1
+        deliver()
+
+
+class NetworkSimulator:
+    """Man-in-the-middle between a Client and a Host on one machine.
+
+    The client connects to ``listen`` instead of the host, and every
+    chunk (TCP) or datagram (UDP) is forwarded to ``target`` through an
+    ``up`` link and answered through a ``down`` link.
+
+    Snapshots are keyed by the port each side connected on, so keep the
+    host's port and move the address instead: the default listens on
+    127.0.0.2 in front of a host on 127.0.0.1.
+    """
+
+    def __init__(
+        self,
+        listen: Tuple[str, int],
+        target: Tuple[str, int],
+        transport: str = 'tcp',
+        up: LinkConditions = LinkConditions(),
+        down: LinkConditions | None = None,
+        seed: int | None = None
+    ) -> None:
+        self.listen = listen
+        self.target = target
+        self.transport = transport
+        ordered = transport == 'tcp'
+        self.links = (
+            Link('up', up, ordered, seed),
+            Link(
+                'down', up if down is None else down, ordered,
+                None if seed is None else seed + 1
+            )
+        )
+        self._closers: List[Callable[[], None]] = []
+
+    @property
+    def up(self) -> Link:
+        return self.links[0]
+
+    @property
+    def down(self) -> Link:
+        return self.links[1]
+
+    async def start(self) -> None:
+        if self.transport == 'udp':
+            await self._start_datagram()
+        else:
+            server = await asyncio.start_server(self._accept, *self.listen)
+            self.listen = server.sockets[0].getsockname()[:2]
+            self._closers.append(server.close)
+
+    def close(self) -> None:
+        for close in self._closers:
+            close()
+        self._closers.clear()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {link.name: link.stats() for link in self.links}
+
+    async def _accept(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            target_reader, target_writer = await asyncio.open_connection(
+                *self.target
+            )
+        except OSError:
+            writer.close()
+            return
+
+        self._closers.extend((writer.close, target_writer.close))
+        await asyncio.gather(
+            self._pump(reader, target_writer, self.up),
+            self._pump(target_reader, writer, self.down)
+        )
+
+    async def _pump(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        link: Link
+    ) -> None:
+        loop = asyncio.get_running_loop()
+
+        try:
+            while chunk := await reader.read(READ_SIZE):
+                link.schedule(
+                    loop, len(chunk),
+                    lambda chunk=chunk: _write(writer, chunk)
+                )
+        except ConnectionError:
+            pass
+
+        link.when_delivered(loop, writer.close)
+
+    async def _start_datagram(self) -> None:
+        loop = asyncio.get_running_loop()
+        client = _DatagramRelay()
+        host = _DatagramRelay()
+
+        client_transport, _ = await loop.create_datagram_endpoint(
+            lambda: client, local_addr=self.listen
+        )
+        host_transport, _ = await loop.create_datagram_endpoint(
+            lambda: host, remote_addr=self.target
+        )
+        self.listen = client_transport.get_extra_info('sockname')[:2]
+        self._closers.extend((client_transport.close, host_transport.close))
+
+        def upstream(data: bytes) -> None:
+            self.up.schedule(
+                loop, len(data), lambda: host_transport.sendto(data)
+            )
+
+        def downstream(data: bytes) -> None:
+            if client.peer is not None:
+                self.down.schedule(
+                    loop, len(data),
+                    lambda: client_transport.sendto(data, client.peer)
+                )
+
+        client.forward = upstream
+        host.forward = downstream
+
+
+class _DatagramRelay(asyncio.DatagramProtocol):
+    def __init__(self) -> None:
+        self.peer: Tuple[str, int] | None = None
+        self.forward: Callable[[bytes], None] = lambda data: None
+
+    def datagram_received(self, data: bytes, address: Tuple) -> None:
+        self.peer = address
+        self.forward(data)
+
+    def error_received(self, exc: Exception) -> None:
+        pass
+
+
+def _write(writer: asyncio.StreamWriter, chunk: bytes) -> None:
+    if not writer.is_closing():
+        writer.write(chunk)
+
+
+async def _run_simulator(
+    simulator: NetworkSimulator,
+    report_interval: float
+) -> None:
+    await simulator.start()
+    host, port = simulator.target
+    print(f'{simulator.transport.upper()} {simulator.listen[0]}:'
+          f'{simulator.listen[1]} -> {host}:{port}')
+
+    try:
+        while True:
+            await asyncio.sleep(report_interval)
+            for link in simulator.links:
+                size, packets = link.take_interval()
+                stats = link.stats()
+                print(f'{link.name:>4}: {size / report_interval / 1024:8.1f}'
+                      f' KB/s {packets / report_interval:7.1f} pkt/s '
+                      f'dropped={stats["dropped"]} '
+                      f'p50={stats["p50_ms"]:.0f}ms '
+                      f'p99={stats["p99_ms"]:.0f}ms [{stats["histogram"]}]')
+    finally:
+        simulator.close()
+
+
+def _address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Forward a Client to a Host through a simulated link.'
+    )
+    parser.add_argument('--listen', type=_address, default=('127.0.0.2', 1313))
+    parser.add_argument('--target', type=_address, default=('127.0.0.1', 1313))
+    parser.add_argument('--transport', choices=('tcp', 'udp'), default='tcp')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='one-way delay in ms')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='one-way jitter in ms')
+    parser.add_argument('--loss', type=float, default=0.0,
+                        help='chance of losing a packet, 0..1')
+    parser.add_argument('--reorder', type=float, default=0.0,
+                        help='chance of holding a datagram back, 0..1')
+    parser.add_argument('--bandwidth', type=float, default=0.0,
+                        help='cap per direction in KB/s')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--report', type=float, default=5.0)
+    args = parser.parse_args()
+
+    conditions = LinkConditions(
+        args.delay / 1000, args.jitter / 1000, args.loss, args.reorder,
+        int(args.bandwidth * 1024)
+    )
+    simulator = NetworkSimulator(
+        args.listen, args.target, args.transport, conditions,
+        seed=args.seed
+    )
+    try:
+        asyncio.run(_run_simulator(simulator, args.report))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
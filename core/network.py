@@ -0,0 +1,252 @@
+import time
+import select
+import threading
+from collections import deque
+from typing import List, Tuple, Dict, Protocol
+
+from core.snapshots import copy_state
+
+
+class Connection(Protocol):
+    def fileno(self) -> int: ...
+
+    def send(self, data: dict, reliable: bool = True) -> int: ...
+
+    def poll(self) -> None: ...
+
+    def get_messages(self) -> List[dict]: ...
+
+
+class SnapshotBuffer:
+    def __init__(self, capacity: int = 64) -> None:
+        self._snapshots: deque[Tuple[float, dict]] = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshots)
+
+    def push(self, timestamp: float, state: dict) -> None:
+        with self._lock:
+            self._snapshots.append((timestamp, state))
+
+    def latest(self) -> Tuple[float, dict] | None:
+        with self._lock:
+            return self._snapshots[-1] if self._snapshots else None
+
+    def position(self, render_time: float, key: str) -> Tuple[int, int] | None:
+        with self._lock:
+            snapshots = [
+                (timestamp, state[key]) for timestamp, state in self._snapshots
+                if key in state and 'x' in state[key]
+            ]
+
+        if not snapshots:
+            return None
+
+        older_time, older = snapshots[0]
+        if render_time <= older_time:
+            return older['x'], older['y']
+
+        for newer_time, newer in snapshots[1:]:
+            if render_time <= newer_time:
+                alpha = (render_time - older_time) / (newer_time - older_time)
+                return (
+                    round(older['x'] + (newer['x'] - older['x']) * alpha),
+                    round(older['y'] + (newer['y'] - older['y']) * alpha)
+                )
+            older_time, older = newer_time, newer
+
+        return older['x'], older['y']
+
+
+class SendRate:
+    """Network send rate that follows the measured throughput of the link.
+
+    While sends go through quickly and stay within ``budget`` bytes per
+    second, the rate grows by about one message per second. It is halved
+    when a send stalls because the socket pushed back, or when the
+    average message size times the rate would exceed the budget.
+    """
+
+    def __init__(
+        self,
+        rate: float = 20,
+        min_rate: float = 5,
+        max_rate: float = 60,
+        budget: float | None = None,
+        stall_ratio: float = 0.5
+    ) -> None:
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.budget = budget
+        self.stall_ratio = stall_ratio
+        self.message_size = 0.0
+        self.throughput = 0.0
+        self.stalls = 0
+
+    @property
+    def interval(self) -> float:
+        return 1 / self.rate
+
+    def update(self, size: int, elapsed: float, since_last: float) -> None:
+        self.message_size = (
+            size if not self.message_size
+            else self.message_size * 0.9 + size * 0.1
+        )
+        if since_last > 0:
+            self.throughput = self.throughput * 0.9 + size / since_last * 0.1
+
+        stalled = elapsed > self.interval * self.stall_ratio
+        over_budget = (
+            self.budget is not None
+            and self.message_size * self.rate > self.budget
+        )
+
+        if stalled or over_budget:
+            self.stalls += stalled
+            self.rate = max(self.min_rate, self.rate / 2)
+        else:
+            self.rate = min(self.max_rate, self.rate + 1 / self.rate)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            'rate': self.rate,
+            'message_size': self.message_size,
+            'throughput': self.throughput,
+            'stalls': self.stalls
+        }
+
+
+class NetworkWorker(threading.Thread):
+    """Sends and receives snapshots off the render thread.
+
+    ``submit`` never blocks: states submitted faster than they can be sent
+    are merged and only the latest values go out. Sends are paced by
+    ``send_rate``; without one every submitted state goes out on the next
+    poll. Messages given to ``post`` are never merged or paced: they go
+    out one by one, in order, on the next poll. Snapshots are sent
+    unreliably and delta-encoded, posted messages reliably and whole, so
+    one-off events such as spawns must be posted: over UDP a lost
+    snapshot is never resent.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        poll_interval: float = 0.005,
+        send_rate: SendRate | None = None
+    ) -> None:
+        super().__init__(name='network-worker', daemon=True)
+        self.connection = connection
+        self.poll_interval = poll_interval
+        self.send_rate = send_rate
+        self.snapshots = SnapshotBuffer()
+        self.error: BaseException | None = None
+        self._pending: dict | None = None
+        self._outbox: deque[dict] = deque()
+        self._received: deque[dict] = deque()
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._last_send = 0.0
+
+    def submit(self, data: dict) -> None:
+        with self._lock:
+            if self._pending is None:
+                self._pending = copy_state(data)
+            else:
+                merge_state(self._pending, data)
+
+    def post(self, message: dict) -> None:
+        self._outbox.append(message)
+
+    def queue_depths(self) -> Dict[str, int]:
+        return {
+            'pending': int(self._pending is not None),
+            'outbox': len(self._outbox),
+            'received': len(self._received),
+            'snapshots': len(self.snapshots)
+        }
+
+    def drain(self) -> List[dict]:
+        with self._lock:
+            messages = list(self._received)
+            self._received.clear()
+        return messages
+
+    def stop(self, timeout: float | None = 1) -> None:
+        self._running.clear()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout)
+
+    def start(self) -> None:
+        self._running.set()
+        super().start()
+
+    def run(self) -> None:
+        try:
+            while self._running.is_set():
+                readable, _, _ = select.select(
+                    [self.connection], [], [], self._timeout()
+                )
+                if readable:
+                    self._receive()
+                self.connection.poll()
+
+                while self._outbox:
+                    self.connection.send(self._outbox.popleft())
+
+                if self._send_due():
+                    self._send()
+        except (OSError, ValueError) as error:
+            self.error = error
+        finally:
+            self._running.clear()
+
+    def _timeout(self) -> float:
+        if self.send_rate is None or self._pending is None:
+            return self.poll_interval
+
+        wait = self._last_send + self.send_rate.interval - time.perf_counter()
+        return min(self.poll_interval, max(wait, 0))
+
+    def _send_due(self) -> bool:
+        return self.send_rate is None or (
+            time.perf_counter() - self._last_send >= self.send_rate.interval
+        )
+
+    def _send(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return
+
+        started = time.perf_counter()
+        size = self.connection.send(pending, reliable=False)
+        finished = time.perf_counter()
+
+        if self.send_rate is not None and self._last_send:
+            self.send_rate.update(
+                size, finished - started, started - self._last_send
+            )
+        self._last_send = started
+
+    def _receive(self) -> None:
+        messages = self.connection.get_messages()
+        now = time.perf_counter()
+
+        with self._lock:
+            self._received.extend(messages)
+
+        for message in messages:
+            self.snapshots.push(now, message)
+
+
+def merge_state(pending: dict, data: dict) -> None:
+    for key, value in data.items():
+        previous = pending.get(key)
+
+        if type(previous) is dict and type(value) is dict:
+            merge_state(previous, value)
+        else:
+            pending[key] = copy_state(value)
@@ -1,14 +1,22 @@
 import time as tm
 
-from random import randint
-from uuid import uuid4
-from typing import Tuple, Literal, List
-from abc import abstractmethod
+from typing import Tuple
 
 from pygame import *
 
+from core.assets import assets
+from core.fonts import fonts, text_cache
+from core.profiler import FrameProfiler
+from core.prediction import UP, DOWN, LEFT, RIGHT, FIRE
+
 
 class Text:
+    """HUD text drawn from the shared font registry and string cache.
+
+    ``update_text`` only records the new string; it is rendered once, when
+    the text is next read for drawing.
+    """
+
     def __init__(
         self,
         text: str,
@@ -17,15 +25,32 @@ class Text:
         txt_color: Tuple[int, int, int] = (255, 255, 255),
         txt_font: str = None
     ) -> None:
-        self.font = font.SysFont(txt_font, size)
+        self.font = fonts.get(txt_font, size)
+        self.font_name = txt_font
+        self.size = size
         self.color = txt_color
         self.source_text = text
-        self.text = self.font.render(text,  True, self.color)
-        self.rect = self.text.get_rect()
+        self._value = text
+        self._surface = text_cache.render(text, txt_font, size, txt_color)
+        self._dirty = False
+        self.rect = self._surface.get_rect()
         self.rect.x, self.rect.y = position
 
+    @property
+    def text(self) -> Surface:
+        if self._dirty:
+            self._surface = text_cache.render(
+                self._value, self.font_name, self.size, self.color
+            )
+            self.rect.size = self._surface.get_size()
+            self._dirty = False
+
+        return self._surface
+
     def update_text(self, text: str):
-        self.text = self.font.render(text, True, self.color)
+        if text != self._value:
+            self._value = text
+            self._dirty = True
 
     def draw(self, window: Surface) -> None:
         window.blit(self.text, (self.rect.x, self.rect.y))
@@ -45,58 +70,86 @@ class PlayerScore(Text):
             text = self.source_text[:-1]
             super().update_text(text + str(self.score))
 
+    def set_score(self, score: int) -> None:
+        if score != self.score:
+            self.score = score
+            text = self.source_text[:-1]
+            super().update_text(text + str(self.score))
+
+
+class ProfilerOverlay:
+    """Frame time breakdown from a FrameProfiler, drawn as HUD text.
+
+    The numbers are refreshed every ``interval`` seconds so the text
+    cache is not flooded with a new string each frame.
+    """
 
-class Sprite(sprite.Sprite):
     def __init__(
         self,
-        position: Tuple[int, int],
-        size: Tuple[int, int],
-        img: str,
-        speed: int = 5
+        profiler: FrameProfiler,
+        position: Tuple[int, int] = (5, 5),
+        size: int = 18,
+        interval: float = 0.5,
+        txt_color: Tuple[int, int, int] = (255, 255, 0)
     ) -> None:
-        super().__init__()
-        self.image = transform.scale(
-            surface=image.load(img),
-            size=size
+        self.profiler = profiler
+        self.interval = interval
+        self.visible = True
+        x, y = position
+        self.lines = tuple(
+            Text(' ', (x, y + index * size), size, txt_color)
+            for index in range(3)
         )
-        self.rect = self.image.get_rect()
-        self.rect.x, self.rect.y = position
-        self.speed = speed
+        self._updated = 0.0
+
+    def update(self) -> None:
+        now = tm.perf_counter()
+        if now - self._updated < self.interval:
+            return
+
+        self._updated = now
+        means = self.profiler.recent()
+        if not means:
+            return
+
+        frame = means.pop('frame')
+        phases = [f'{phase[:4]} {seconds * 1000:.1f}'
+                  for phase, seconds in means.items()]
+        half = len(phases) // 2
+        self.lines[0].update_text(
+            f'frame {frame * 1000:.1f} ms  '
+            f'slow {len(self.profiler.slow_frames)}'
+        )
+        self.lines[1].update_text('  '.join(phases[:half]))
+        self.lines[2].update_text('  '.join(phases[half:]))
 
-    @abstractmethod
-    def move(self, *args, **kwargs) -> None:
-        pass
 
-    def draw(self, window: Surface) -> None:
-        window.blit(source=self.image, dest=(self.rect.x, self.rect.y))
+def pack_keys(keys: key.ScancodeWrapper) -> int:
+    return (
+        (UP if keys[K_w] else 0)
+        | (DOWN if keys[K_s] else 0)
+        | (LEFT if keys[K_a] else 0)
+        | (RIGHT if keys[K_d] else 0)
+        | (FIRE if keys[K_SPACE] else 0)
+    )
 
 
-class Bullet(Sprite):
+class Sprite(sprite.Sprite):
     def __init__(
         self,
         position: Tuple[int, int],
         size: Tuple[int, int],
         img: str,
-        role: Literal['host', 'client'],
-        speed: int = 1
+        speed: int = 5
     ) -> None:
-        super().__init__(position, size, img, speed)
-        self.role = role
-    
-    def move(self) -> None:
-        self.rect.y -= self.speed
-
-    def check_rect_collision(
-        self,
-        enemies: list,
-        bullets: list
-    ) -> Literal['host', 'client'] | None:
-        for enemy in enemies:
-            if self.rect.colliderect(enemy.rect):
-                bullets.remove(self)
-                enemies.remove(enemy)
+        super().__init__()
+        self.image = assets.get(img, size)
+        self.rect = self.image.get_rect()
+        self.rect.x, self.rect.y = position
+        self.speed = speed
 
-                return self.role
+    def draw(self, window: Surface) -> None:
+        window.blit(source=self.image, dest=(self.rect.x, self.rect.y))
 
 
 class Player(Sprite):
@@ -109,81 +162,10 @@ class Player(Sprite):
         speed: int = 5
     ) -> None:
         super().__init__(position, size, img, speed)
-        self._count = 0
-        self._bullets = {}
-        self._enemies = {}
         self.score_counter = score_counter
-        self._spawn_time_bullet = tm.time()
-        self._spawn_time_enemy = tm.time()
-        self.data = {
-            'x': self.rect.x,
-            'y': self.rect.y,
-            'bullets': self._bullets,
-            'enemies': self._enemies,
-            'score': 0
-        }
-    
-    def move(self, keys: key.ScancodeWrapper) -> None:
-        if keys[K_w] and self.rect.y > 0:
-            self.rect.y -= self.speed
-            self.data['y'] = self.rect.y
-        if keys[K_s] and self.rect.y < 450:
-            self.rect.y += self.speed
-            self.data['y'] = self.rect.y
-        
-        if keys[K_a] and self.rect.x > 0:
-            self.rect.x -= self.speed
-            self.data['x'] = self.rect.x
-        if keys[K_d] and self.rect.x < 645:
-            self.rect.x += self.speed
-            self.data['x'] = self.rect.x
-
-        if keys[K_SPACE]:
-            current_time = tm.time()
-
-            if current_time - self._spawn_time_bullet >= 0.3:
-                bullet_id = str(uuid4())
-                self._bullets[bullet_id] = {
-                    'x': self.rect.x,
-                    'y': self.rect.y + 15
-                }
-                self._spawn_time_bullet = current_time
-
-    def create_enemy(self) -> None:
-        current_time = tm.time()
-
-        if current_time - self._spawn_time_enemy >= 1:
-            x, y = randint(50, 620), randint(0, 30)
-            enemy_id = str(uuid4())
-            self._enemies[enemy_id] = {
-                'x': x,
-                'y': y
-            }
-            self._spawn_time_enemy = current_time
+
+    def set_position(self, x: int, y: int) -> None:
+        self.rect.x, self.rect.y = x, y
 
     def draw(self, window: Surface) -> None:
         window.blit(source=self.image, dest=(self.rect.x, self.rect.y))
-
-
-class Enemy(Sprite):
-    def __init__(
-        self,
-        position: Tuple[int, int],
-        size: Tuple[int, int],
-        img: str,
-        speed: int = 2
-    ):
-        super().__init__(position, size, img, speed)
-
-    def check_rect_collision(
-        self,
-        players: List[Player],
-        enemies: List['Enemy']
-    ) -> None:
-        for player in players:
-            if self.rect.colliderect(player.rect):
-                player.score_counter.subtract_score()
-                enemies.remove(self)
-
-    def move(self) -> None:
-        self.rect.y += self.speed
\ No newline at end of file
@@ -1,28 +1,65 @@
 import json
 import socket
+from functools import cached_property
 
-from PyQt5.QtWidgets import QWidget, QPushButton, QLabel, QTextEdit
+from PyQt5.QtWidgets import (
+    QWidget, QPushButton, QLabel, QTextEdit, QMessageBox
+)
 from PyQt5.QtGui import QIntValidator
-from PyQt5.QtCore import QMetaObject, Qt, Q_ARG, QTimer
-from PyQt5 import uic
+from PyQt5.QtCore import (
+    QObject, QMetaObject, Qt, Q_ARG, QTimer, pyqtSignal, pyqtSlot
+)
 
-from core.decorators import run_is_thread
-from core.game import run_game, host, client
+from core.decorators import run_in_pool
+from core.tasks import Task, current_task
+from core.ui_cache import load_ui, stylesheet
 
+CONNECT_TIMEOUT = 10.0
+
+
+class QtDispatcher(QObject):
+    """Runs callables from any thread on the Qt thread that made it.
+
+    Set as the task pool's ``dispatch`` so task callbacks can touch
+    widgets.
+    """
+
+    called = pyqtSignal(object)
 
-class BaseWindow(QWidget):
     def __init__(self) -> None:
         super().__init__()
-        self._load_style()
+        self.called.connect(self._run)
+
+    def __call__(self, callback) -> None:
+        self.called.emit(callback)
+
+    @pyqtSlot(object)
+    def _run(self, callback) -> None:
+        callback()
+
+
+class BaseWindow(QWidget):
+    """A menu window built from ``core/ui/<ui_name>.ui``.
+
+    The stylesheet goes on after the form, which may carry its own.
+    Matches are started through ``core.game``, imported only then, so
+    the menu comes up without loading pygame.
+    """
+
+    ui_name = ''
 
-    def _load_style(self) -> None:
-        with open('core/styles/styles.css', 'r', encoding='utf-8') as f:
-            self.setStyleSheet(f.read())
+    def __init__(self) -> None:
+        super().__init__()
+        load_ui(self.ui_name, self)
+        self.setStyleSheet(stylesheet())
 
     def move_to_window(self, window: QWidget):
         window.show()
         self.close()
 
+    def _close_after(self, result) -> None:
+        self.close()
+
 
 class ConnectWindow(BaseWindow):
     ip_input: QLabel
@@ -30,40 +67,63 @@ class ConnectWindow(BaseWindow):
     connect_btn: QPushButton
     back_btn: QPushButton
 
+    ui_name = 'connect_menu'
+
     def __init__(self, parent_window: QWidget) -> None:
         super().__init__()
-        uic.loadUi('core/ui/connect_menu.ui', self)
-        self._load_style()
         self.connect_btn.clicked.connect(lambda: self.connect_btn_handler())
         self.back_btn.clicked.connect(
             lambda: self.move_to_window(parent_window)
         )
 
-    @run_is_thread
+    @run_in_pool(
+        'connect', on_result='_close_after', on_error='_show_connect_error'
+    )
     def connect_btn_handler(self) -> None:
+        from core.game import run_game, client
+
         ip = self.ip_input.text()
         port = int(self.port_input.text())
 
-        client.connect(ip, port)
+        client.connect(ip, port, CONNECT_TIMEOUT, current_task().stop)
         QMetaObject.invokeMethod(self, 'hide', Qt.QueuedConnection)
         run_game('client')
-        QMetaObject.invokeMethod(self, 'close', Qt.QueuedConnection)
+
+    def _show_connect_error(self, error: Exception) -> None:
+        self.show()
+
+        if isinstance(error, TimeoutError):
+            error_msg = (
+                f'No answer from {self.ip_input.text()} within '
+                f'{CONNECT_TIMEOUT:g} seconds.'
+            )
+        else:
+            error_msg = str(error) or type(error).__name__
+
+        QMessageBox.warning(self, 'Connection failed', error_msg)
 
 
 class RunGameWindow(BaseWindow):
     console: QTextEdit
 
+    ui_name = 'run_game_menu'
+
     def __init__(self):
         super().__init__()
-        uic.loadUi('core/ui/run_game_menu.ui', self)
-        self._load_style()
         self.index = 0
         self.timer = QTimer(self)
-        self.server_thread = None
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self._show_telemetry)
+        self.server_task: Task | None = None
 
     def showEvent(self, event) -> None:
         super().showEvent(event)
-        self.start_server()
+        self.server_task = self.start_server()
+
+    def closeEvent(self, event) -> None:
+        if self.server_task is not None:
+            self.server_task.cancel()
+        super().closeEvent(event)
 
     def _send_msg(self, msg: str) -> None:
         QMetaObject.invokeMethod(
@@ -77,33 +137,48 @@ class RunGameWindow(BaseWindow):
         color_msg = f"<span style='color:{color};'>{msg}</span>"
         self._send_msg(color_msg)
 
-    @run_is_thread
+    def _show_telemetry(self) -> None:
+        from core.game import host
+
+        self.console.append(host.telemetry.summary())
+
+    @run_in_pool(
+        'host', on_result='_close_after', on_error='_show_server_error'
+    )
     def start_server(self) -> None:
+        from core.game import run_game, host
+
         with open('data/server_config.json', 'r', encoding='utf-8') as f:
             data: dict = json.load(f)
-            try:
-                if data['server']['ip'] == 'localdevice':
-                    ip: str = host.get_machine_ip()
-                    port: int = data['server']['port']
-                    warning_msg: str = data['server']['warnings'].get(
-                        'local_device_warning'
-                    )
-                    self._send_colored_msg(warning_msg, 'yellow')
-                else:
-                    ip: str = data['server']['ip']
-                    port: int = data['server']['port']
-
-                self._send_msg(f'Data to connect: \nIP - {ip}\nPORT - {port}')
-                host.run(ip, port)
-                QMetaObject.invokeMethod(self, 'hide', Qt.QueuedConnection)
-                run_game('host')
-                QMetaObject.invokeMethod(self, 'close', Qt.QueuedConnection)
-
-            except (OSError, socket.gaierror):
-                error_msg: str = data['server']['errors'].get(
-                    'invalid_data'
-                )
-                self._send_colored_msg(f"{error_msg}", 'red')
+
+        if data['server']['ip'] == 'localdevice':
+            ip: str = host.get_machine_ip()
+            port: int = data['server']['port']
+            warning_msg: str = data['server']['warnings'].get(
+                'local_device_warning'
+            )
+            self._send_colored_msg(warning_msg, 'yellow')
+        else:
+            ip: str = data['server']['ip']
+            port: int = data['server']['port']
+
+        self._send_msg(f'Data to connect: \nIP - {ip}\nPORT - {port}')
+        host.run(ip, port, stop=current_task().stop)
+        QMetaObject.invokeMethod(self.timer, 'start', Qt.QueuedConnection)
+        run_game('host')
+        QMetaObject.invokeMethod(self.timer, 'stop', Qt.QueuedConnection)
+
+    def _show_server_error(self, error: Exception) -> None:
+        self.timer.stop()
+
+        if isinstance(error, (OSError, socket.gaierror)):
+            with open('data/server_config.json', 'r', encoding='utf-8') as f:
+                data: dict = json.load(f)
+            error_msg: str = data['server']['errors'].get('invalid_data')
+        else:
+            error_msg = f'{type(error).__name__}: {error}'
+
+        self._send_colored_msg(f"{error_msg}", 'red')
 
 
 class SettingsWindow(BaseWindow):
@@ -113,11 +188,11 @@ class SettingsWindow(BaseWindow):
     default_btn: QPushButton
     back_btn: QPushButton
 
+    ui_name = 'settings_menu'
+
     def __init__(self, parent_window: QWidget) -> None:
         super().__init__()
-        uic.loadUi('core/ui/settings_menu.ui', self)
         self.parent_window = parent_window
-        self._load_style()
         self.paste_data()
         self.port_input.setValidator(QIntValidator(1, 65535))
         self.save_btn.clicked.connect(self.save_btn_handler)
@@ -159,17 +234,26 @@ class MainWindow(BaseWindow):
     connect_btn: QPushButton
     settings_btn: QPushButton
 
+    ui_name = 'main_menu'
+
     def __init__(self) -> None:
         super().__init__()
-        uic.loadUi('core/ui/main_menu.ui', self)
-        self._load_style()
-        self.run_game_window = RunGameWindow()
-        self.settings_window = SettingsWindow(self)
-        self.connect_window = ConnectWindow(self)
         self.run_game_btn.clicked.connect(self.open_run_game_window)
         self.settings_btn.clicked.connect(self.open_settings_window)
         self.connect_btn.clicked.connect(self.open_connect_window)
 
+    @cached_property
+    def run_game_window(self) -> RunGameWindow:
+        return RunGameWindow()
+
+    @cached_property
+    def settings_window(self) -> SettingsWindow:
+        return SettingsWindow(self)
+
+    @cached_property
+    def connect_window(self) -> ConnectWindow:
+        return ConnectWindow(self)
+
     def open_connect_window(self) -> None:
         self.connect_window.show()
         self.close()
@@ -0,0 +1,107 @@
+import gc
+import sys
+import time
+from typing import Callable, Generic, TypeVar, List, Dict, Any
+
+T = TypeVar('T')
+
+
+class IdAllocator:
+    def __init__(self, start: int = 1) -> None:
+        self._next = start
+
+    def __call__(self) -> int:
+        value = self._next
+        self._next += 1
+        return value
+
+
+class ObjectPool(Generic[T]):
+    def __init__(self, factory: Callable[[], T], capacity: int = 1024) -> None:
+        self.factory = factory
+        self.capacity = capacity
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self._free: List[T] = []
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def reserve(self, count: int) -> None:
+        while len(self._free) < min(count, self.capacity):
+            self._free.append(self.factory())
+            self.created += 1
+
+    def acquire(self, *args: Any, **kwargs: Any) -> T:
+        if self._free:
+            item = self._free.pop()
+            self.reused += 1
+        else:
+            item = self.factory()
+            self.created += 1
+
+        item.reset(*args, **kwargs)
+        return item
+
+    def release(self, item: T) -> None:
+        self.released += 1
+
+        if len(self._free) < self.capacity:
+            self._free.append(item)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'free': len(self._free),
+            'created': self.created,
+            'reused': self.reused,
+            'released': self.released
+        }
+
+
+class GcMonitor:
+    """Counts garbage collections, their pauses and allocated blocks."""
+
+    def __init__(self) -> None:
+        self.collections = [0, 0, 0]
+        self.pauses = 0
+        self.total_pause = 0.0
+        self.max_pause = 0.0
+        self.baseline_blocks = 0
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+        self.baseline_blocks = sys.getallocatedblocks()
+
+    def stop(self) -> None:
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def allocated_blocks(self) -> int:
+        return sys.getallocatedblocks() - self.baseline_blocks
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'collections': list(self.collections),
+            'pauses': self.pauses,
+            'total_pause_ms': self.total_pause * 1000,
+            'max_pause_ms': self.max_pause * 1000,
+            'allocated_blocks': self.allocated_blocks()
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """``stats`` as a MetricsWriter source."""
+        return {'name': 'gc', 'time': time.time(), **self.stats()}
+
+    def _callback(self, phase: str, info: Dict[str, int]) -> None:
+        if phase == 'start':
+            self._started_at = time.perf_counter()
+            return
+
+        pause = time.perf_counter() - self._started_at
+        self.collections[info['generation']] += 1
+        self.pauses += 1
+        self.total_pause += pause
+        self.max_pause = max(self.max_pause, pause)
@@ -0,0 +1,102 @@
+import time
+from collections import deque
+from typing import Tuple, List, Iterable
+
+UP = 1
+DOWN = 2
+LEFT = 4
+RIGHT = 8
+FIRE = 16
+
+ARENA_LIMITS = (0, 0, 645, 450)
+
+
+def step_position(
+    x: int,
+    y: int,
+    bits: int,
+    speed: int,
+    limits: Tuple[int, int, int, int] = ARENA_LIMITS
+) -> Tuple[int, int]:
+    left, top, right, bottom = limits
+
+    if bits & UP and y > top:
+        y -= speed
+    if bits & DOWN and y < bottom:
+        y += speed
+    if bits & LEFT and x > left:
+        x -= speed
+    if bits & RIGHT and x < right:
+        x += speed
+
+    return x, y
+
+
+class InputPredictor:
+    """Client side: remembers inputs until the host acknowledges them."""
+
+    def __init__(self, speed: int, max_pending: int = 64) -> None:
+        self.speed = speed
+        self.max_pending = max_pending
+        self.rtt = 0.0
+        self.corrections = 0
+        self._seq = 0
+        self._pending: deque[Tuple[int, int, float]] = deque()
+
+    def record(self, bits: int) -> int:
+        self._seq += 1
+        self._pending.append((self._seq, bits, time.perf_counter()))
+
+        while len(self._pending) > self.max_pending:
+            self._pending.popleft()
+
+        return self._seq
+
+    def unacknowledged(self) -> List[List[int]]:
+        return [[seq, bits] for seq, bits, _ in self._pending]
+
+    def reconcile(
+        self,
+        ack: int,
+        x: int,
+        y: int,
+        predicted: Tuple[int, int]
+    ) -> Tuple[int, int]:
+        now = time.perf_counter()
+
+        while self._pending and self._pending[0][0] <= ack:
+            seq, _, sent_at = self._pending.popleft()
+            if seq == ack:
+                sample = now - sent_at
+                self.rtt = sample if not self.rtt else (
+                    self.rtt * 0.875 + sample * 0.125
+                )
+
+        for _, bits, _ in self._pending:
+            x, y = step_position(x, y, bits, self.speed)
+
+        if (x, y) != predicted:
+            self.corrections += 1
+
+        return x, y
+
+
+class InputAuthority:
+    """Host side: applies a peer's numbered inputs exactly once."""
+
+    def __init__(self, speed: int) -> None:
+        self.speed = speed
+        self.last_processed = 0
+
+    def apply(
+        self,
+        inputs: Iterable[List[int]],
+        x: int,
+        y: int
+    ) -> Tuple[int, int]:
+        for seq, bits in inputs:
+            if seq > self.last_processed:
+                x, y = step_position(x, y, bits, self.speed)
+                self.last_processed = seq
+
+        return x, y
@@ -0,0 +1,233 @@
+import json
+import time
+from array import array
+from collections import deque
+from statistics import quantiles
+from typing import Dict, List, Sequence, Tuple, Any
+
+from core.simulation import PHASES as STEP_PHASES
+
+FRAME_PHASES = (
+    'input', 'receive', 'simulate', 'collide', 'send', 'render', 'present',
+    'idle'
+)
+
+
+def percentiles(
+    samples: Sequence[float],
+    scale: float = 1.0
+) -> Dict[str, float]:
+    if not samples:
+        return {'count': 0}
+    if len(samples) == 1:
+        cuts = [samples[0]] * 99
+    else:
+        cuts = quantiles(samples, n=100, method='inclusive')
+
+    return {
+        'count': len(samples),
+        'p50': cuts[49] * scale,
+        'p95': cuts[94] * scale,
+        'p99': cuts[98] * scale,
+        'max': max(samples) * scale
+    }
+
+
+class FrameProfiler:
+    """Per-phase frame times kept in a fixed-size ring buffer.
+
+    A frame is ``begin()``, a ``lap(phase)`` after each phase, which
+    charges the time since the previous lap to that phase, and ``end()``.
+    Passing ``step_timings`` to GameState.step lets the collide share of
+    the simulation be split out when the frame ends. Frames slower than
+    ``slow_frame`` seconds are also kept whole, for the trace.
+    """
+
+    enabled = True
+
+    def __init__(
+        self,
+        capacity: int = 600,
+        slow_frame: float = 1 / 30,
+        max_slow_frames: int = 64,
+        phases: Sequence[str] = FRAME_PHASES
+    ) -> None:
+        self.phases = tuple(phases)
+        self.capacity = capacity
+        self.slow_frame = slow_frame
+        self.frames = 0
+        self.step_timings: Dict[str, float] | None = dict.fromkeys(
+            STEP_PHASES, 0.0
+        )
+        self.slow_frames: deque[Tuple[int, float, Tuple[float, ...]]] = (
+            deque(maxlen=max_slow_frames)
+        )
+        self._index = {phase: index for index, phase in enumerate(phases)}
+        self._width = len(self.phases)
+        self._times = array('d', bytes(8 * capacity * self._width))
+        self._starts = array('d', bytes(8 * capacity))
+        self._current = [0.0] * self._width
+        self._origin = time.perf_counter()
+        self._started = self._last = self._origin
+
+    def begin(self) -> None:
+        self._started = self._last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._current[self._index[phase]] += now - self._last
+        self._last = now
+
+    def end(self) -> None:
+        current = self._current
+        self._split_collide()
+
+        slot = self.frames % self.capacity
+        row = slot * self._width
+        self._times[row:row + self._width] = array('d', current)
+        self._starts[slot] = self._started - self._origin
+
+        if sum(current) >= self.slow_frame:
+            self.slow_frames.append(
+                (self.frames, self._starts[slot], tuple(current))
+            )
+
+        self.frames += 1
+        for index in range(self._width):
+            current[index] = 0.0
+
+    def recent(self, frames: int = 60) -> Dict[str, float]:
+        """Mean seconds per phase, and per frame, over the last frames."""
+        rows = self._rows()[-frames:]
+        if not rows:
+            return {}
+
+        means = {
+            phase: sum(row[index] for _, row in rows) / len(rows)
+            for index, phase in enumerate(self.phases)
+        }
+        means['frame'] = sum(means.values())
+        return means
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._rows()
+
+        return {
+            'frames': self.frames,
+            'window': len(rows),
+            'frame_ms': percentiles([sum(row) for _, row in rows], 1000),
+            'phases_ms': {
+                phase: percentiles([row[index] for _, row in rows], 1000)
+                for index, phase in enumerate(self.phases)
+            },
+            'slow_frame_ms': self.slow_frame * 1000,
+            'slow_frames': [
+                {
+                    'frame': frame,
+                    'start_ms': start * 1000,
+                    'phases_ms': {
+                        phase: seconds * 1000
+                        for phase, seconds in zip(self.phases, row)
+                    }
+                }
+                for frame, start, row in self.slow_frames
+            ]
+        }
+
+    def dump(self, path: str, **sections: Any) -> None:
+        """Write ``stats`` as JSON, with ``sections`` added alongside."""
+        with open(path, 'w') as file:
+            json.dump({**self.stats(), **sections}, file, indent=2)
+
+    def dump_trace(self, path: str) -> None:
+        """Write the buffered and slow frames in Chrome trace format.
+
+        Phases of a frame are laid end to end in ``phases`` order, so a
+        phase split over several laps shows as one block.
+        """
+        oldest = self.frames - len(self._rows())
+        frames = [
+            (frame, start, row)
+            for frame, start, row in self.slow_frames if frame < oldest
+        ]
+        frames += [
+            (oldest + offset, start, row)
+            for offset, (start, row) in enumerate(self._rows())
+        ]
+
+        events = []
+        for frame, start, row in frames:
+            timestamp = start * 1e6
+            events.append(_trace_event(
+                'frame', timestamp, sum(row) * 1e6,
+                {'frame': frame, 'slow': sum(row) >= self.slow_frame}
+            ))
+            for phase, seconds in zip(self.phases, row):
+                if seconds:
+                    events.append(
+                        _trace_event(phase, timestamp, seconds * 1e6)
+                    )
+                    timestamp += seconds * 1e6
+
+        with open(path, 'w') as file:
+            json.dump(
+                {'traceEvents': events, 'displayTimeUnit': 'ms'}, file
+            )
+
+    def _split_collide(self) -> None:
+        timings = self.step_timings
+        collide = timings['collide']
+
+        if collide and 'collide' in self._index and 'simulate' in self._index:
+            self._current[self._index['simulate']] -= collide
+            self._current[self._index['collide']] += collide
+
+        for phase in timings:
+            timings[phase] = 0.0
+
+    def _rows(self) -> List[Tuple[float, Sequence[float]]]:
+        count = min(self.frames, self.capacity)
+        first = self.frames % self.capacity if self.frames > count else 0
+        width = self._width
+
+        return [
+            (
+                self._starts[slot],
+                self._times[slot * width:(slot + 1) * width]
+            )
+            for slot in (
+                (first + offset) % self.capacity for offset in range(count)
+            )
+        ]
+
+
+class DisabledProfiler:
+    """Stands in for FrameProfiler when profiling is off."""
+
+    enabled = False
+    step_timings = None
+
+    def begin(self) -> None:
+        pass
+
+    def lap(self, phase: str) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+
+def _trace_event(
+    name: str,
+    timestamp: float,
+    duration: float,
+    args: Dict[str, Any] | None = None
+) -> Dict[str, Any]:
+    event = {
+        'name': name, 'ph': 'X', 'ts': timestamp, 'dur': duration,
+        'pid': 1, 'tid': 1
+    }
+    if args:
+        event['args'] = args
+
+    return event
@@ -0,0 +1,170 @@
+from typing import Tuple, List, Dict, Iterable, Sequence
+
+from pygame import Surface, Rect, display, sprite
+
+from core.objects.game_objects import Text
+
+Layer = Tuple[Surface, Sequence[Tuple[int, int]]]
+
+
+class FullRenderer:
+    """Redraws and presents the whole window every frame.
+
+    ``draw`` is ``compose`` followed by ``present``; the two halves can be
+    called separately to time them apart.
+    """
+
+    name = 'full'
+
+    def __init__(self, window: Surface, background: Surface) -> None:
+        self.window = window
+        self.background = background
+        self.frames = 0
+
+    def draw(
+        self,
+        layers: Iterable[Layer],
+        sprites: sprite.AbstractGroup,
+        texts: Iterable[Text] = ()
+    ) -> None:
+        self.compose(layers, sprites, texts)
+        self.present()
+
+    def compose(
+        self,
+        layers: Iterable[Layer],
+        sprites: sprite.AbstractGroup,
+        texts: Iterable[Text] = ()
+    ) -> None:
+        window = self.window
+        window.blit(self.background, (0, 0))
+
+        for text in texts:
+            text.draw(window)
+
+        for item in sprites:
+            item.draw(window)
+
+        for image, positions in layers:
+            for position in positions:
+                window.blit(image, position)
+
+    def present(self) -> None:
+        display.update()
+        self.frames += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {'frames': self.frames}
+
+
+class DirtyRenderer:
+    """Batched renderer that only restores and presents changed areas.
+
+    Every frame the background is copied back over the rectangles drawn
+    in the previous frame, everything is drawn again with one
+    ``Surface.blits`` call per layer, and only the old and new rectangles
+    are passed to ``display.update``. When more than ``max_rects`` were
+    drawn the whole window is redrawn instead, which is cheaper than
+    thousands of small copies.
+    """
+
+    name = 'dirty'
+
+    def __init__(
+        self,
+        window: Surface,
+        background: Surface,
+        max_rects: int = 256
+    ) -> None:
+        self.window = window
+        self.background = background.convert()
+        self.max_rects = max_rects
+        self.frames = 0
+        self.full_frames = 0
+        self.updated_rects = 0
+        self._drawn: List[Rect] = []
+        self._update: List[Rect] | None = None
+        self._full = True
+
+    def invalidate(self) -> None:
+        self._full = True
+
+    def draw(
+        self,
+        layers: Iterable[Layer],
+        sprites: sprite.AbstractGroup,
+        texts: Iterable[Text] = ()
+    ) -> None:
+        self.compose(layers, sprites, texts)
+        self.present()
+
+    def compose(
+        self,
+        layers: Iterable[Layer],
+        sprites: sprite.AbstractGroup,
+        texts: Iterable[Text] = ()
+    ) -> None:
+        window = self.window
+        background = self.background
+        previous = self._drawn
+        full = self._full or len(previous) > self.max_rects
+
+        if full:
+            window.blit(background, (0, 0))
+        else:
+            window.blits(
+                [(background, rect, rect) for rect in previous],
+                doreturn=False
+            )
+
+        drawn = [window.blit(text.text, text.rect) for text in texts]
+        drawn += window.blits([(item.image, item.rect) for item in sprites])
+        for image, positions in layers:
+            drawn += window.blits(
+                [(image, position) for position in positions]
+            )
+
+        if full or len(drawn) > self.max_rects:
+            self._update = None
+        else:
+            previous += drawn
+            self._update = previous
+
+        self._drawn = drawn
+        self._full = False
+
+    def present(self) -> None:
+        if self._update is None:
+            display.update()
+            self.full_frames += 1
+        else:
+            display.update(self._update)
+            self.updated_rects += len(self._update)
+
+        self.frames += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'frames': self.frames,
+            'full_frames': self.full_frames,
+            'updated_rects': self.updated_rects
+        }
+
+
+RENDERERS = {
+    FullRenderer.name: FullRenderer,
+    DirtyRenderer.name: DirtyRenderer
+}
+
+
+def create_renderer(
+    name: str,
+    window: Surface,
+    background: Surface
+) -> FullRenderer | DirtyRenderer:
+    try:
+        renderer_type = RENDERERS[name]
+    except KeyError:
+        raise ValueError(f'Unknown renderer: {name}.') from None
+
+    return renderer_type(window, background)
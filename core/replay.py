@@ -0,0 +1,513 @@
+import json
+import mmap
+import time
+import queue
+import struct
+import argparse
+import threading
+from bisect import bisect_right
+from typing import Dict, List, Tuple, Iterable, Iterator, Hashable, Any
+
+from core.codecs import BinaryCodec
+from core.simulation import ARENA, PLAYER_SIZE, PHASES, GameState
+
+MAGIC = b'PVPREC'
+VERSION = 1
+KEYFRAME_INTERVAL = 300
+
+FILE_HEADER = struct.Struct('<6sHI')
+RECORD = struct.Struct('<IBI')
+INDEX_ENTRY = struct.Struct('<IQ')
+TRAILER = struct.Struct('<Q6s')
+
+INPUT, SNAPSHOT, KEYFRAME, INDEX = range(4)
+
+
+class ReplayError(ValueError):
+    pass
+
+
+class Recorder(threading.Thread):
+    """Streams a match into an append-only log from a background thread.
+
+    The log is a JSON header followed by records of ``RECORD`` (tick,
+    kind, size) and a BinaryCodec payload. Before each tick there is an
+    optional SNAPSHOT with what the network changed since the last tick,
+    a KEYFRAME with the whole state every ``keyframe_interval`` ticks and
+    the INPUT the tick was stepped with. ``stop`` appends an index of the
+    keyframes and a trailer pointing at it.
+
+    The frame loop only queues plain dicts; encoding and writing happen
+    on this thread. At most ``max_pending`` records wait in the queue.
+    When it is full records are dropped and counted rather than stalling
+    a frame, and the next tick is written as a keyframe so a replay can
+    pick up again after the gap.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        state: GameState,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+        max_pending: int = 1024,
+        buffer_size: int = 64 * 1024,
+        **info: Any
+    ) -> None:
+        super().__init__(name='match-recorder', daemon=True)
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.header = {
+            'engine': state.engine.name,
+            'tick_rate': state.tick_rate,
+            'roles': list(state.players),
+            'spawn_enemies': state.spawn_enemies,
+            'enemy_interval': state.enemy_interval,
+            'keyframe_interval': keyframe_interval,
+            'started': time.time(),
+            **info
+        }
+        self.records = 0
+        self.dropped = 0
+        self.last_tick = 0
+        self.keyframes: List[Tuple[int, int]] = []
+        self._codec = BinaryCodec()
+        self._queue: queue.Queue = queue.Queue(max_pending)
+        self._spawns = _empty_spawns()
+        self._resync = False
+        self._file = open(path, 'wb', buffering=buffer_size)
+        self._offset = self._write_header()
+
+    def record_spawn(
+        self,
+        kind: str,
+        x: int,
+        y: int,
+        role: Hashable = None
+    ) -> None:
+        """Log an entity the peer spawned; sent with the next tick."""
+        self._spawns[kind].append(
+            [x, y, role] if kind == 'bullets' else [x, y]
+        )
+
+    def record_step(
+        self,
+        state: GameState,
+        inputs: Dict[Hashable, int],
+        players: Iterable[Hashable] = ()
+    ) -> None:
+        """Log the tick ``state`` is about to be stepped with ``inputs``.
+
+        ``players`` are the roles whose positions may have been set from
+        the network since the last tick.
+        """
+        tick = state.tick + 1
+        positions = {
+            role: list(state.players[role].position) for role in players
+        }
+
+        if positions or self._spawns['bullets'] or self._spawns['enemies']:
+            self._put(tick, SNAPSHOT, {'players': positions, **self._spawns})
+            self._spawns = _empty_spawns()
+
+        if self._resync or state.tick % self.keyframe_interval == 0:
+            keyframe = state.save()
+            keyframe['hash'] = state.checksum()
+            self._resync = False
+            self._put(tick, KEYFRAME, keyframe)
+
+        self._put(tick, INPUT, {'inputs': dict(inputs)})
+
+    def run(self) -> None:
+        while (item := self._queue.get()) is not None:
+            self._write(*item)
+
+    def stop(self) -> None:
+        """Finish the queued records, then write the index and close."""
+        if self.is_alive():
+            self._queue.put(None)
+            self.join()
+
+        index = b''.join(
+            INDEX_ENTRY.pack(tick, offset) for tick, offset in self.keyframes
+        )
+        self._file.write(RECORD.pack(self.last_tick, INDEX, len(index)))
+        self._file.write(index)
+        self._file.write(TRAILER.pack(self._offset, MAGIC))
+        self._file.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'records': self.records,
+            'dropped': self.dropped,
+            'keyframes': len(self.keyframes),
+            'bytes': self._offset,
+            'pending': self._queue.qsize()
+        }
+
+    def _put(self, tick: int, kind: int, payload: Dict[str, Any]) -> None:
+        if self._resync and kind != KEYFRAME:
+            self.dropped += 1
+            return
+
+        try:
+            self._queue.put_nowait((tick, kind, payload))
+        except queue.Full:
+            self.dropped += 1
+            self._resync = True
+
+    def _write_header(self) -> int:
+        header = json.dumps(self.header).encode()
+        self._file.write(FILE_HEADER.pack(MAGIC, VERSION, len(header)))
+        self._file.write(header)
+        return FILE_HEADER.size + len(header)
+
+    def _write(self, tick: int, kind: int, payload: Dict[str, Any]) -> None:
+        body = self._codec.encode(payload)
+
+        if kind == KEYFRAME:
+            self.keyframes.append((tick, self._offset))
+        self._file.write(RECORD.pack(tick, kind, len(body)))
+        self._file.write(body)
+        self._offset += RECORD.size + len(body)
+        self.records += 1
+        self.last_tick = tick
+
+
+class DisabledRecorder:
+    """Stands in for Recorder when a match is not recorded."""
+
+    enabled = False
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def record_spawn(
+        self,
+        kind: str,
+        x: int,
+        y: int,
+        role: Hashable = None
+    ) -> None:
+        pass
+
+    def record_step(
+        self,
+        state: GameState,
+        inputs: Dict[Hashable, int],
+        players: Iterable[Hashable] = ()
+    ) -> None:
+        pass
+
+
+class Replayer:
+    """Plays a Recorder log back into a fresh GameState.
+
+    The log is memory-mapped and each record is decoded straight from the
+    map when it is reached. Playback starts at a keyframe; keyframes met
+    along the way are checked against the replayed state, and a mismatch
+    is noted in ``divergences`` before the keyframe is loaded. A gap left
+    by dropped records is skipped up to the next keyframe. ``seek`` jumps
+    to the last keyframe at or before a tick through the index and steps
+    forward from there.
+    """
+
+    def __init__(self, path: str, profile: bool = False) -> None:
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        self._codec = BinaryCodec()
+
+        if len(self._map) < FILE_HEADER.size:
+            raise ReplayError(f'{path} is not a match recording.')
+        magic, version, size = FILE_HEADER.unpack_from(self._view)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError(f'{path} is not a match recording.')
+
+        start = FILE_HEADER.size
+        self.header: Dict[str, Any] = json.loads(
+            bytes(self._view[start:start + size])
+        )
+        self._start = start + size
+        self._end = len(self._map)
+        self.keyframes, self.last_tick = self._read_index()
+        self._keyframe_ticks = [tick for tick, _ in self.keyframes]
+
+        self.state = GameState(
+            self.header['engine'],
+            tick_rate=self.header['tick_rate'],
+            spawn_enemies=self.header['spawn_enemies'],
+            enemy_interval=self.header['enemy_interval'],
+            roles=self.header['roles']
+        )
+        self.timings = dict.fromkeys(PHASES, 0.0) if profile else None
+        self.steps = 0
+        self.gaps = 0
+        self.divergences: List[int] = []
+        self._offset = self._start
+        self._synced = False
+
+    def close(self) -> None:
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def step(self) -> bool:
+        """Replay the next tick; False at the end of the log."""
+        state = self.state
+        records = self._records(self._offset)
+
+        for tick, kind, payload, self._offset in records:
+            if kind == KEYFRAME:
+                self._keyframe(tick, self._codec.decode(payload))
+            elif not self._synced:
+                continue
+            elif tick != state.tick + 1:
+                self.gaps += 1
+                self._synced = False
+            elif kind == SNAPSHOT:
+                self._apply(self._codec.decode(payload))
+            elif kind == INPUT:
+                inputs = self._codec.decode(payload)['inputs']
+                state.step(inputs, self.timings)
+                self.steps += 1
+                return True
+
+        return False
+
+    def seek(self, tick: int) -> GameState:
+        """Restore the state as it was after ``tick``."""
+        index = bisect_right(self._keyframe_ticks, tick + 1) - 1
+        if index < 0:
+            raise ReplayError(f'No keyframe at or before tick {tick}.')
+
+        _, _, keyframe, self._offset = next(
+            self._records(self.keyframes[index][1])
+        )
+        self.state.load(self._codec.decode(keyframe))
+        self._synced = True
+        while self.state.tick < tick and self.step():
+            pass
+
+        return self.state
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'tick': self.state.tick,
+            'last_tick': self.last_tick,
+            'steps': self.steps,
+            'keyframes': len(self.keyframes),
+            'gaps': self.gaps,
+            'divergences': list(self.divergences)
+        }
+
+    def _records(
+        self,
+        offset: int
+    ) -> Iterator[Tuple[int, int, memoryview, int]]:
+        view, end = self._view, self._end
+
+        while offset + RECORD.size <= end:
+            tick, kind, size = RECORD.unpack_from(view, offset)
+            start = offset + RECORD.size
+            offset = start + size
+            if offset > end:
+                return
+
+            yield tick, kind, view[start:offset], offset
+
+    def _read_index(self) -> Tuple[List[Tuple[int, int]], int]:
+        """Keyframes from the trailer's index, or by scanning the records
+        of a log that was never stopped."""
+        view = self._view
+
+        if self._end - self._start >= RECORD.size + TRAILER.size:
+            offset, magic = TRAILER.unpack_from(view, self._end - TRAILER.size)
+            if magic == MAGIC and self._start <= offset < self._end:
+                last_tick, kind, size = RECORD.unpack_from(view, offset)
+                if kind == INDEX:
+                    self._end = offset
+                    start = offset + RECORD.size
+                    return [
+                        (tick, position) for tick, position
+                        in INDEX_ENTRY.iter_unpack(view[start:start + size])
+                    ], last_tick
+
+        keyframes = []
+        last_tick = 0
+        offset = self._start
+        for tick, kind, _, next_offset in self._records(self._start):
+            if kind == KEYFRAME:
+                keyframes.append((tick, offset))
+            last_tick = max(last_tick, tick)
+            offset = next_offset
+
+        return keyframes, last_tick
+
+    def _keyframe(self, tick: int, keyframe: Dict[str, Any]) -> None:
+        state = self.state
+
+        if self._synced and tick == state.tick + 1:
+            if state.checksum() == keyframe['hash']:
+                return
+            self.divergences.append(state.tick)
+        elif self._synced:
+            self.gaps += 1
+
+        state.load(keyframe)
+        self._synced = True
+
+    def _apply(self, snapshot: Dict[str, Any]) -> None:
+        state = self.state
+
+        for role, (x, y) in snapshot['players'].items():
+            state.players[role].set_position(x, y)
+        for x, y, role in snapshot['bullets']:
+            state.spawn_bullet(x, y, role)
+        for x, y in snapshot['enemies']:
+            state.spawn_enemy(x, y)
+
+
+def _empty_spawns() -> Dict[str, list]:
+    return {'bullets': [], 'enemies': []}
+
+
+def replay_headless(replayer: Replayer, until: int | None = None) -> float:
+    """Step through the log as fast as possible; returns the seconds."""
+    started = time.perf_counter()
+
+    while (until is None or replayer.state.tick < until) and replayer.step():
+        pass
+
+    return time.perf_counter() - started
+
+
+def replay_rendered(
+    replayer: Replayer,
+    speed: float = 1.0,
+    render_fps: int = 60,
+    renderer_name: str = 'dirty'
+) -> None:
+    """Show the replay in a window at ``speed`` times real time.
+
+    Space pauses, the arrow keys jump ten seconds back or forward and
+    Escape or closing the window stops.
+    """
+    from pygame import (
+        display, event, init, font, sprite, time as clock_time,
+        QUIT, KEYDOWN, K_SPACE, K_LEFT, K_RIGHT, K_ESCAPE
+    )
+    from core.assets import assets
+    from core.render import create_renderer
+    from core.timing import FixedTimestep
+    from core.objects.game_objects import Text
+
+    font.init()
+    init()
+    window = display.set_mode(ARENA)
+    display.set_caption(f'Replay: {replayer.path}')
+
+    state = replayer.state
+    background = assets.get('image/bg.png', ARENA, alpha=False)
+    layers = (
+        ('bullets', assets.get('image/bullet.png', state.bullet.size)),
+        ('enemies', assets.get('image/player.png', state.enemy.size))
+    )
+    player_image = assets.get('image/player.png', PLAYER_SIZE)
+    renderer = create_renderer(renderer_name, window, background)
+    status = Text('Replay', (5, 470), 20)
+    clock = clock_time.Clock()
+    timestep = FixedTimestep(max(1, round(state.tick_rate * speed)))
+    jump = state.tick_rate * 10
+    paused = False
+    playing = True
+
+    while playing:
+        for e in event.get():
+            if e.type == QUIT or e.type == KEYDOWN and e.key == K_ESCAPE:
+                playing = False
+            elif e.type == KEYDOWN and e.key == K_SPACE:
+                paused = not paused
+            elif e.type == KEYDOWN and e.key in (K_LEFT, K_RIGHT):
+                direction = 1 if e.key == K_RIGHT else -1
+                replayer.seek(max(0, state.tick + direction * jump))
+                timestep.reset()
+
+        ticks = timestep.advance()
+        if not paused:
+            for _ in range(ticks):
+                if not replayer.step():
+                    paused = True
+                    break
+
+        alpha = 1.0 if paused else timestep.alpha
+        scores = ' '.join(
+            f'{role}: {score}' for role, score in state.scores().items()
+        )
+        status.update_text(
+            f'{state.tick / state.tick_rate:6.1f} s  tick {state.tick}/'
+            f'{replayer.last_tick}  {scores}{"  [paused]" * paused}'
+        )
+        entity_layers = [
+            (image, state.positions(kind, alpha)) for kind, image in layers
+        ]
+        entity_layers.append((player_image, [
+            player.interpolate(alpha) for player in state.players.values()
+        ]))
+        renderer.draw(entity_layers, sprite.Group(), (status,))
+        clock.tick(render_fps)
+
+    display.quit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Replay a recorded match, headless or in a window.'
+    )
+    parser.add_argument('path')
+    parser.add_argument('--seek', type=int, default=0,
+                        help='tick to start from')
+    parser.add_argument('--until', type=int, default=None,
+                        help='tick to stop at when headless')
+    parser.add_argument('--render', action='store_true',
+                        help='show the replay in a window')
+    parser.add_argument('--speed', type=float, default=1.0)
+    parser.add_argument('--no-profile', action='store_true')
+    args = parser.parse_args()
+
+    replayer = Replayer(args.path, profile=not args.no_profile)
+    try:
+        started = time.perf_counter()
+        replayer.seek(args.seek)
+        seek_time = time.perf_counter() - started
+
+        if args.render:
+            replay_rendered(replayer, args.speed)
+            return
+
+        seek_steps = replayer.steps
+        elapsed = replay_headless(replayer, args.until)
+        stats = replayer.stats()
+        steps = replayer.steps - seek_steps
+        rate = steps / elapsed if elapsed else 0.0
+        print(f'{replayer.header["engine"]}: seek to {args.seek} in '
+              f'{seek_time * 1000:.1f} ms, {steps} ticks in '
+              f'{elapsed:.3f} s ({rate:,.0f} ticks/s)')
+        print(f'tick {stats["tick"]}/{stats["last_tick"]}, '
+              f'{stats["keyframes"]} keyframes, {stats["gaps"]} gaps, '
+              f'divergences at {stats["divergences"] or "none"}, '
+              f'scores {replayer.state.scores()}')
+        if replayer.timings is not None and replayer.steps:
+            print(' '.join(
+                f'{phase}={total / replayer.steps * 1e6:.1f}us'
+                for phase, total in replayer.timings.items()
+            ))
+    finally:
+        replayer.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,49 @@
 import socket 
 import json
+import time
+import os
+import errno
+import select
 import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import List, Dict, Sequence, Iterator, Literal
+
+from core.framing import FramedSocket
+from core.datagram import DatagramSocket
+from core.snapshots import SnapshotChannel
+from core.telemetry import ConnectionTelemetry
+from core.codecs import (
+    Codec, CodecError, JsonCodec, DEFAULT_CODECS, get_codec, negotiate
+)
 
 
 ADDRESS_FAMILY = socket.AF_INET
-SOCKET_TYPE = socket.SOCK_STREAM
+SOCKET_TYPES = {'tcp': socket.SOCK_STREAM, 'udp': socket.SOCK_DGRAM}
+Transport = Literal['tcp', 'udp']
+Stream = FramedSocket | DatagramSocket
+POLL_INTERVAL = 0.1
 
 
 class Host:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        codecs: Sequence[str] = DEFAULT_CODECS,
+        delta: bool = True,
+        transport: Transport = 'tcp'
+    ) -> None:
         self._ip: str = ''
         self.port: int = 0
-        self._host = socket.socket(ADDRESS_FAMILY, SOCKET_TYPE)
-        self._host_socket = None
+        self.codecs = tuple(codecs)
+        self.codec: Codec = JsonCodec()
+        self.snapshots = SnapshotChannel() if delta else None
+        self.transport = transport
+        self._host = socket.socket(ADDRESS_FAMILY, SOCKET_TYPES[transport])
+        self._host_socket: Stream | None = None
         self._lock = threading.Lock()
+        self._inbox = deque()
+        self.telemetry = ConnectionTelemetry('host')
+        self.telemetry.watch('inbox', self._inbox.__len__)
 
     @staticmethod
     def get_machine_ip() -> str:
@@ -24,39 +54,149 @@ class Host:
 
         return ip
     
-    def run(self, ip: str, port: int) -> None:
+    def run(
+        self,
+        ip: str,
+        port: int,
+        timeout: float | None = None,
+        stop: threading.Event | None = None
+    ) -> None:
+        """Wait for the client and agree on a codec.
+
+        Waiting for the client and its hello gives up with TimeoutError
+        after ``timeout`` seconds and with ConnectionAbortedError once
+        ``stop`` is set. On any failure the listening socket is closed
+        and replaced, so ``run`` can be called again on the same port.
+        """
         self._ip = ip
         self.port = port
-        self._host.bind((self._ip, self.port))
-        self._host.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        self._host.listen(1)
-        
-        self._host_socket, client_address = self._host.accept()
+        deadline = _deadline(timeout)
+
+        try:
+            self._host.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self._host.bind((self._ip, self.port))
+
+            if self.transport != 'udp':
+                self._host.listen(1)
+            _wait_ready(self._host, False, deadline, stop)
+
+            if self.transport == 'udp':
+                self._host_socket = DatagramSocket.accept(self._host)
+            else:
+                connection, client_address = self._host.accept()
+                self._host_socket = FramedSocket(connection)
+            self._negotiate_codec(deadline, stop)
+        except Exception:
+            self._host.close()
+            self._host = socket.socket(
+                ADDRESS_FAMILY, SOCKET_TYPES[self.transport]
+            )
+            raise
+
+    def _negotiate_codec(
+        self,
+        deadline: float | None = None,
+        stop: threading.Event | None = None
+    ) -> None:
+        hello = json.loads(str(
+            _recv_handshake(self._host_socket, deadline, stop), 'utf-8'
+        ))
+
+        try:
+            name = negotiate(self.codecs, hello.get('codecs', ('json',)))
+        except CodecError as error:
+            self._host_socket.send_frame(json.dumps({'codec': None}).encode())
+            self._host_socket.close()
+            raise ConnectionError(str(error)) from None
+
+        self._host_socket.send_frame(json.dumps({'codec': name}).encode())
+        self.codec = get_codec(name)
     
-    def send(self, data: dict) -> None:
-        with self._lock:
+    def fileno(self) -> int:
+        return self._host_socket.fileno()
+
+    def traffic(self) -> Dict[str, int]:
+        """Bytes moved on the wire so far, headers included."""
+        return {
+            'sent': self._host_socket.bytes_sent,
+            'received': self._host_socket.bytes_received
+        }
+
+    def send(self, data: dict, reliable: bool = True) -> int:
+        with _locked(self._lock, self.telemetry):
             # print('Отправлено:', data)
-            self._host_socket.send(json.dumps(data).encode())
+            return _send_message(
+                self._host_socket, self.codec, self.snapshots,
+                self.telemetry, data, reliable
+            )
 
-    
-    def get_data(self, bufsize: int = 1024) -> dict | None:
-        with self._lock:
-            data = self._host_socket.recv(bufsize).decode()
-            return json.loads(data)
+    def poll(self) -> None:
+        with _locked(self._lock, self.telemetry):
+            self._host_socket.resend()
+
+    def get_data(self) -> dict | None:
+        with _locked(self._lock, self.telemetry):
+            while not self._inbox:
+                _read_frames(
+                    self._host_socket, self.codec, self.snapshots,
+                    self.telemetry, self._inbox, block=True
+                )
+            return self._inbox.popleft()
+
+    def get_messages(self) -> List[dict]:
+        with _locked(self._lock, self.telemetry):
+            _read_frames(
+                self._host_socket, self.codec, self.snapshots,
+                self.telemetry, self._inbox, block=False
+            )
+            messages = list(self._inbox)
+            self._inbox.clear()
+            return messages
 
 
 class Client:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        codecs: Sequence[str] = DEFAULT_CODECS,
+        delta: bool = True,
+        transport: Transport = 'tcp'
+    ) -> None:
         self._ip: str = ''
         self.port: int = 0
-        self._client_socket = socket.socket(ADDRESS_FAMILY, SOCKET_TYPE)
+        self.codecs = tuple(codecs)
+        self.codec: Codec = JsonCodec()
+        self.snapshots = SnapshotChannel() if delta else None
+        self.transport = transport
+        self._client_socket = socket.socket(
+            ADDRESS_FAMILY, SOCKET_TYPES[transport]
+        )
+        self._connection: Stream | None = None
         self._lock = threading.Lock()
+        self._inbox = deque()
+        self.telemetry = ConnectionTelemetry('client')
+        self.telemetry.watch('inbox', self._inbox.__len__)
+        self.player_id: int | None = None
+        self.tick_rate: int | None = None
         
-    def connect(self, ip: str, port: int) -> None:
+    def connect(
+        self,
+        ip: str,
+        port: int,
+        timeout: float | None = None,
+        stop: threading.Event | None = None
+    ) -> None:
+        """Connect and agree on a codec.
+
+        Connecting and waiting for the reply give up with TimeoutError
+        after ``timeout`` seconds and with ConnectionAbortedError once
+        ``stop`` is set. On any
+        failure the socket is closed and replaced, so ``connect`` can be
+        retried.
+        """
         try:
             self._ip = ip
             self.port = port
-            self._client_socket.connect((self._ip, self.port))
+            self._open_connection(timeout, stop)
         except ConnectionRefusedError:
             raise ValueError(
                 f'Connection refused on IP: {self._ip}, Port: {self.port}'
@@ -66,12 +206,239 @@ class Client:
                 f'Invalid IP address or hostname: {self._ip}.'
             )
 
-    def send(self, data: dict) -> None:
-        with self._lock:
-            self._client_socket.send(json.dumps(data).encode())
+    def _open_connection(
+        self,
+        timeout: float | None,
+        stop: threading.Event | None
+    ) -> None:
+        deadline = _deadline(timeout)
+        try:
+            _connect(
+                self._client_socket, (self._ip, self.port), deadline, stop
+            )
+            if self.transport == 'udp':
+                self._connection = DatagramSocket(self._client_socket)
+            else:
+                self._connection = FramedSocket(self._client_socket)
+            self._negotiate_codec(deadline, stop)
+        except Exception:
+            self._client_socket.close()
+            self._client_socket = socket.socket(
+                ADDRESS_FAMILY, SOCKET_TYPES[self.transport]
+            )
+            self._connection = None
+            raise
+
+    def join(self, ip: str, port: int) -> int:
+        """Join a standalone GameServer and return the assigned player id.
+
+        The server broadcasts whole world states, so the delta channel
+        used between Host and Client is switched off. Servers only speak
+        TCP.
+        """
+        self.snapshots = None
+        self.connect(ip, port)
+
+        if self.player_id is None:
+            raise ValueError(f'{ip}:{port} is not a game server.')
+
+        return self.player_id
+
+    def _negotiate_codec(
+        self,
+        deadline: float | None = None,
+        stop: threading.Event | None = None
+    ) -> None:
+        hello = {'codecs': list(self.codecs)}
+        self._connection.send_frame(json.dumps(hello).encode())
+        reply = json.loads(str(
+            _recv_handshake(self._connection, deadline, stop), 'utf-8'
+        ))
+
+        if reply.get('error') == 'full':
+            raise ValueError('The server is full.')
+        if reply.get('codec') not in self.codecs:
+            raise ValueError(
+                f'No common codec with the host: {", ".join(self.codecs)}.'
+            )
+
+        self.codec = get_codec(reply['codec'])
+        self.player_id = reply.get('player')
+        self.tick_rate = reply.get('tick_rate')
+
+    def fileno(self) -> int:
+        return self._connection.fileno()
+
+    def traffic(self) -> Dict[str, int]:
+        """Bytes moved on the wire so far, headers included."""
+        return {
+            'sent': self._connection.bytes_sent,
+            'received': self._connection.bytes_received
+        }
+
+    def send(self, data: dict, reliable: bool = True) -> int:
+        with _locked(self._lock, self.telemetry):
+            return _send_message(
+                self._connection, self.codec, self.snapshots,
+                self.telemetry, data, reliable
+            )
+
+    def poll(self) -> None:
+        with _locked(self._lock, self.telemetry):
+            self._connection.resend()
+
+    def get_data(self) -> dict | None:
+        with _locked(self._lock, self.telemetry):
+            while not self._inbox:
+                _read_frames(
+                    self._connection, self.codec, self.snapshots,
+                    self.telemetry, self._inbox, block=True
+                )
+            return self._inbox.popleft()
+
+    def get_messages(self) -> List[dict]:
+        with _locked(self._lock, self.telemetry):
+            _read_frames(
+                self._connection, self.codec, self.snapshots,
+                self.telemetry, self._inbox, block=False
+            )
+            messages = list(self._inbox)
+            self._inbox.clear()
+            return messages
+
+
+def _deadline(timeout: float | None) -> float | None:
+    return None if timeout is None else time.monotonic() + timeout
+
+
+def _wait_ready(
+    sock: socket.socket | Stream,
+    writable: bool,
+    deadline: float | None,
+    stop: threading.Event | None,
+    slices: int | None = None
+) -> bool:
+    """Wait for ``sock`` in short slices so ``stop`` is noticed, for at
+    most ``slices`` of them if given. True once ``sock`` is ready."""
+    while slices is None or slices > 0:
+        if stop is not None and stop.is_set():
+            raise ConnectionAbortedError('Cancelled while waiting for peer.')
+
+        wait = POLL_INTERVAL
+        if deadline is not None:
+            wait = min(wait, deadline - time.monotonic())
+            if wait <= 0:
+                raise TimeoutError('Timed out waiting for peer.')
+
+        sockets = [sock]
+        readable, ready, _ = select.select(
+            [] if writable else sockets, sockets if writable else [], [],
+            wait
+        )
+        if readable or ready:
+            return True
+        if slices is not None:
+            slices -= 1
+
+    return False
+
+
+def _recv_handshake(
+    connection: Stream,
+    deadline: float | None,
+    stop: threading.Event | None
+) -> memoryview | bytes:
+    """Read one handshake frame under the same deadline and ``stop`` as
+    the connect. Polling also lets a DatagramSocket resend the hello."""
+    while True:
+        frame = connection.recv_frame(False)
+        if frame is not None:
+            return frame
+
+        _wait_ready(connection, False, deadline, stop, slices=1)
+
+
+def _connect(
+    sock: socket.socket,
+    address: tuple,
+    deadline: float | None,
+    stop: threading.Event | None
+) -> None:
+    if deadline is None and stop is None:
+        sock.connect(address)
+        return
+
+    sock.setblocking(False)
+    try:
+        code = sock.connect_ex(address)
+        if code in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            _wait_ready(sock, True, deadline, stop)
+            code = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if code:
+            raise OSError(code, os.strerror(code))
+    finally:
+        sock.setblocking(True)
+
+
+@contextmanager
+def _locked(
+    lock: threading.Lock,
+    telemetry: ConnectionTelemetry
+) -> Iterator[None]:
+    started = time.perf_counter()
+    with lock:
+        telemetry.record_lock_wait(time.perf_counter() - started)
+        yield
+
+
+def _send_message(
+    connection: Stream,
+    codec: Codec,
+    snapshots: SnapshotChannel | None,
+    telemetry: ConnectionTelemetry,
+    data: dict,
+    reliable: bool
+) -> int:
+    if snapshots is not None and not reliable:
+        # Only states are delta-encoded: a reliable event may be resent
+        # long after its base has left the peer's history.
+        data = snapshots.outgoing(data)
+    data = telemetry.stamp(data)
+
+    started = time.perf_counter()
+    payload = codec.encode(data)
+    encode_time = time.perf_counter() - started
+
+    size = connection.send_frame(payload, reliable)
+    telemetry.record_send(size, encode_time)
+    return size
+
+
+def _read_frames(
+    connection: Stream,
+    codec: Codec,
+    snapshots: SnapshotChannel | None,
+    telemetry: ConnectionTelemetry,
+    inbox: deque,
+    block: bool
+) -> None:
+    received = connection.bytes_received
+    frames = connection.recv_frames(block)
+    telemetry.record_receive(
+        connection.bytes_received - received, len(frames)
+    )
+
+    for frame in frames:
+        started = time.perf_counter()
+        data = codec.decode(frame)
+        telemetry.record_decode(time.perf_counter() - started)
+        data = telemetry.unstamp(data)
+
+        if snapshots is not None:
+            data = snapshots.incoming(data)
+            if data is None:
+                continue
+
+        inbox.append(data)
 
-    def get_data(self, bufsize: int = 1024) -> dict | None:
-        with self._lock:
-            data = self._client_socket.recv(bufsize).decode()
-            return json.loads(data)
 
@@ -0,0 +1,308 @@
+import time
+import zlib
+from array import array
+from random import Random
+from typing import Tuple, List, Dict, Iterable, Hashable, Literal, Any
+
+from core.pools import IdAllocator
+from core.spatial import Box
+from core.prediction import FIRE, step_position
+from core.entities import KINDS
+from core.engines import ROLES, EntitySpec, create_engine
+
+ARENA = (700, 500)
+PLAYER_SIZE = (60, 60)
+PLAYER_SPEED = 150
+START_POSITIONS: Dict[str, Tuple[int, int]] = {
+    'host': (150, 150),
+    'client': (300, 150)
+}
+PHASES = ('input', 'spawn', 'move', 'collide')
+
+BULLET = EntitySpec((40, 20), 'image/bullet.png', 210)
+ENEMY = EntitySpec((50, 50), 'image/player.png', 60)
+
+
+def per_tick(speed: float, tick_rate: int) -> int:
+    """Convert a speed in pixels per second to whole pixels per tick."""
+    return max(1, round(speed / tick_rate))
+
+
+class PlayerState:
+    __slots__ = ('role', 'rect', 'previous', 'speed', 'score', 'last_fire')
+
+    def __init__(
+        self,
+        role: Hashable,
+        position: Tuple[int, int],
+        size: Tuple[int, int] = PLAYER_SIZE,
+        speed: int = 5
+    ) -> None:
+        self.role = role
+        self.rect = Box(*position, *size)
+        self.previous = position
+        self.speed = speed
+        self.score = 0
+        self.last_fire = 0
+
+    @property
+    def score_counter(self) -> 'PlayerState':
+        return self
+
+    @property
+    def position(self) -> Tuple[int, int]:
+        return self.rect.x, self.rect.y
+
+    def set_position(self, x: int, y: int) -> None:
+        self.rect.x, self.rect.y = x, y
+
+    def interpolate(self, alpha: float) -> Tuple[int, int]:
+        x0, y0 = self.previous
+        return (
+            round(x0 + (self.rect.x - x0) * alpha),
+            round(y0 + (self.rect.y - y0) * alpha)
+        )
+
+    def add_score(self, score_count: int = 1) -> None:
+        self.score += score_count
+
+    def subtract_score(self, score_count: int = 1) -> None:
+        if self.score != 0:
+            self.score -= score_count
+
+
+class GameState:
+    """Game rules for both players, advanced one tick at a time.
+
+    Nothing here touches pygame, sockets or the keyboard: ``step`` takes
+    the packed input bits of the locally simulated players and rendering
+    only reads positions back. Entities spawned by the local rules are
+    collected in ``spawned`` so the caller can send them to the peer.
+
+    Speeds and timers are defined per second and converted to whole ticks
+    of ``tick_rate``, so the game plays the same at any tick rate up to
+    rounding of the per-tick speeds.
+    """
+
+    def __init__(
+        self,
+        engine: Literal['objects', 'numpy'] = 'objects',
+        seed: int | None = None,
+        tick_rate: int = 30,
+        spawn_enemies: bool = True,
+        enemy_interval: int | None = None,
+        roles: Iterable[Hashable] = ROLES,
+        **limits: int
+    ) -> None:
+        self.tick = 0
+        self.tick_rate = tick_rate
+        self.random = Random(seed)
+        self.bullet = BULLET._replace(speed=per_tick(BULLET.speed, tick_rate))
+        self.enemy = ENEMY._replace(speed=per_tick(ENEMY.speed, tick_rate))
+        self.engine = create_engine(
+            engine, ARENA, self.bullet, self.enemy, **limits
+        )
+        self.players: Dict[Hashable, PlayerState] = {}
+        self.spawn_enemies = spawn_enemies
+        self.fire_interval = round(0.3 * tick_rate)
+        self.enemy_interval = enemy_interval or tick_rate
+        self.spawned: Dict[str, Dict[int, dict]] = {
+            'bullets': {},
+            'enemies': {}
+        }
+        self._ids = IdAllocator()
+        self._last_enemy = 0
+
+        for role in roles:
+            self.add_player(role)
+
+    def add_player(self, role: Hashable) -> PlayerState:
+        player = self.players[role] = PlayerState(
+            role,
+            self._start_position(role),
+            speed=per_tick(PLAYER_SPEED, self.tick_rate)
+        )
+        return player
+
+    def remove_player(self, role: Hashable) -> None:
+        self.players.pop(role, None)
+
+    def reset(self, seed: int | None = None) -> None:
+        self.tick = self._last_enemy = 0
+        self.random.seed(seed)
+        self.engine.clear()
+
+        for role, player in self.players.items():
+            player.previous = self._start_position(role)
+            player.set_position(*player.previous)
+            player.score = player.last_fire = 0
+
+        for table in self.spawned.values():
+            table.clear()
+
+    def step(
+        self,
+        inputs: Dict[Hashable, int],
+        timings: Dict[str, float] | None = None
+    ) -> None:
+        self.tick += 1
+
+        for table in self.spawned.values():
+            table.clear()
+
+        for player in self.players.values():
+            player.previous = player.rect.x, player.rect.y
+
+        if timings is None:
+            self.apply_inputs(inputs)
+            self.spawn_wave()
+            self.engine.step()
+            self.collide()
+            return
+
+        for phase, run, args in (
+            ('input', self.apply_inputs, (inputs,)),
+            ('spawn', self.spawn_wave, ()),
+            ('move', self.engine.step, ()),
+            ('collide', self.collide, ())
+        ):
+            started = time.perf_counter()
+            run(*args)
+            timings[phase] += time.perf_counter() - started
+
+    def apply_inputs(self, inputs: Dict[Hashable, int]) -> None:
+        for role, bits in inputs.items():
+            player = self.players.get(role)
+            if player is None:
+                continue
+
+            player.set_position(*step_position(
+                player.rect.x, player.rect.y, bits, player.speed
+            ))
+
+            if (
+                bits & FIRE
+                and self.tick - player.last_fire >= self.fire_interval
+            ):
+                player.last_fire = self.tick
+                self._spawn_local(
+                    'bullets', player.rect.x, player.rect.y + 15, role
+                )
+
+    def spawn_wave(self) -> None:
+        if (
+            self.spawn_enemies
+            and self.tick - self._last_enemy >= self.enemy_interval
+        ):
+            self._last_enemy = self.tick
+            x = self.random.randint(50, 620)
+            y = self.random.randint(0, 30)
+            self._spawn_local('enemies', x, y)
+
+    def collide(self) -> None:
+        self.engine.collide(list(self.players.values()), self.players)
+
+    def spawn_bullet(self, x: int, y: int, role: Hashable) -> None:
+        self.engine.spawn_bullet(x, y, role)
+
+    def spawn_enemy(self, x: int, y: int) -> None:
+        self.engine.spawn_enemy(x, y)
+
+    def positions(
+        self,
+        kind: str,
+        alpha: float = 1.0
+    ) -> List[Tuple[int, int]]:
+        """Entity positions ``alpha`` of the way from the previous tick."""
+        if kind == 'bullets':
+            offset = round(self.bullet.speed * (1 - alpha))
+        else:
+            offset = -round(self.enemy.speed * (1 - alpha))
+
+        return self.engine.positions(kind, offset)
+
+    def scores(self) -> Dict[Hashable, int]:
+        return {role: player.score for role, player in self.players.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        return {'tick': self.tick, 'engine': self.engine.stats()}
+
+    def checksum(self) -> int:
+        """CRC32 of the tick, players and entities, for desync checks."""
+        values = array('i', (self.tick, self._last_enemy))
+
+        for role in sorted(self.players, key=str):
+            player = self.players[role]
+            values.extend((
+                player.rect.x, player.rect.y, player.score, player.last_fire
+            ))
+
+        for kind in KINDS:
+            positions = self.engine.positions(kind)
+            values.append(len(positions))
+            for x, y in positions:
+                values.append(x)
+                values.append(y)
+
+        return zlib.crc32(values.tobytes())
+
+    def save(self) -> Dict[str, Any]:
+        """Everything ``step`` depends on, as plain lists and dicts."""
+        version, internal, gauss = self.random.getstate()
+
+        return {
+            'tick': self.tick,
+            'last_enemy': self._last_enemy,
+            'random': [version, list(internal), gauss],
+            'players': {
+                role: [*player.position, *player.previous,
+                       player.score, player.last_fire]
+                for role, player in self.players.items()
+            },
+            'bullets': [list(row) for row in self.engine.dump('bullets')],
+            'enemies': [row[:2] for row in self.engine.dump('enemies')]
+        }
+
+    def load(self, saved: Dict[str, Any]) -> None:
+        """Restore a ``save`` result; players missing from it are kept."""
+        self.tick = saved['tick']
+        self._last_enemy = saved['last_enemy']
+        version, internal, gauss = saved['random']
+        self.random.setstate((version, tuple(internal), gauss))
+
+        for role, values in saved['players'].items():
+            player = self.players.get(role) or self.add_player(role)
+            x, y, px, py, player.score, player.last_fire = values
+            player.set_position(x, y)
+            player.previous = px, py
+
+        self.engine.clear()
+        for x, y, role in saved['bullets']:
+            self.engine.spawn_bullet(x, y, role)
+        for x, y in saved['enemies']:
+            self.engine.spawn_enemy(x, y)
+
+        for table in self.spawned.values():
+            table.clear()
+
+    def _spawn_local(
+        self,
+        kind: str,
+        x: int,
+        y: int,
+        role: Hashable = None
+    ) -> None:
+        if kind == 'bullets':
+            self.engine.spawn_bullet(x, y, role)
+        else:
+            self.engine.spawn_enemy(x, y)
+
+        self.spawned[kind][self._ids()] = {'x': x, 'y': y}
+
+    def _start_position(self, role: Hashable) -> Tuple[int, int]:
+        position = START_POSITIONS.get(role)
+        if position is not None:
+            return position
+
+        slot = role if isinstance(role, int) else len(self.players)
+        return 60 + slot * 90 % 540, 150
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import Any
+
+
+class SnapshotChannel:
+    """Delta-encodes outgoing states against the last one the peer acked.
+
+    Every outgoing message carries its own ``seq`` and an ``ack`` for the
+    newest state received from the peer. A delta whose base is unknown on
+    the receiving side is dropped and answered with ``resync`` so the
+    sender falls back to a full snapshot.
+    """
+
+    def __init__(self, history_size: int = 32) -> None:
+        self.history_size = history_size
+        self.full_sent = 0
+        self.deltas_sent = 0
+        self.resyncs = 0
+        self._seq = 0
+        self._acked: int | None = None
+        self._sent: OrderedDict[int, dict] = OrderedDict()
+        self._received: OrderedDict[int, dict] = OrderedDict()
+        self._last_received: int | None = None
+        self._need_full = False
+
+    def outgoing(self, state: dict) -> dict:
+        self._seq += 1
+        snapshot = copy_state(state)
+        message = {'seq': self._seq, 'ack': self._last_received}
+
+        base = self._sent.get(self._acked) if self._acked is not None else None
+        if base is None:
+            message['full'] = snapshot
+            self.full_sent += 1
+        else:
+            message['base'] = self._acked
+            message['delta'] = diff_state(base, snapshot)
+            self.deltas_sent += 1
+
+        if self._need_full:
+            message['resync'] = True
+            self._need_full = False
+
+        _remember(self._sent, self._seq, snapshot, self.history_size)
+        return message
+
+    def incoming(self, message: dict) -> dict | None:
+        if 'seq' not in message:
+            return message
+
+        ack = message.get('ack')
+        if message.get('resync'):
+            self._acked = None
+        elif ack is not None and (self._acked is None or ack > self._acked):
+            self._acked = ack
+
+        seq = message['seq']
+        if 'full' in message:
+            state = message['full']
+        else:
+            base = self._received.get(message.get('base'))
+            if base is None:
+                self._need_full = True
+                self.resyncs += 1
+                return None
+            state = apply_delta(base, message['delta'])
+
+        _remember(self._received, seq, state, self.history_size)
+        if self._last_received is None or seq > self._last_received:
+            self._last_received = seq
+
+        return state
+
+    def reset(self) -> None:
+        self._acked = self._last_received = None
+        self._sent.clear()
+        self._received.clear()
+        self._need_full = False
+
+
+def copy_state(state: Any) -> Any:
+    if type(state) is dict:
+        return {key: copy_state(value) for key, value in state.items()}
+    if type(state) is list:
+        return [copy_state(value) for value in state]
+
+    return state
+
+
+def diff_state(old: dict, new: dict) -> dict:
+    changed = {}
+    nested = {}
+    removed = [key for key in old if key not in new]
+
+    for key, value in new.items():
+        if key in old:
+            previous = old[key]
+            if type(previous) is dict and type(value) is dict:
+                delta = diff_state(previous, value)
+                if delta:
+                    nested[key] = delta
+                continue
+            if previous == value:
+                continue
+        changed[key] = value
+
+    delta = {}
+    if changed:
+        delta['set'] = changed
+    if removed:
+        delta['del'] = removed
+    if nested:
+        delta['sub'] = nested
+
+    return delta
+
+
+def apply_delta(base: dict, delta: dict) -> dict:
+    state = dict(base)
+
+    for key in delta.get('del', ()):
+        state.pop(key, None)
+
+    state.update(delta.get('set', ()))
+
+    for key, nested in delta.get('sub', {}).items():
+        previous = state.get(key)
+        state[key] = apply_delta(
+            previous if type(previous) is dict else {}, nested
+        )
+
+    return state
+
+
+def _remember(
+    history: OrderedDict,
+    seq: int,
+    state: dict,
+    limit: int
+) -> None:
+    history[seq] = state
+
+    while len(history) > limit:
+        history.popitem(last=False)
@@ -0,0 +1,137 @@
+from typing import List, Iterable, Protocol, Tuple, Container
+
+
+class RectLike(Protocol):
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+class Collider(Protocol):
+    rect: RectLike
+
+
+class Box:
+    """Plain rectangle for code that has to run without pygame."""
+
+    __slots__ = ('x', 'y', 'width', 'height')
+
+    def __init__(self, x: int, y: int, width: int, height: int) -> None:
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    def __repr__(self) -> str:
+        return f'Box({self.x}, {self.y}, {self.width}, {self.height})'
+
+
+class CollisionGrid:
+    """Uniform grid over the arena used as a collision broad phase.
+
+    Objects outside the arena are clamped into the border cells, so
+    queries stay correct for entities that have drifted off-screen.
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int] = (700, 500),
+        cell_size: int = 64
+    ) -> None:
+        self.cell_size = cell_size
+        self.columns = -(-size[0] // cell_size)
+        self.rows = -(-size[1] // cell_size)
+        self._cells: List[List[Collider]] = [
+            [] for _ in range(self.columns * self.rows)
+        ]
+        self._used: List[int] = []
+
+    def clear(self) -> None:
+        cells = self._cells
+
+        for index in self._used:
+            cells[index].clear()
+
+        self._used.clear()
+
+    def rebuild(self, items: Iterable[Collider]) -> None:
+        self.clear()
+
+        for item in items:
+            self.insert(item)
+
+    def insert(self, item: Collider) -> None:
+        cells = self._cells
+        used = self._used
+        x0, y0, x1, y1 = self._cell_range(item.rect)
+
+        for row in range(y0, y1 + 1):
+            offset = row * self.columns
+            for column in range(x0, x1 + 1):
+                cell = cells[offset + column]
+                if not cell:
+                    used.append(offset + column)
+                cell.append(item)
+
+    def query(self, rect: RectLike) -> List[Collider]:
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self._cells
+
+        if x0 == x1 and y0 == y1:
+            candidates = cells[y0 * self.columns + x0]
+        else:
+            candidates = []
+            seen = set()
+            for row in range(y0, y1 + 1):
+                offset = row * self.columns
+                for column in range(x0, x1 + 1):
+                    for item in cells[offset + column]:
+                        if id(item) not in seen:
+                            seen.add(id(item))
+                            candidates.append(item)
+
+        return [item for item in candidates if overlaps(rect, item.rect)]
+
+    def first(
+        self,
+        rect: RectLike,
+        exclude: Container[Collider] = ()
+    ) -> Collider | None:
+        x0, y0, x1, y1 = self._cell_range(rect)
+        cells = self._cells
+        left, top = rect.x, rect.y
+        right, bottom = left + rect.width, top + rect.height
+
+        for row in range(y0, y1 + 1):
+            offset = row * self.columns
+            for column in range(x0, x1 + 1):
+                for item in cells[offset + column]:
+                    other = item.rect
+                    if (
+                        left < other.x + other.width and other.x < right
+                        and top < other.y + other.height and other.y < bottom
+                        and item not in exclude
+                    ):
+                        return item
+
+        return None
+
+    def _cell_range(self, rect: RectLike) -> Tuple[int, int, int, int]:
+        size = self.cell_size
+        last_column = self.columns - 1
+        last_row = self.rows - 1
+
+        x0 = min(max(rect.x // size, 0), last_column)
+        y0 = min(max(rect.y // size, 0), last_row)
+        x1 = min(max((rect.x + rect.width - 1) // size, 0), last_column)
+        y1 = min(max((rect.y + rect.height - 1) // size, 0), last_row)
+
+        return x0, y0, x1, y1
+
+
+def overlaps(a: RectLike, b: RectLike) -> bool:
+    return (
+        a.x < b.x + b.width and b.x < a.x + a.width
+        and a.y < b.y + b.height and b.y < a.y + a.height
+    )
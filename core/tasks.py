@@ -0,0 +1,328 @@
+import time
+import queue
+import atexit
+import logging
+import threading
+from concurrent.futures import Future, CancelledError
+from typing import Callable, Dict, List, Sequence, Any
+
+Callback = Callable[[Any], None]
+Dispatch = Callable[[Callable[[], None]], None]
+
+logger = logging.getLogger(__name__)
+_local = threading.local()
+
+
+class TaskPoolFull(RuntimeError):
+    pass
+
+
+class Task:
+    """Handle on a job submitted to a TaskPool.
+
+    ``stop`` is set by ``cancel``, by pool shutdown and when the task's
+    timeout runs out. Blocking work is expected to watch it: Host.run and
+    Client.connect take it as ``stop``. A task stopped by its timeout
+    fails with TimeoutError whatever it raised on the way out.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        args: Sequence[Any],
+        kwargs: Dict[str, Any],
+        timeout: float | None,
+        on_result: Callback | None,
+        on_error: Callback | None
+    ) -> None:
+        self.name = name
+        self.future: Future = Future()
+        self.stop = threading.Event()
+        self.timed_out = False
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.on_result = on_result
+        self.on_error = on_error
+        self._call = fn, args, kwargs
+
+    def __repr__(self) -> str:
+        if self.future.done():
+            state = 'done'
+        else:
+            state = 'running' if self.future.running() else 'pending'
+
+        return f'<Task {self.name} {state}>'
+
+    def cancel(self) -> bool:
+        """Ask the task to stop; True if it had not started yet."""
+        self.stop.set()
+        return self.future.cancel()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    def result(self, timeout: float | None = None) -> Any:
+        return self.future.result(timeout)
+
+    def exception(self, timeout: float | None = None) -> BaseException | None:
+        return self.future.exception(timeout)
+
+    def remaining(self) -> float | None:
+        """Seconds left before the timeout, or None without one."""
+        if self.deadline is None:
+            return None
+
+        return max(0.0, self.deadline - time.monotonic())
+
+    def _expire(self) -> None:
+        self.timed_out = True
+        self.stop.set()
+
+    def _run(self) -> None:
+        if not self.future.set_running_or_notify_cancel():
+            return
+        if self.timed_out:
+            self.future.set_exception(
+                TimeoutError(f'Task {self.name} timed out before it ran.')
+            )
+            return
+
+        fn, args, kwargs = self._call
+        _local.task = self
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as error:
+            if self.timed_out:
+                timeout = TimeoutError(f'Task {self.name} timed out.')
+                timeout.__cause__ = error
+                error = timeout
+            self.future.set_exception(error)
+        else:
+            self.future.set_result(result)
+        finally:
+            _local.task = None
+
+
+class TaskPool:
+    """A fixed number of daemon worker threads running named tasks.
+
+    Workers are started as tasks arrive, up to ``max_workers``, and at
+    most ``max_pending`` tasks wait for one; past that ``submit`` raises
+    TaskPoolFull. Submitting a name that is still pending or running
+    returns the existing task instead of starting another.
+
+    ``on_result`` and ``on_error`` callbacks are handed to ``dispatch``,
+    which runs them in place by default; a GUI sets it to something that
+    queues them onto its own thread. Errors without an ``on_error`` are
+    logged, and tasks cancelled while running report nothing.
+    ``shutdown`` stops every task and is also run at exit.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 16,
+        dispatch: Dispatch | None = None,
+        name: str = 'task'
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.name = name
+        self.dispatch: Dispatch = dispatch or _call
+        self.completed = 0
+        self.failed = 0
+        self._queue: queue.Queue = queue.Queue()
+        self._tasks: Dict[str, Task] = {}
+        self._workers: List[threading.Thread] = []
+        self._idle = 0
+        self._condition = threading.Condition()
+        self._watchdog: threading.Thread | None = None
+        self._closed = False
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        args: Sequence[Any] = (),
+        kwargs: Dict[str, Any] | None = None,
+        timeout: float | None = None,
+        on_result: Callback | None = None,
+        on_error: Callback | None = None
+    ) -> Task:
+        with self._condition:
+            if self._closed:
+                raise RuntimeError('The task pool is shut down.')
+
+            running = self._tasks.get(name)
+            if running is not None and not running.done():
+                return running
+
+            waiting = self._queue.qsize() - self._idle
+            if waiting >= self.max_pending:
+                raise TaskPoolFull(
+                    f'{waiting} tasks are already waiting for a worker.'
+                )
+
+            task = Task(
+                name, fn, args, kwargs or {}, timeout, on_result, on_error
+            )
+            self._queue.put(task)
+            self._tasks[name] = task
+            task.future.add_done_callback(
+                lambda _: self._finished(task)
+            )
+            if (
+                self._queue.qsize() > self._idle
+                and len(self._workers) < self.max_workers
+            ):
+                self._start_worker()
+            if task.deadline is not None:
+                self._watch()
+
+            return task
+
+    def get(self, name: str) -> Task | None:
+        with self._condition:
+            return self._tasks.get(name)
+
+    def tasks(self) -> List[Task]:
+        with self._condition:
+            return list(self._tasks.values())
+
+    def cancel(self, name: str) -> bool:
+        task = self.get(name)
+        return task is not None and task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'workers': len(self._workers),
+                'idle': self._idle,
+                'pending': max(0, self._queue.qsize() - self._idle),
+                'running': sorted(
+                    name for name, task in self._tasks.items()
+                    if task.future.running()
+                ),
+                'completed': self.completed,
+                'failed': self.failed
+            }
+
+    def shutdown(self, timeout: float | None = 1.0) -> None:
+        """Cancel every task and wait up to ``timeout`` seconds in total
+        for the workers to finish."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            tasks = list(self._tasks.values())
+            workers = list(self._workers)
+            self._condition.notify_all()
+
+        for task in tasks:
+            task.cancel()
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+        for _ in workers:
+            self._queue.put(None)
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in workers:
+            worker.join(
+                None if deadline is None
+                else max(0.0, deadline - time.monotonic())
+            )
+
+    def _start_worker(self) -> None:
+        worker = threading.Thread(
+            target=self._work,
+            name=f'{self.name}-{len(self._workers)}',
+            daemon=True
+        )
+        self._workers.append(worker)
+        worker.start()
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                self._idle += 1
+            task = self._queue.get()
+            with self._condition:
+                self._idle -= 1
+
+            if task is None:
+                return
+            task._run()
+
+    def _finished(self, task: Task) -> None:
+        with self._condition:
+            if self._tasks.get(task.name) is task:
+                del self._tasks[task.name]
+            closed = self._closed
+
+        try:
+            error = task.future.exception(0)
+        except CancelledError:
+            return
+        if task.stop.is_set() and not task.timed_out:
+            return
+
+        with self._condition:
+            if error is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+        if error is None:
+            callback, value = task.on_result, task.future.result(0)
+        else:
+            callback, value = task.on_error, error
+            if callback is None:
+                logger.error('Task %s failed', task.name, exc_info=error)
+
+        if callback is not None and not closed:
+            self.dispatch(lambda: callback(value))
+
+    def _watch(self) -> None:
+        if self._watchdog is None:
+            self._watchdog = threading.Thread(
+                target=self._expire_overdue,
+                name=f'{self.name}-watchdog',
+                daemon=True
+            )
+            self._watchdog.start()
+        else:
+            self._condition.notify_all()
+
+    def _expire_overdue(self) -> None:
+        with self._condition:
+            while not self._closed:
+                now = time.monotonic()
+                deadlines = []
+
+                for task in list(self._tasks.values()):
+                    if task.deadline is None or task.stop.is_set():
+                        continue
+                    if task.deadline <= now:
+                        task._expire()
+                    else:
+                        deadlines.append(task.deadline)
+
+                self._condition.wait(
+                    min(deadlines) - now if deadlines else None
+                )
+
+
+def current_task() -> Task | None:
+    """The task the calling thread is running, if any."""
+    return getattr(_local, 'task', None)
+
+
+def _call(callback: Callable[[], None]) -> None:
+    callback()
+
+
+pool = TaskPool(name='background')
+atexit.register(pool.shutdown)
@@ -0,0 +1,270 @@
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Callable, Dict, Sequence, Tuple, Protocol, Any
+
+LATENCY_BUCKETS_MS = (
+    1, 2, 5, 10, 20, 30, 40, 50, 60, 80, 100, 150, 200, 300, 500, 1000
+)
+SHORT_BUCKETS_MS = (0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10)
+
+Gauge = Callable[[], int | Dict[str, int]]
+
+
+class MetricsSource(Protocol):
+    def snapshot(self) -> Dict[str, Any]: ...
+
+
+class LatencyHistogram:
+    def __init__(
+        self,
+        buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS
+    ) -> None:
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        self.counts[bisect_left(self.buckets_ms, seconds * 1000)] += 1
+        self.total += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Upper edge in ms of the bucket holding the given fraction."""
+        wanted = fraction * self.total
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= wanted:
+                if index < len(self.buckets_ms):
+                    return float(self.buckets_ms[index])
+                return float('inf')
+
+        return 0.0
+
+    def summary(self) -> Dict[str, float | None]:
+        """Count and p50/p95/p99 in ms; None above the last bucket."""
+        summary: Dict[str, float | None] = {'count': self.total}
+
+        for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99)):
+            value = self.percentile(fraction)
+            summary[name] = None if value == float('inf') else value
+
+        return summary
+
+    def format(self) -> str:
+        labels = [f'<={edge}' for edge in self.buckets_ms]
+        labels.append(f'>{self.buckets_ms[-1]}')
+
+        return ' '.join(
+            f'{label}:{count}'
+            for label, count in zip(labels, self.counts) if count
+        )
+
+
+class RateCounter:
+    """A running total and its amount over the last whole second."""
+
+    __slots__ = ('total', '_second', '_count', '_last')
+
+    def __init__(self) -> None:
+        self.total = 0
+        self._second = 0
+        self._count = 0
+        self._last = 0
+
+    def add(self, amount: int, now: float) -> None:
+        self.total += amount
+        second = int(now)
+
+        if second != self._second:
+            self._last = self._count if second == self._second + 1 else 0
+            self._second = second
+            self._count = 0
+
+        self._count += amount
+
+    def rate(self, now: float) -> int:
+        second = int(now)
+
+        if second == self._second:
+            return self._last
+        if second == self._second + 1:
+            return self._count
+        return 0
+
+
+class ConnectionTelemetry:
+    """Health counters of one Host or Client connection.
+
+    Traffic is counted on the wire, encode and decode times per message,
+    and lock waits per acquisition of the connection lock. Round trips
+    come from a ``ping`` timestamp attached to an outgoing message every
+    ``ping_interval`` seconds, which the peer echoes back as ``pong`` on
+    its next message along with how long it held it, so send pacing on
+    the far side is not counted. Queue depths are read from the gauges
+    given to ``watch`` when a snapshot is taken.
+    """
+
+    def __init__(self, name: str, ping_interval: float = 1.0) -> None:
+        self.name = name
+        self.ping_interval = ping_interval
+        self.bytes_sent = RateCounter()
+        self.bytes_received = RateCounter()
+        self.messages_sent = RateCounter()
+        self.messages_received = RateCounter()
+        self.encode = LatencyHistogram(SHORT_BUCKETS_MS)
+        self.decode = LatencyHistogram(SHORT_BUCKETS_MS)
+        self.lock_wait = LatencyHistogram(SHORT_BUCKETS_MS)
+        self.rtt = LatencyHistogram()
+        self.last_rtt: float | None = None
+        self._gauges: Dict[str, Gauge] = {}
+        self._pong: Tuple[float, float] | None = None
+        self._last_ping = 0.0
+
+    def record_send(self, size: int, encode_time: float) -> None:
+        now = time.perf_counter()
+        self.bytes_sent.add(size, now)
+        self.messages_sent.add(1, now)
+        self.encode.add(encode_time)
+
+    def record_receive(self, size: int, messages: int) -> None:
+        now = time.perf_counter()
+        self.bytes_received.add(size, now)
+        self.messages_received.add(messages, now)
+
+    def record_decode(self, decode_time: float) -> None:
+        self.decode.add(decode_time)
+
+    def record_lock_wait(self, wait: float) -> None:
+        self.lock_wait.add(wait)
+
+    def stamp(self, message: dict) -> dict:
+        """Attach a due ping and an owed pong to an outgoing message."""
+        now = time.perf_counter()
+        ping = now - self._last_ping >= self.ping_interval
+
+        if not ping and self._pong is None:
+            return message
+
+        message = dict(message)
+        if ping:
+            message['ping'] = now
+            self._last_ping = now
+        if self._pong is not None:
+            stamp, received_at = self._pong
+            message['pong'] = [stamp, now - received_at]
+            self._pong = None
+
+        return message
+
+    def unstamp(self, message: dict) -> dict:
+        """Strip ping and pong from an incoming message."""
+        now = time.perf_counter()
+
+        if 'ping' in message:
+            self._pong = (message.pop('ping'), now)
+        if 'pong' in message:
+            stamp, held = message.pop('pong')
+            self.last_rtt = now - stamp - held
+            self.rtt.add(self.last_rtt)
+
+        return message
+
+    def watch(self, name: str, gauge: Gauge) -> None:
+        self._gauges[name] = gauge
+
+    def unwatch(self, name: str) -> None:
+        self._gauges.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.perf_counter()
+
+        return {
+            'name': self.name,
+            'time': time.time(),
+            'bytes_sent': self.bytes_sent.total,
+            'bytes_received': self.bytes_received.total,
+            'messages_sent': self.messages_sent.total,
+            'messages_received': self.messages_received.total,
+            'bytes_sent_per_s': self.bytes_sent.rate(now),
+            'bytes_received_per_s': self.bytes_received.rate(now),
+            'messages_sent_per_s': self.messages_sent.rate(now),
+            'messages_received_per_s': self.messages_received.rate(now),
+            'rtt_ms': (
+                None if self.last_rtt is None else self.last_rtt * 1000
+            ),
+            'rtt': self.rtt.summary(),
+            'encode': self.encode.summary(),
+            'decode': self.decode.summary(),
+            'lock_wait': self.lock_wait.summary(),
+            'queues': {
+                name: gauge() for name, gauge in list(self._gauges.items())
+            }
+        }
+
+    def summary(self) -> str:
+        """One line for a console."""
+        snapshot = self.snapshot()
+        rtt = snapshot['rtt_ms']
+
+        return (
+            f'{self.name}: '
+            f'out {snapshot["bytes_sent_per_s"] / 1024:.1f} KB/s '
+            f'{snapshot["messages_sent_per_s"]} msg/s, '
+            f'in {snapshot["bytes_received_per_s"] / 1024:.1f} KB/s '
+            f'{snapshot["messages_received_per_s"]} msg/s, '
+            f'rtt {"-" if rtt is None else f"{rtt:.0f} ms"}, '
+            f'lock p99 {_format_ms(snapshot["lock_wait"]["p99"])}, '
+            f'queues {snapshot["queues"]}'
+        )
+
+
+class MetricsWriter(threading.Thread):
+    """Appends telemetry snapshots as JSON lines to a rotating file."""
+
+    def __init__(
+        self,
+        sources: Sequence[MetricsSource],
+        path: str,
+        interval: float = 1.0,
+        max_bytes: int = 1024 * 1024,
+        backups: int = 5
+    ) -> None:
+        super().__init__(name='metrics-writer', daemon=True)
+        self.sources = tuple(sources)
+        self.interval = interval
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8'
+        )
+        self._logger = logging.getLogger(f'telemetry.{path}')
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(self._handler)
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self.write()
+
+    def write(self) -> None:
+        for source in self.sources:
+            self._logger.info(json.dumps(source.snapshot()))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self.is_alive():
+            self.join(self.interval + 1)
+
+        self.write()
+        self._logger.removeHandler(self._handler)
+        self._handler.close()
+
+
+def _format_ms(value: float | None) -> str:
+    return '-' if value is None else f'{value:g} ms'
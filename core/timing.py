@@ -0,0 +1,38 @@
+import time
+
+
+class FixedTimestep:
+    """Accumulates frame time and hands it out as fixed simulation ticks.
+
+    A frame longer than ``max_frame`` is clipped, so a stall slows the game
+    down for a moment instead of making it run a burst of catch-up ticks.
+    ``alpha`` is how far the current frame is between the last two ticks.
+    """
+
+    def __init__(self, tick_rate: int = 30, max_frame: float = 0.25) -> None:
+        self.tick_rate = tick_rate
+        self.dt = 1 / tick_rate
+        self.max_frame = max_frame
+        self.accumulator = 0.0
+        self._last: float | None = None
+
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.dt
+
+    def reset(self) -> None:
+        self.accumulator = 0.0
+        self._last = None
+
+    def advance(self, now: float | None = None) -> int:
+        now = time.perf_counter() if now is None else now
+        if self._last is None:
+            self._last = now - self.dt
+
+        self.accumulator += min(now - self._last, self.max_frame)
+        self._last = now
+
+        ticks = int(self.accumulator // self.dt)
+        self.accumulator -= ticks * self.dt
+
+        return ticks
@@ -0,0 +1,78 @@
+import io
+import importlib.util
+from functools import lru_cache
+from pathlib import Path
+from types import ModuleType
+from typing import Dict
+
+from PyQt5 import uic
+from PyQt5.QtCore import PYQT_VERSION_STR
+from PyQt5.QtWidgets import QWidget
+
+UI_DIR = Path('core/ui')
+CACHE_DIR = UI_DIR / '__pycache__'
+STYLESHEET_PATH = 'core/styles/styles.css'
+
+_modules: Dict[str, ModuleType] = {}
+
+
+@lru_cache(maxsize=None)
+def stylesheet(path: str = STYLESHEET_PATH) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_ui(name: str, widget: QWidget) -> None:
+    """Build ``core/ui/<name>.ui`` into ``widget`` like ``uic.loadUi``.
+
+    The .ui file is compiled to a Python module in ``CACHE_DIR`` the
+    first time and again only when the file or the PyQt5 version
+    changes, so later starts skip the XML. Named children become
+    attributes of ``widget``. If the cache cannot be written the file is
+    loaded directly.
+    """
+    module = _modules.get(name)
+
+    if module is None:
+        try:
+            module = _modules[name] = _compile(name)
+        except OSError:
+            uic.loadUi(str(UI_DIR / f'{name}.ui'), widget)
+            return
+
+    form = next(
+        value for attribute, value in vars(module).items()
+        if attribute.startswith('Ui_')
+    )()
+    form.setupUi(widget)
+
+    for attribute, value in vars(form).items():
+        setattr(widget, attribute, value)
+
+
+def _compile(name: str) -> ModuleType:
+    source = UI_DIR / f'{name}.ui'
+    target = CACHE_DIR / f'{name}_ui.py'
+    stat = source.stat()
+    stamp = f'# {stat.st_mtime_ns} {stat.st_size} {PYQT_VERSION_STR}\n'
+
+    if not _is_current(target, stamp):
+        code = io.StringIO()
+        uic.compileUi(str(source), code)
+        CACHE_DIR.mkdir(exist_ok=True)
+        partial = target.with_suffix('.tmp')
+        partial.write_text(stamp + code.getvalue(), encoding='utf-8')
+        partial.replace(target)
+
+    spec = importlib.util.spec_from_file_location(f'ui_{name}', target)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _is_current(target: Path, stamp: str) -> bool:
+    try:
+        with open(target, 'r', encoding='utf-8') as f:
+            return f.readline() == stamp
+    except OSError:
+        return False
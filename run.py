@@ -2,11 +2,14 @@ import sys
 
 from PyQt5.QtWidgets import QApplication
 
-from core.objects.menu_objects import MainWindow
+from core.tasks import pool
+from core.objects.menu_objects import MainWindow, QtDispatcher
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    pool.dispatch = QtDispatcher()
+    app.aboutToQuit.connect(pool.shutdown)
     window = MainWindow()
     window.show()
     app.exec_()